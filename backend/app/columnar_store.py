@@ -0,0 +1,350 @@
+# columnar_store.py
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any
+import logging
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+POSITIONS = ["BTN", "SB", "BB", "UTG", "MP", "MP2", "MP3", "CO"]
+
+# Une colonne = un fichier binaire brut, relu via np.memmap
+COLUMNS = {
+    'hand_id': 'S36',
+    'tournament': np.int32,
+    'hero': np.int32,
+    'hand_number': np.int32,
+    'level': np.int16,
+    'big_blind': np.int64,
+    'pot_size': np.int64,
+    'hero_stack': np.int64,
+    'hero_net': np.int64,
+    'position': np.int8,
+    'vpip': np.bool_,
+    'pfr': np.bool_,
+    'showdown': np.bool_,
+    'alive': np.bool_
+}
+
+
+def hand_features(hand_dict: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Extrait les valeurs numériques d'une main sérialisée et de ses métriques dérivées"""
+    hero_name = hand_dict.get('hero_name', '')
+    players = hand_dict.get('players', [])
+    hero_stack = next((p.get('stack', 0) for p in players if p.get('name') == hero_name), 0)
+
+    position = hand_dict.get('hero_position', '')
+    return {
+        'hand_id': hand_dict.get('id', ''),
+        'tournament_id': hand_dict.get('tournament_id', ''),
+        'hero_name': hero_name,
+        'hand_number': hand_dict.get('hand_number', 0),
+        'level': hand_dict.get('level', 1),
+        'big_blind': hand_dict.get('big_blind', 0),
+        'pot_size': hand_dict.get('pot_size', 0),
+        'hero_stack': hero_stack,
+        'hero_net': metrics.get('hero_net_chips', 0),
+        'position': POSITIONS.index(position) if position in POSITIONS else -1,
+        'vpip': metrics.get('vpip', False),
+        'pfr': metrics.get('pfr', False),
+        'showdown': metrics.get('showdown', bool(hand_dict.get('showdown'))),
+        'alive': True
+    }
+
+
+class ColumnarStore:
+    """
+    Stockage colonnaire des caractéristiques numériques des mains : un tableau
+    NumPy par colonne, ajouté à l'ingestion et relu en memory-map, pour calculer
+    les statistiques par réductions vectorisées plutôt qu'en itérant sur des Hand.
+
+    meta.json porte le nombre de lignes validées : il est réécrit après les
+    colonnes, et les octets au-delà (ajout interrompu) sont tronqués. Les ajouts
+    se font sous verrou de fichier après relecture de meta.json, les codes de
+    tournoi et de héros restant ainsi communs aux processus.
+    """
+
+    def __init__(self, columns_dir: str):
+        self.columns_dir = columns_dir
+        os.makedirs(columns_dir, exist_ok=True)
+        self.meta_file = os.path.join(columns_dir, "meta.json")
+        self._lock_path = os.path.join(columns_dir, "meta.lock")
+        self._lock = threading.RLock()
+        self._meta_mtime: Optional[int] = None
+        self._maps: Optional[Dict[str, np.ndarray]] = None
+        # hand_id -> dernière ligne de la main, construit au premier usage puis complété
+        self._row_by_id: Optional[Dict[bytes, int]] = None
+        self._rows_indexed = 0
+
+        with self._locked():
+            self._load_meta()
+            self._truncate_columns()
+
+    @property
+    def initialized(self) -> bool:
+        self._refresh()
+        return self.meta['initialized']
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.columns_dir, f"{name}.bin")
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Verrou des écritures (threads du processus et autres processus)"""
+        with self._lock:
+            with open(self._lock_path, 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _load_meta(self):
+        meta = {'initialized': False, 'tournaments': [], 'heroes': [], 'rows': None}
+        if os.path.exists(self.meta_file):
+            with open(self.meta_file, 'r', encoding='utf-8') as f:
+                meta.update(json.load(f))
+            self._meta_mtime = os.stat(self.meta_file).st_mtime_ns
+        if meta['rows'] is None:
+            # meta.json antérieur au nombre de lignes : longueur commune des colonnes
+            meta['rows'] = min(self._file_rows(name, dtype) for name, dtype in COLUMNS.items())
+        if meta['rows'] < self._rows_indexed:
+            # Colonnes vidées (reset) depuis la construction de l'index
+            self._row_by_id = None
+            self._rows_indexed = 0
+        self.meta = meta
+        self._tournament_codes = {tid: i for i, tid in enumerate(meta['tournaments'])}
+        self._hero_codes = {name: i for i, name in enumerate(meta['heroes'])}
+        self._maps = None
+
+    def _refresh(self):
+        """Recharge meta.json s'il a été réécrit (ajout par un autre processus)"""
+        try:
+            mtime = os.stat(self.meta_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._meta_mtime:
+            with self._lock:
+                self._load_meta()
+
+    def _file_rows(self, name: str, dtype) -> int:
+        path = self._column_path(name)
+        return os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0
+
+    def _truncate_columns(self):
+        """Coupe les colonnes au nombre de lignes validées (ajout interrompu)"""
+        rows = self.meta['rows']
+        for name, dtype in COLUMNS.items():
+            if self._file_rows(name, dtype) > rows:
+                logger.warning(f"Truncating column {name} to {rows} rows")
+                with open(self._column_path(name), 'r+b') as f:
+                    f.truncate(rows * np.dtype(dtype).itemsize)
+
+    def _save_meta(self):
+        tmp_path = f"{self.meta_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_file)
+        self._meta_mtime = os.stat(self.meta_file).st_mtime_ns
+
+    def _code(self, codes: Dict[str, int], values: List[str], value: str) -> int:
+        if value not in codes:
+            codes[value] = len(values)
+            values.append(value)
+        return codes[value]
+
+    def append_hands(self, rows: List[Dict[str, Any]]) -> None:
+        """Ajoute en fin de colonnes des mains décrites par hand_features()"""
+        if not rows:
+            return
+
+        with self._locked():
+            # Codes et nombre de lignes relus : un autre processus a pu ajouter des mains
+            self._load_meta()
+            self._truncate_columns()
+            for row in rows:
+                row['tournament'] = self._code(self._tournament_codes, self.meta['tournaments'], row['tournament_id'])
+                row['hero'] = self._code(self._hero_codes, self.meta['heroes'], row['hero_name'])
+
+            for name, dtype in COLUMNS.items():
+                values = [row[name] for row in rows]
+                if name == 'hand_id':
+                    values = [v.encode('ascii') for v in values]
+                with open(self._column_path(name), 'ab') as f:
+                    np.asarray(values, dtype=dtype).tofile(f)
+
+            # Validation de l'ajout : meta.json en dernier
+            self.meta['rows'] += len(rows)
+            self.meta['initialized'] = True
+            self._save_meta()
+            self._maps = None
+
+    def mark_initialized(self):
+        """Marque le stockage comme rempli (utile quand il n'y avait aucune main à importer)"""
+        with self._locked():
+            self._load_meta()
+            if not self.meta['initialized']:
+                self.meta['initialized'] = True
+                self._save_meta()
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Colonnes en memory-map, limitées aux lignes validées dans meta.json"""
+        self._refresh()
+        maps = self._maps
+        if maps is None:
+            length = self.meta['rows']
+            maps = {}
+            for name, dtype in COLUMNS.items():
+                path = self._column_path(name)
+                if length and os.path.exists(path) and os.path.getsize(path) > 0:
+                    maps[name] = np.memmap(path, dtype=dtype, mode='r')[:length]
+                else:
+                    maps[name] = np.zeros(0, dtype=dtype)
+            self._maps = maps
+        return maps
+
+    def __len__(self) -> int:
+        return int(self.columns()['alive'].sum())
+
+    def _set_dead(self, mask: np.ndarray) -> int:
+        count = int(mask.sum())
+        if count:
+            alive = np.memmap(self._column_path('alive'), dtype=np.bool_, mode='r+')
+            alive[:len(mask)][mask] = False
+            alive.flush()
+            self._maps = None
+        return count
+
+    def _hand_row(self, hand_id: str) -> Optional[int]:
+        """Ligne courante d'une main ; l'index ne lit que les lignes ajoutées depuis son dernier usage"""
+        hand_ids = self.columns()['hand_id']
+        if self._row_by_id is None:
+            self._row_by_id = {}
+            self._rows_indexed = 0
+        if len(hand_ids) > self._rows_indexed:
+            start = self._rows_indexed
+            # Une main réécrite (update_hand) pointe vers sa ligne la plus récente
+            self._row_by_id.update(zip(hand_ids[start:].tolist(), range(start, len(hand_ids))))
+            self._rows_indexed = len(hand_ids)
+        return self._row_by_id.get(hand_id.encode('ascii'))
+
+    def delete_hand(self, hand_id: str) -> int:
+        """Marque une main comme supprimée (une seule ligne écrite)"""
+        with self._locked():
+            row = self._hand_row(hand_id)
+            if row is None or not self.columns()['alive'][row]:
+                return 0
+            with open(self._column_path('alive'), 'r+b') as f:
+                f.seek(row * np.dtype(np.bool_).itemsize)
+                f.write(np.zeros(1, dtype=np.bool_).tobytes())
+            self._maps = None
+            return 1
+
+    def delete_tournament(self, tournament_id: str) -> int:
+        """Marque toutes les mains d'un tournoi comme supprimées"""
+        with self._locked():
+            columns = self.columns()
+            code = self._tournament_codes.get(tournament_id)
+            if code is None:
+                return 0
+            return self._set_dead((columns['tournament'] == code) & columns['alive'])
+
+    def reset(self):
+        """Vide toutes les colonnes"""
+        with self._locked():
+            for name in COLUMNS:
+                path = self._column_path(name)
+                if os.path.exists(path):
+                    os.remove(path)
+            self.meta = {'initialized': False, 'tournaments': [], 'heroes': [], 'rows': 0}
+            self._row_by_id = None
+            self._rows_indexed = 0
+            self._tournament_codes = {}
+            self._hero_codes = {}
+            self._save_meta()
+            self._maps = None
+
+    def _hero_mask(self, hero_name: str, tournament_id: Optional[str] = None) -> Optional[np.ndarray]:
+        self._refresh()
+        hero_code = self._hero_codes.get(hero_name)
+        if hero_code is None:
+            return None
+        columns = self.columns()
+        mask = columns['alive'] & (columns['hero'] == hero_code)
+        if tournament_id is not None:
+            code = self._tournament_codes.get(tournament_id)
+            if code is None:
+                return None
+            mask &= columns['tournament'] == code
+        return mask
+
+    def hands_per_tournament(self, hero_name: str) -> Dict[str, int]:
+        """Nombre de mains jouées par le héros dans chaque tournoi"""
+        mask = self._hero_mask(hero_name)
+        if mask is None:
+            return {}
+        counts = np.bincount(self.columns()['tournament'][mask], minlength=len(self.meta['tournaments']))
+        return {self.meta['tournaments'][code]: int(n) for code, n in enumerate(counts) if n > 0}
+
+    def hands_per_tournament_and_hero(self) -> Dict[str, Dict[str, int]]:
+        """Nombre de mains par tournoi et par héros, en une seule réduction"""
+        columns = self.columns()
+        alive = columns['alive']
+        heroes = len(self.meta['heroes'])
+        if heroes == 0 or not alive.any():
+            return {}
+        pairs = columns['tournament'][alive].astype(np.int64) * heroes + columns['hero'][alive]
+        codes, counts = np.unique(pairs, return_counts=True)
+        result: Dict[str, Dict[str, int]] = {}
+        for code, n in zip(codes.tolist(), counts.tolist()):
+            tournament, hero = divmod(code, heroes)
+            result.setdefault(self.meta['tournaments'][tournament], {})[self.meta['heroes'][hero]] = n
+        return result
+
+    def hero_stats(self, hero_name: str, tournament_id: Optional[str] = None) -> Dict[str, Any]:
+        """Statistiques main par main du héros, calculées par réductions vectorisées"""
+        mask = self._hero_mask(hero_name, tournament_id)
+        hands = int(mask.sum()) if mask is not None else 0
+        if hands == 0:
+            return {'hero_name': hero_name, 'hands': 0}
+
+        columns = self.columns()
+        big_blind = columns['big_blind'][mask].astype(np.float64)
+        net = columns['hero_net'][mask]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            net_bb = np.where(big_blind > 0, net / big_blind, 0.0)
+            pot_bb = np.where(big_blind > 0, columns['pot_size'][mask] / big_blind, 0.0)
+
+        positions = columns['position'][mask]
+        position_counts = np.bincount(positions[positions >= 0], minlength=len(POSITIONS))
+        by_position = {}
+        for code, name in enumerate(POSITIONS):
+            if position_counts[code] == 0:
+                continue
+            position_mask = positions == code
+            by_position[name] = {
+                'hands': int(position_counts[code]),
+                'net_chips': int(net[position_mask].sum()),
+                'net_bb': round(float(net_bb[position_mask].sum()), 2),
+                'vpip': round(float(columns['vpip'][mask][position_mask].mean() * 100), 1)
+            }
+
+        return {
+            'hero_name': hero_name,
+            'hands': hands,
+            'vpip': round(float(columns['vpip'][mask].mean() * 100), 1),
+            'pfr': round(float(columns['pfr'][mask].mean() * 100), 1),
+            'showdown_rate': round(float(columns['showdown'][mask].mean() * 100), 1),
+            'net_chips': int(net.sum()),
+            'net_bb': round(float(net_bb.sum()), 2),
+            'bb_per_100': round(float(net_bb.sum() / hands * 100), 2),
+            'avg_pot_bb': round(float(pot_bb.mean()), 2),
+            'by_position': by_position
+        }
@@ -0,0 +1,343 @@
+# hand_index.py
+import base64
+import heapq
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+RANKS = "23456789TJQKA"
+STREETS = ["preflop", "flop", "turn", "river"]
+
+def hole_cards_combo(hole_cards: str) -> str:
+    """Forme canonique des cartes du héros : 'AKs', 'QJo', 'TT'"""
+    cards = hole_cards.split()
+    if len(cards) != 2 or any(len(c) < 2 for c in cards):
+        return ""
+
+    r1, s1 = cards[0][:-1].upper(), cards[0][-1].lower()
+    r2, s2 = cards[1][:-1].upper(), cards[1][-1].lower()
+    r1, r2 = ("T" if r == "10" else r for r in (r1, r2))
+    if r1 not in RANKS or r2 not in RANKS:
+        return ""
+
+    if RANKS.index(r1) < RANKS.index(r2):
+        r1, r2 = r2, r1
+    if r1 == r2:
+        return r1 + r2
+    return r1 + r2 + ("s" if s1 == s2 else "o")
+
+def exact_hole_cards(hole_cards: str) -> str:
+    """Cartes exactes normalisées, indépendamment de l'ordre : 'Ah Kd' et 'kd ah' -> 'Ah Kd'"""
+    cards = hole_cards.split()
+    if len(cards) != 2 or not hole_cards_combo(hole_cards):
+        return ""
+    cards = [("T" if c[:-1] == "10" else c[:-1].upper()) + c[-1].lower() for c in cards]
+    cards.sort(key=lambda c: (RANKS.index(c[0]), c[1]), reverse=True)
+    return " ".join(cards)
+
+def hole_cards_class(combo: str) -> str:
+    """Classe de la main de départ : pair, suited ou offsuit"""
+    if not combo:
+        return ""
+    if len(combo) == 2:
+        return "pair"
+    return "suited" if combo.endswith("s") else "offsuit"
+
+
+class HandSearchIndex:
+    """
+    Projection colonnaire des mains avec index secondaires pour la recherche
+    multi-critères. Chaque main occupe une ligne ; les filtres catégoriels
+    sont résolus par intersection d'ensembles, les filtres de plage ne sont
+    évalués que sur les candidats restants.
+
+    Modifié par l'écrivain unique du stockage et lu sans verrou : une recherche
+    ne parcourt que des copies des ensembles de lignes.
+    """
+
+    def __init__(self):
+        # Colonnes (une entrée par ligne)
+        self.ids: List[str] = []
+        self.tournament_ids: List[str] = []
+        self.hand_ids: List[str] = []
+        self.hand_numbers: List[int] = []
+        self.timestamps: List[float] = []
+        self.levels: List[int] = []
+        self.hero_names: List[str] = []
+        self.positions: List[str] = []
+        self.hole_cards: List[str] = []
+        self.combos: List[str] = []
+        self.streets: List[int] = []
+        self.showdowns: List[bool] = []
+        self.pot_bbs: List[float] = []
+        self.alive = bytearray()
+
+        self.row_by_id: Dict[str, int] = {}
+        self.rows_by_tournament: Dict[str, Set[int]] = {}
+        self.tournament_types: Dict[str, str] = {}
+
+        # Index secondaires : valeur -> lignes
+        self.by_position: Dict[str, Set[int]] = {}
+        self.by_combo: Dict[str, Set[int]] = {}
+        self.by_card_class: Dict[str, Set[int]] = {}
+        self.by_street: Dict[int, Set[int]] = {}
+        self.by_showdown: Dict[bool, Set[int]] = {}
+        self.by_level: Dict[int, Set[int]] = {}
+        self.by_tournament_type: Dict[str, Set[int]] = {}
+        self.by_hero: Dict[str, Set[int]] = {}
+
+    @classmethod
+    def build(cls, hands: List[Dict[str, Any]], tournaments: List[Dict[str, Any]]) -> "HandSearchIndex":
+        """Construit l'index à partir des mains et tournois sérialisés"""
+        index = cls()
+        for t_data in tournaments:
+            index.tournament_types[t_data.get('id')] = t_data.get('tournament_type', 'Unknown')
+        for h_data in hands:
+            index.add_hand(h_data)
+        logger.info(f"Hand search index built: {len(index.row_by_id)} hands")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.row_by_id)
+
+    def set_tournament_type(self, tournament_id: str, tournament_type: str) -> None:
+        """Enregistre (ou corrige) le type d'un tournoi"""
+        previous = self.tournament_types.get(tournament_id)
+        self.tournament_types[tournament_id] = tournament_type
+        if previous is not None and previous != tournament_type:
+            rows = self.rows_by_tournament.get(tournament_id, set())
+            self.by_tournament_type.get(previous, set()).difference_update(rows)
+            self.by_tournament_type.setdefault(tournament_type, set()).update(rows)
+
+    def add_hand(self, h_data: Dict[str, Any]) -> None:
+        """Ajoute une main sérialisée à l'index (une main déjà indexée garde sa ligne)"""
+        hand_id = h_data.get('id')
+        tournament_id = h_data.get('tournament_id', '')
+        combo = hole_cards_combo(h_data.get('hole_cards') or '')
+
+        if h_data.get('river'):
+            street = 3
+        elif h_data.get('turn'):
+            street = 2
+        elif h_data.get('flop'):
+            street = 1
+        else:
+            street = 0
+
+        date = h_data.get('date')
+        if isinstance(date, str):
+            try:
+                date = datetime.fromisoformat(date)
+            except ValueError:
+                date = None
+        timestamp = date.timestamp() if isinstance(date, datetime) else 0.0
+
+        big_blind = h_data.get('big_blind', 0)
+        pot_bb = h_data.get('pot_size', 0) / big_blind if big_blind else 0.0
+
+        values = (
+            hand_id, tournament_id, h_data.get('hand_id', ''), h_data.get('hand_number', 0), timestamp,
+            h_data.get('level', 1), h_data.get('hero_name', ''), h_data.get('hero_position', ''),
+            h_data.get('hole_cards', ''), combo, street, bool(h_data.get('showdown')), round(pot_bb, 2), 1
+        )
+        row = self.row_by_id.get(hand_id)
+        if row is None:
+            row = len(self.ids)
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+        else:
+            # Nouvelle version d'une main : ligne réutilisée, retirée des index secondaires puis réindexée
+            self._unlink(row)
+            for column, value in zip(self._columns(), values):
+                column[row] = value
+
+        self.row_by_id[hand_id] = row
+        self.rows_by_tournament.setdefault(tournament_id, set()).add(row)
+        for index, value in self._indexed_values(row):
+            index.setdefault(value, set()).add(row)
+
+    def remove_hand(self, hand_id: str) -> bool:
+        """Retire une main de l'index (la ligne reste allouée mais morte)"""
+        row = self.row_by_id.pop(hand_id, None)
+        if row is None:
+            return False
+
+        self.alive[row] = 0
+        self._unlink(row)
+        return True
+
+    def _columns(self) -> List[Any]:
+        # Même ordre que les valeurs construites par add_hand
+        return [self.ids, self.tournament_ids, self.hand_ids, self.hand_numbers, self.timestamps,
+                self.levels, self.hero_names, self.positions, self.hole_cards, self.combos,
+                self.streets, self.showdowns, self.pot_bbs, self.alive]
+
+    def _unlink(self, row: int) -> None:
+        """Retire une ligne de l'index par tournoi et des index secondaires"""
+        self.rows_by_tournament.get(self.tournament_ids[row], set()).discard(row)
+        for index, value in self._indexed_values(row):
+            index.get(value, set()).discard(row)
+
+    def remove_tournament(self, tournament_id: str) -> int:
+        """Retire toutes les mains d'un tournoi"""
+        rows = list(self.rows_by_tournament.pop(tournament_id, set()))
+        for row in rows:
+            self.remove_hand(self.ids[row])
+        return len(rows)
+
+    def _indexed_values(self, row: int) -> List[Tuple[Dict, Any]]:
+        combo = self.combos[row]
+        return [
+            (self.by_position, self.positions[row]),
+            (self.by_combo, combo),
+            (self.by_card_class, hole_cards_class(combo)),
+            (self.by_street, self.streets[row]),
+            (self.by_showdown, self.showdowns[row]),
+            (self.by_level, self.levels[row]),
+            (self.by_tournament_type, self.tournament_types.get(self.tournament_ids[row], 'Unknown')),
+            (self.by_hero, self.hero_names[row])
+        ]
+
+    @staticmethod
+    def encode_cursor(key: Tuple[float, int, str]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, int, str]:
+        timestamp, hand_number, hand_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (float(timestamp), int(hand_number), str(hand_id))
+
+    def search(self,
+               positions: Optional[List[str]] = None,
+               hole_cards: Optional[List[str]] = None,
+               min_street: Optional[str] = None,
+               showdown: Optional[bool] = None,
+               min_pot_bb: Optional[float] = None,
+               max_pot_bb: Optional[float] = None,
+               min_level: Optional[int] = None,
+               max_level: Optional[int] = None,
+               date_from: Optional[datetime] = None,
+               date_to: Optional[datetime] = None,
+               tournament_type: Optional[str] = None,
+               hero_name: Optional[str] = None,
+               cursor: Optional[str] = None,
+               limit: int = 50) -> Dict[str, Any]:
+        """
+        Recherche multi-critères, résultats triés chronologiquement
+        (date, numéro de main) avec pagination par curseur.
+        """
+        candidate_sets: List[Set[int]] = []
+
+        if positions:
+            candidate_sets.append(self._union(self.by_position, positions))
+        if hole_cards:
+            rows: Set[int] = set()
+            for value in hole_cards:
+                if value.lower() in ('pair', 'suited', 'offsuit'):
+                    rows |= self.by_card_class.get(value.lower(), set())
+                else:
+                    # Cartes exactes ('Ah Kd'), combo ('AKs', 'QQ') ou 'AK' pour suited + offsuit
+                    key = hole_cards_combo(value) or value[:2].upper() + value[2:].lower()
+                    exact = exact_hole_cards(value)
+                    if exact:
+                        # Mains du combo filtrées sur les cartes elles-mêmes ('Ah Kd' n'est pas 'Ac Kh')
+                        rows |= {row for row in list(self.by_combo.get(key, ()))
+                                 if exact_hole_cards(self.hole_cards[row]) == exact}
+                        continue
+                    rows |= self.by_combo.get(key, set())
+                    if len(key) == 2 and key[0] != key[1]:
+                        rows |= self.by_combo.get(key + 's', set()) | self.by_combo.get(key + 'o', set())
+            candidate_sets.append(rows)
+        if min_street:
+            street_rank = STREETS.index(min_street)
+            candidate_sets.append(self._union(self.by_street, range(street_rank, len(STREETS))))
+        if showdown is not None:
+            candidate_sets.append(self.by_showdown.get(showdown, set()))
+        if min_level is not None or max_level is not None:
+            low = min_level if min_level is not None else 0
+            high = max_level if max_level is not None else max(self.by_level, default=0)
+            candidate_sets.append(self._union(self.by_level, [lvl for lvl in list(self.by_level) if low <= lvl <= high]))
+        if tournament_type:
+            candidate_sets.append(self.by_tournament_type.get(tournament_type, set()))
+        if hero_name:
+            candidate_sets.append(self.by_hero.get(hero_name, set()))
+
+        # Intersection en partant du plus petit ensemble (copié : l'index peut changer pendant la recherche)
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            candidates = set(candidate_sets[0])
+            for rows in candidate_sets[1:]:
+                if not candidates:
+                    break
+                candidates = candidates & rows
+        else:
+            candidates = list(self.row_by_id.values())
+
+        ts_from = date_from.timestamp() if date_from else None
+        ts_to = date_to.timestamp() if date_to else None
+        after = self.decode_cursor(cursor) if cursor else None
+
+        pot_bbs = self.pot_bbs
+        timestamps = self.timestamps
+        alive = self.alive
+
+        def matches(row: int) -> bool:
+            if not alive[row]:
+                return False
+            pot_bb = pot_bbs[row]
+            if min_pot_bb is not None and pot_bb < min_pot_bb:
+                return False
+            if max_pot_bb is not None and pot_bb > max_pot_bb:
+                return False
+            timestamp = timestamps[row]
+            if ts_from is not None and timestamp < ts_from:
+                return False
+            if ts_to is not None and timestamp > ts_to:
+                return False
+            return True
+
+        matched = [row for row in candidates if matches(row)]
+        keys = ((timestamps[row], self.hand_numbers[row], self.ids[row], row) for row in matched)
+        if after is not None:
+            keys = (key for key in keys if key[:3] > after)
+        page = heapq.nsmallest(limit + 1, keys)
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = self.encode_cursor(page[-1][:3])
+
+        return {
+            'hands': [self.row_to_dict(key[3]) for key in page],
+            'total': len(matched),
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def _union(index: Dict[Any, Set[int]], values) -> Set[int]:
+        rows: Set[int] = set()
+        for value in values:
+            rows |= index.get(value, set())
+        return rows
+
+    def row_to_dict(self, row: int) -> Dict[str, Any]:
+        """Projection compacte d'une ligne pour la réponse API"""
+        return {
+            'id': self.ids[row],
+            'tournament_id': self.tournament_ids[row],
+            'hand_id': self.hand_ids[row],
+            'hand_number': self.hand_numbers[row],
+            'date': datetime.fromtimestamp(self.timestamps[row]).isoformat(),
+            'level': self.levels[row],
+            'hero_name': self.hero_names[row],
+            'hero_position': self.positions[row],
+            'hole_cards': self.hole_cards[row],
+            'street': STREETS[self.streets[row]],
+            'showdown': self.showdowns[row],
+            'pot_bb': self.pot_bbs[row],
+            'tournament_type': self.tournament_types.get(self.tournament_ids[row], 'Unknown')
+        }
@@ -0,0 +1,567 @@
+# hand_log.py
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+from .serialization import Codec, get_codec
+from .player_registry import InterningCodec, PlayerRegistry
+
+logger = logging.getLogger(__name__)
+
+# En-tête du fichier, puis une suite d'enregistrements :
+# [longueur payload u32][longueur clé u16][clé JSON][payload]
+# La clé porte l'opération : écriture d'une main (par défaut) ou tombstone
+# ('del' pour une main, 'del_tournament' pour toutes les mains d'un tournoi).
+# L'en-tête indique l'encodage des payloads (JSON, msgpack, compressés ou non).
+MAGIC = b'WHL1'
+PAYLOAD_FORMATS = {
+    b'WHL1': 'json',
+    b'WHLZ': 'json+zlib',
+    b'WHLM': 'msgpack',
+    b'WHLX': 'msgpack+zlib'
+}
+FORMAT_MAGIC = {payload_format: magic for magic, payload_format in PAYLOAD_FORMATS.items()}
+RECORD_HEADER = struct.Struct('<IH')
+
+# Entrée d'index : (offset du payload, longueur, tournament_id, hand_number, hand_id, taille de l'enregistrement)
+IndexEntry = Tuple[int, int, str, int, str, int]
+
+# Compaction déclenchée au-delà de cette proportion d'octets morts
+COMPACTION_THRESHOLD = 0.5
+COMPACTION_MIN_BYTES = 1024 * 1024
+
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _payload_codec(payload_format: str) -> Codec:
+    """Codec des payloads : JSON compact (sans indentation) pour les formats JSON"""
+    if payload_format not in FORMAT_MAGIC:
+        raise ValueError(f"Format de journal de mains inconnu: {payload_format}")
+    if payload_format.startswith('json'):
+        return get_codec(payload_format.replace('json', 'json-compact', 1))
+    return get_codec(payload_format)
+
+
+class HandLogView:
+    """
+    Mains d'un tournoi figées à un instant (snapshot) : les entrées d'index et
+    le mapping de l'époque suffisent à les lire, sans verrou. Le fichier étant
+    en ajout seul et les anciens mappings jamais fermés, les octets référencés
+    ne changent pas, même après une compaction ou une réécriture.
+    """
+    __slots__ = ('_mm', '_codec', '_entries')
+
+    def __init__(self, mm: Optional[mmap.mmap], codec: Optional[Codec], entries: Tuple[IndexEntry, ...]):
+        self._mm = mm
+        self._codec = codec
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ids(self) -> List[str]:
+        return [entry[4] for entry in self._entries]
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Mains triées par numéro ; seules celles de la page sont décodées"""
+        entries = self._entries[offset:None if limit is None else offset + limit]
+        mm, codec = self._mm, self._codec
+        return [codec.loads(mm[start:start + length]) for start, length, *_ in entries]
+
+
+EMPTY_VIEW = HandLogView(None, None, ())
+
+
+class HandLog:
+    """
+    Fichier de mains à enregistrements préfixés par leur longueur, lu via mmap.
+    La clé de chaque enregistrement (id, hand_id, tournoi, numéro de main) est
+    séparée du payload : l'index mémoire se reconstruit en ne décodant que les
+    clés, et une lecture par id ou une page ne touche que les octets utiles.
+    Le mapping passe par le cache de pages de l'OS, partagé entre processus.
+
+    Le fichier est en ajout seul : mises à jour et suppressions (tombstones)
+    sont ajoutées en fin de fichier, l'index donne la vue vivante. Une
+    compaction en arrière-plan réécrit le fichier quand la proportion
+    d'octets morts dépasse compaction_threshold.
+
+    L'encodage des payloads est lu dans l'en-tête ; si payload_format est
+    fourni et diffère de celui du fichier, le fichier est converti à l'ouverture.
+    Avec un registre de joueurs, les pseudos sont stockés en identifiants.
+
+    Plusieurs processus peuvent écrire le même journal (serveur, suivi
+    d'historiques, import en masse) : ajouts, réécritures, bascule de la
+    compaction et troncature d'un enregistrement incomplet se font sous un
+    verrou exclusif sur un fichier voisin (<journal>.lock), le journal
+    lui-même étant remplacé par renommage.
+    """
+
+    def __init__(self, path: str, compaction_threshold: float = COMPACTION_THRESHOLD,
+                 compaction_min_bytes: int = COMPACTION_MIN_BYTES, payload_format: Optional[str] = None,
+                 registry: Optional[PlayerRegistry] = None):
+        self.path = path
+        self.registry = registry
+        self.compaction_threshold = compaction_threshold
+        self.compaction_min_bytes = compaction_min_bytes
+        self._lock = threading.RLock()
+        self._lock_path = f"{path}.lock"
+        self._file_lock_depth = 0
+        self._compaction_thread: Optional[threading.Thread] = None
+        self.compaction_stats: Dict[str, Any] = {
+            'running': False,
+            'progress': 0.0,
+            'records_copied': 0,
+            'records_total': 0,
+            'runs': 0,
+            'bytes_reclaimed': 0,
+            'last_duration_seconds': None,
+            'last_run_at': None,
+            'last_error': None
+        }
+        self.payload_format = payload_format or 'json'
+        self._codec = self._make_codec(self.payload_format)
+
+        self._mm: Optional[mmap.mmap] = None
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._indexed_size = 0
+        self._reset_index()
+        with self._file_lock():
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                with open(path, 'wb') as f:
+                    f.write(FORMAT_MAGIC[self.payload_format])
+            self._refresh()
+
+            # Enregistrement incomplet en fin de fichier : verrou tenu, aucun autre
+            # processus n'est en train d'écrire, c'est un arrêt pendant une écriture
+            if os.path.getsize(path) > self._indexed_size:
+                logger.warning(f"Truncating incomplete record at end of {path}")
+                with open(path, 'r+b') as f:
+                    f.truncate(self._indexed_size)
+                self._refresh()
+
+        if payload_format and payload_format != self.payload_format:
+            self.convert(payload_format)
+
+    def _make_codec(self, payload_format: str) -> Codec:
+        """Codec des payloads ; avec un registre, les pseudos sont stockés en identifiants"""
+        codec = _payload_codec(payload_format)
+        return InterningCodec(codec, self.registry) if self.registry is not None else codec
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Verrou d'écriture du journal, entre threads et entre processus (réentrant)"""
+        with self._lock:
+            if self._file_lock_depth or fcntl is None:
+                self._file_lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth -= 1
+                return
+            with open(self._lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._file_lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth -= 1
+
+    def _reset_index(self):
+        self.by_id: Dict[str, IndexEntry] = {}
+        # Le hand_id extrait par le parser n'est pas unique (partagé par une table)
+        self.by_hand_id: Dict[str, List[str]] = {}
+        self.by_number: Dict[Tuple[str, int], str] = {}
+        self._tournaments: Dict[str, List[Tuple[int, str]]] = {}
+        self._unsorted: set = set()
+        self._indexed_size = len(MAGIC)
+        self._live_bytes = 0
+
+    # ----- index -----
+    def _refresh(self):
+        """Met à jour le mapping et l'index si le fichier a changé (autre processus, réécriture)"""
+        with self._lock:
+            stat = os.stat(self.path)
+            file_id = (stat.st_ino, stat.st_dev)
+            if file_id != self._file_id or stat.st_size < self._indexed_size:
+                self._reset_index()
+                self._file_id = file_id
+            elif stat.st_size == self._indexed_size and self._mm is not None:
+                return
+
+            # L'ancien mapping n'est pas fermé : un lecteur (ou la compaction) peut encore l'utiliser
+            with open(self.path, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            payload_format = PAYLOAD_FORMATS.get(self._mm[:len(MAGIC)])
+            if payload_format is None:
+                raise ValueError(f"{self.path} n'est pas un journal de mains")
+            if payload_format != self.payload_format:
+                self.payload_format = payload_format
+                self._codec = self._make_codec(payload_format)
+            self._scan(self._indexed_size)
+
+    def _scan(self, start: int):
+        """Indexe les enregistrements à partir de start en ne lisant que les clés"""
+        mm = self._mm
+        end = len(mm)
+        offset = start
+        while offset + RECORD_HEADER.size <= end:
+            payload_len, key_len = RECORD_HEADER.unpack_from(mm, offset)
+            key_start = offset + RECORD_HEADER.size
+            payload_start = key_start + key_len
+            if payload_start + payload_len > end:
+                # Enregistrement incomplet (écriture en cours ou interrompue)
+                break
+            record_size = payload_start + payload_len - offset
+            self._apply(json.loads(mm[key_start:payload_start]), payload_start, payload_len, record_size)
+            offset = payload_start + payload_len
+        self._indexed_size = offset
+
+    def _apply(self, key: Dict[str, Any], payload_start: int, payload_len: int, record_size: int):
+        op = key.get('op')
+        if op == 'del':
+            if key['id'] in self.by_id:
+                self._forget(key['id'])
+            return
+        if op == 'del_tournament':
+            for _, hand_id in list(self._tournaments.get(key['tournament_id'], [])):
+                self._forget(hand_id)
+            return
+
+        hand_id = key['id']
+        if hand_id in self.by_id:
+            self._forget(hand_id)
+        tournament_id = key.get('tournament_id', '')
+        hand_number = key.get('hand_number', 0)
+        self.by_id[hand_id] = (payload_start, payload_len, tournament_id, hand_number,
+                               key.get('hand_id', ''), record_size)
+        self._live_bytes += record_size
+        self.by_hand_id.setdefault(key.get('hand_id', ''), []).append(hand_id)
+        self.by_number[(tournament_id, hand_number)] = hand_id
+        self._tournaments.setdefault(tournament_id, []).append((hand_number, hand_id))
+        self._unsorted.add(tournament_id)
+
+    def _forget(self, hand_id: str):
+        entry = self.by_id.pop(hand_id)
+        _, _, tournament_id, hand_number, winamax_id, record_size = entry
+        self._live_bytes -= record_size
+        same_hand_id = self.by_hand_id.get(winamax_id)
+        if same_hand_id is not None:
+            same_hand_id.remove(hand_id)
+            if not same_hand_id:
+                del self.by_hand_id[winamax_id]
+        if self.by_number.get((tournament_id, hand_number)) == hand_id:
+            del self.by_number[(tournament_id, hand_number)]
+        rows = self._tournaments.get(tournament_id)
+        if rows is not None:
+            rows.remove((hand_number, hand_id))
+            if not rows:
+                del self._tournaments[tournament_id]
+
+    def _tournament_ids(self, tournament_id: str) -> List[str]:
+        rows = self._tournaments.get(tournament_id, [])
+        if tournament_id in self._unsorted:
+            rows.sort()
+            self._unsorted.discard(tournament_id)
+        return [hand_id for _, hand_id in rows]
+
+    # ----- lecture -----
+    def _read(self, entry: IndexEntry) -> Dict[str, Any]:
+        start, length = entry[0], entry[1]
+        return self._codec.loads(self._mm[start:start + length])
+
+    def _read_many(self, hand_ids: List[str]) -> List[Dict[str, Any]]:
+        # Lecture dans l'ordre du fichier (accès séquentiel), résultat dans l'ordre demandé
+        entries = sorted((self.by_id[hand_id][0], i) for i, hand_id in enumerate(hand_ids))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(hand_ids)
+        for start, i in entries:
+            results[i] = self._read(self.by_id[hand_ids[i]])
+        return results
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self.by_id)
+
+    def get(self, hand_id: str) -> Optional[Dict[str, Any]]:
+        """Main par id interne"""
+        with self._lock:
+            self._refresh()
+            entry = self.by_id.get(hand_id)
+            return self._read(entry) if entry else None
+
+    def get_by_hand_id(self, winamax_hand_id: str) -> List[Dict[str, Any]]:
+        """Mains portant un identifiant Winamax"""
+        with self._lock:
+            self._refresh()
+            return self._read_many(list(self.by_hand_id.get(winamax_hand_id, [])))
+
+    def get_by_number(self, tournament_id: str, hand_number: int) -> Optional[Dict[str, Any]]:
+        """Main par (tournoi, numéro de main)"""
+        with self._lock:
+            self._refresh()
+            hand_id = self.by_number.get((tournament_id, hand_number))
+            return self.get(hand_id) if hand_id else None
+
+    def count(self, tournament_id: str) -> int:
+        """Nombre de mains d'un tournoi, sans lecture des payloads"""
+        with self._lock:
+            self._refresh()
+            return len(self._tournaments.get(tournament_id, []))
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return list(self.by_id)
+
+    def __contains__(self, hand_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return hand_id in self.by_id
+
+    def hand_ids(self, tournament_id: str) -> List[str]:
+        """Ids des mains d'un tournoi, sans lecture des payloads"""
+        with self._lock:
+            self._refresh()
+            return self._tournament_ids(tournament_id)
+
+    def tournament_ids(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return list(self._tournaments)
+
+    def snapshot(self, tournament_id: str) -> HandLogView:
+        """Vue figée des mains d'un tournoi, lisible sans verrou"""
+        with self._lock:
+            self._refresh()
+            entries = tuple(self.by_id[hand_id] for hand_id in self._tournament_ids(tournament_id))
+            return HandLogView(self._mm, self._codec, entries) if entries else EMPTY_VIEW
+
+    def by_tournament(self, tournament_id: str, offset: int = 0,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Mains d'un tournoi triées par numéro de main (éventuellement une seule page)"""
+        with self._lock:
+            self._refresh()
+            hand_ids = self._tournament_ids(tournament_id)
+            end = None if limit is None else offset + limit
+            return self._read_many(hand_ids[offset:end])
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Toutes les mains, dans l'ordre d'insertion"""
+        with self._lock:
+            self._refresh()
+            return [self._read(entry) for entry in sorted(self.by_id.values())]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.all())
+
+    # ----- écriture -----
+    def _record(self, h_data: Dict[str, Any], codec: Optional[Codec] = None) -> bytes:
+        key = _encode({
+            'id': h_data['id'],
+            'hand_id': h_data.get('hand_id', ''),
+            'tournament_id': h_data.get('tournament_id', ''),
+            'hand_number': h_data.get('hand_number', 0)
+        })
+        payload = (codec or self._codec).dumps(h_data)
+        return RECORD_HEADER.pack(len(payload), len(key)) + key + payload
+
+    @staticmethod
+    def _tombstone(key: Dict[str, Any]) -> bytes:
+        key = _encode(key)
+        return RECORD_HEADER.pack(0, len(key)) + key
+
+    def _write(self, data: bytes) -> None:
+        if self.registry is not None:
+            # Pseudos référencés par ces enregistrements durables avant eux
+            self.registry.sync()
+        with self._file_lock():
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            self._refresh()
+
+    def append(self, hands: List[Dict[str, Any]]) -> None:
+        """Ajoute (ou remplace) des mains en fin de fichier, en une seule écriture pour le lot"""
+        if not hands:
+            return
+        with self._lock:
+            # Encodage sous le verrou : une conversion concurrente change le codec
+            self._write(b''.join(self._record(h_data) for h_data in hands))
+        self.maybe_compact()
+
+    def delete(self, hand_ids: List[str]) -> int:
+        """Ajoute un tombstone par main existante ; retourne le nombre de mains supprimées"""
+        with self._lock:
+            self._refresh()
+            existing = [hand_id for hand_id in hand_ids if hand_id in self.by_id]
+            if existing:
+                self._write(b''.join(self._tombstone({'op': 'del', 'id': hand_id}) for hand_id in existing))
+        self.maybe_compact()
+        return len(existing)
+
+    def delete_tournament(self, tournament_id: str) -> int:
+        """Un seul tombstone pour toutes les mains d'un tournoi"""
+        with self._lock:
+            count = self.count(tournament_id)
+            if count:
+                self._write(self._tombstone({'op': 'del_tournament', 'tournament_id': tournament_id}))
+        self.maybe_compact()
+        return count
+
+    def rewrite(self, hands: List[Dict[str, Any]], payload_format: Optional[str] = None) -> None:
+        """Remplace tout le contenu du fichier (écriture dans un fichier temporaire puis renommage)"""
+        payload_format = payload_format or self.payload_format
+        codec = self._make_codec(payload_format)
+        tmp_path = f"{self.path}.tmp"
+        with self._file_lock():
+            with open(tmp_path, 'wb') as f:
+                f.write(FORMAT_MAGIC[payload_format])
+                for h_data in hands:
+                    f.write(self._record(h_data, codec))
+                f.flush()
+                os.fsync(f.fileno())
+            if self.registry is not None:
+                self.registry.sync()
+            os.replace(tmp_path, self.path)
+            self._file_id = None
+            self._refresh()
+
+    def convert(self, payload_format: str) -> None:
+        """Réécrit le fichier avec un autre encodage des payloads"""
+        with self._lock:
+            previous = self.payload_format
+            hands = self.all()
+            self.rewrite(hands, payload_format)
+            logger.info(f"Converted {len(hands)} hands in {self.path} from {previous} to {payload_format}")
+
+    def clear(self) -> None:
+        self.rewrite([])
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.path)
+
+    def sync(self) -> None:
+        """Rend durables les enregistrements déjà écrits (fsync)"""
+        with open(self.path, 'ab') as f:
+            os.fsync(f.fileno())
+
+    # ----- compaction -----
+    def garbage_ratio(self) -> float:
+        """Proportion des octets du fichier qui ne sont plus visibles (versions remplacées, tombstones)"""
+        with self._lock:
+            self._refresh()
+            data_bytes = self._indexed_size - len(MAGIC)
+            return 1 - self._live_bytes / data_bytes if data_bytes > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques du journal et de la compaction"""
+        with self._lock:
+            self._refresh()
+            return {
+                'layout': 'single',
+                'payload_format': self.payload_format,
+                'live_records': len(self.by_id),
+                'file_bytes': self._indexed_size,
+                'live_bytes': self._live_bytes,
+                'garbage_ratio': round(self.garbage_ratio(), 4),
+                'compaction': dict(self.compaction_stats)
+            }
+
+    def maybe_compact(self) -> bool:
+        """Lance une compaction en arrière-plan si le seuil de déchets est dépassé"""
+        with self._lock:
+            if self.compaction_stats['running']:
+                return False
+            if self._indexed_size < self.compaction_min_bytes or self.garbage_ratio() < self.compaction_threshold:
+                return False
+            self.compaction_stats['running'] = True
+
+        self._compaction_thread = threading.Thread(target=self._run_compaction, name="hand-log-compaction",
+                                                   daemon=True)
+        self._compaction_thread.start()
+        return True
+
+    def compact(self) -> Dict[str, Any]:
+        """Compaction synchrone (attend une éventuelle compaction en cours)"""
+        with self._lock:
+            thread = self._compaction_thread
+            running = self.compaction_stats['running']
+            if not running:
+                self.compaction_stats['running'] = True
+        if running:
+            if thread is not None:
+                thread.join()
+        else:
+            self._run_compaction()
+        return self.stats()
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run_compaction(self):
+        stats = self.compaction_stats
+        started = time.perf_counter()
+        # Fichier propre au processus : d'autres processus peuvent compacter le même journal
+        tmp_path = f"{self.path}.{os.getpid()}.compact"
+        try:
+            # Photo de la vue vivante ; les écritures continuent pendant la copie
+            with self._lock:
+                self._refresh()
+                mm = self._mm
+                file_id = self._file_id
+                snapshot_end = self._indexed_size
+                entries = sorted(self.by_id.values())
+            stats.update({'progress': 0.0, 'records_copied': 0, 'records_total': len(entries),
+                          'last_error': None})
+
+            with open(tmp_path, 'wb') as f:
+                f.write(mm[:len(MAGIC)])
+                for i, (payload_start, payload_len, *_, record_size) in enumerate(entries, 1):
+                    end = payload_start + payload_len
+                    f.write(mm[end - record_size:end])
+                    if i % 1000 == 0 or i == len(entries):
+                        stats['records_copied'] = i
+                        stats['progress'] = round(i / len(entries), 4)
+
+                # Rattrapage des enregistrements ajoutés pendant la copie, puis bascule ; les
+                # autres processus n'écrivent plus dans l'ancien fichier jusqu'au renommage
+                with self._file_lock():
+                    self._refresh()
+                    if self._file_id != file_id:
+                        raise RuntimeError("journal réécrit pendant la compaction")
+                    before = self._indexed_size
+                    f.write(self._mm[snapshot_end:before])
+                    f.flush()
+                    os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                    self._file_id = None
+                    self._refresh()
+                    reclaimed = before - self._indexed_size
+
+            stats['runs'] += 1
+            stats['bytes_reclaimed'] += reclaimed
+            stats['progress'] = 1.0
+            stats['last_run_at'] = datetime.now().isoformat()
+            logger.info(f"Hand log compacted: {len(entries)} records, {reclaimed} bytes reclaimed")
+        except Exception as e:
+            stats['last_error'] = str(e)
+            logger.error(f"Error compacting {self.path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            stats['last_duration_seconds'] = round(time.perf_counter() - started, 3)
+            stats['running'] = False
@@ -0,0 +1,344 @@
+# hand_shards.py
+import argparse
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Any
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+from .hand_log import EMPTY_VIEW, HandLog, HandLogView
+from .player_registry import PlayerRegistry
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+class ShardedHandStore:
+    """
+    Mains réparties en un journal HandLog par tournoi (hands/<tournament_id>.log)
+    avec un petit manifeste listant les shards. Lire, ajouter ou supprimer les
+    mains d'un tournoi ne touche que son shard (un verrou par shard). Via
+    FileStorage, les écritures restent sérialisées par son verrou d'écrivain
+    unique (snapshot, index et agrégats communs à tous les tournois) : les
+    shards réduisent le coût de chaque écriture, pas leur concurrence.
+    Même interface que HandLog.
+
+    hand_ids.log associe chaque main écrite à son tournoi (une ligne par main,
+    en ajout seul) : une main écrite par un autre processus est retrouvée en
+    lisant les lignes ajoutées depuis la dernière lecture, sans ouvrir les shards.
+    """
+
+    def __init__(self, shards_dir: str, payload_format: Optional[str] = None,
+                 registry: Optional[PlayerRegistry] = None):
+        self.shards_dir = shards_dir
+        self.payload_format = payload_format
+        self.registry = registry
+        os.makedirs(shards_dir, exist_ok=True)
+        self.manifest_file = os.path.join(shards_dir, "manifest.json")
+        self.ids_file = os.path.join(shards_dir, "hand_ids.log")
+
+        self._lock = threading.RLock()
+        self._shards: Dict[str, HandLog] = {}
+        self._tournament_by_hand: Dict[str, str] = {}
+        self._manifest: Dict[str, Any] = {'version': MANIFEST_VERSION, 'tournaments': {}}
+        self._manifest_mtime: Optional[int] = None
+
+        if not os.path.exists(self.manifest_file):
+            self._save_manifest()
+        # Associations antérieures couvertes par l'ouverture des shards
+        with self._locked_ids_file() as f:
+            self._ids_size = f.seek(0, os.SEEK_END)
+        self._load_manifest()
+
+    @staticmethod
+    def exists(shards_dir: str) -> bool:
+        return os.path.exists(os.path.join(shards_dir, "manifest.json"))
+
+    # ----- manifeste -----
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_file)
+        self._manifest_mtime = os.stat(self.manifest_file).st_mtime_ns
+
+    def _load_manifest(self):
+        """Recharge le manifeste s'il a été modifié (par exemple par un autre processus)"""
+        with self._lock:
+            mtime = os.stat(self.manifest_file).st_mtime_ns
+            if mtime == self._manifest_mtime:
+                return
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+
+            tournaments = self._manifest.get('tournaments', {})
+            for tournament_id in list(self._shards):
+                if tournament_id not in tournaments:
+                    self._drop_shard(tournament_id)
+            for tournament_id in tournaments:
+                if tournament_id not in self._shards:
+                    self._open_shard(tournament_id)
+
+    # ----- associations main -> tournoi -----
+    @contextmanager
+    def _locked_ids_file(self) -> Iterator[Any]:
+        with open(self.ids_file, 'a+b') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield f
+
+    def _read_new_ids(self, f) -> None:
+        """Lit les associations ajoutées depuis la dernière lecture ; f est ouvert et verrouillé"""
+        if f.seek(0, os.SEEK_END) < self._ids_size:
+            # Fichier vidé (clear) depuis la dernière lecture
+            self._ids_size = 0
+        f.seek(self._ids_size)
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8').splitlines():
+            hand_id, _, tournament_id = line.partition(' ')
+            self._tournament_by_hand[hand_id] = tournament_id
+        self._ids_size += end
+        if end < len(data):
+            # Ligne incomplète (arrêt pendant une écriture, verrou tenu par les écrivains) : tronquée
+            logger.warning(f"Truncating incomplete entry at end of {self.ids_file}")
+            f.truncate(self._ids_size)
+
+    def _shard_path(self, tournament_id: str) -> str:
+        return os.path.join(self.shards_dir, self._manifest['tournaments'][tournament_id]['file'])
+
+    def _open_shard(self, tournament_id: str) -> HandLog:
+        shard = HandLog(self._shard_path(tournament_id), payload_format=self.payload_format,
+                        registry=self.registry)
+        self._shards[tournament_id] = shard
+        for hand_id in shard.ids():
+            self._tournament_by_hand[hand_id] = tournament_id
+        return shard
+
+    def _drop_shard(self, tournament_id: str):
+        shard = self._shards.pop(tournament_id, None)
+        if shard is not None:
+            # Index en mémoire uniquement : le fichier a pu être supprimé
+            for hand_id in list(shard.by_id):
+                self._tournament_by_hand.pop(hand_id, None)
+
+    def _shard(self, tournament_id: str, create: bool = False) -> Optional[HandLog]:
+        shard = self._shards.get(tournament_id)
+        if shard is not None or not create:
+            return shard
+        with self._lock:
+            self._load_manifest()
+            if tournament_id not in self._manifest['tournaments']:
+                self._manifest['tournaments'][tournament_id] = {
+                    'file': f"{tournament_id}.log",
+                    'created_at': datetime.now().isoformat()
+                }
+                self._save_manifest()
+            return self._shards.get(tournament_id) or self._open_shard(tournament_id)
+
+    def _shard_list(self) -> List[HandLog]:
+        self._load_manifest()
+        return list(self._shards.values())
+
+    # ----- lecture -----
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shard_list())
+
+    def get(self, hand_id: str) -> Optional[Dict[str, Any]]:
+        tournament_id = self._tournament_by_hand.get(hand_id)
+        if tournament_id is None:
+            # Main inconnue de la table id -> tournoi : peut-être écrite par un autre processus
+            self._load_manifest()
+            with self._lock:
+                with self._locked_ids_file() as f:
+                    self._read_new_ids(f)
+            tournament_id = self._tournament_by_hand.get(hand_id)
+        shard = self._shards.get(tournament_id) if tournament_id else None
+        return shard.get(hand_id) if shard is not None else None
+
+    def get_by_hand_id(self, winamax_hand_id: str) -> List[Dict[str, Any]]:
+        return [h_data for shard in self._shard_list() for h_data in shard.get_by_hand_id(winamax_hand_id)]
+
+    def get_by_number(self, tournament_id: str, hand_number: int) -> Optional[Dict[str, Any]]:
+        shard = self._shard(tournament_id)
+        return shard.get_by_number(tournament_id, hand_number) if shard else None
+
+    def count(self, tournament_id: str) -> int:
+        self._load_manifest()
+        shard = self._shard(tournament_id)
+        return shard.count(tournament_id) if shard else 0
+
+    def tournament_ids(self) -> List[str]:
+        self._load_manifest()
+        return [tournament_id for tournament_id, shard in list(self._shards.items()) if len(shard)]
+
+    def hand_ids(self, tournament_id: str) -> List[str]:
+        self._load_manifest()
+        shard = self._shard(tournament_id)
+        return shard.hand_ids(tournament_id) if shard else []
+
+    def ids(self) -> List[str]:
+        return [hand_id for shard in self._shard_list() for hand_id in shard.ids()]
+
+    def __contains__(self, hand_id: str) -> bool:
+        return self.get(hand_id) is not None
+
+    def by_tournament(self, tournament_id: str, offset: int = 0,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        self._load_manifest()
+        shard = self._shard(tournament_id)
+        return shard.by_tournament(tournament_id, offset, limit) if shard else []
+
+    def snapshot(self, tournament_id: str) -> HandLogView:
+        self._load_manifest()
+        shard = self._shard(tournament_id)
+        return shard.snapshot(tournament_id) if shard else EMPTY_VIEW
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Toutes les mains, shard par shard dans l'ordre de création des tournois"""
+        return [h_data for shard in self._shard_list() for h_data in shard.all()]
+
+    def __iter__(self):
+        return iter(self.all())
+
+    # ----- écriture -----
+    def append(self, hands: List[Dict[str, Any]]) -> None:
+        """Ajoute des mains, regroupées par tournoi dans leur shard"""
+        by_tournament: Dict[str, List[Dict[str, Any]]] = {}
+        for h_data in hands:
+            by_tournament.setdefault(h_data.get('tournament_id', ''), []).append(h_data)
+
+        for tournament_id, group in by_tournament.items():
+            self._shard(tournament_id, create=True).append(group)
+            for h_data in group:
+                self._tournament_by_hand[h_data['id']] = tournament_id
+
+        # Après les shards : une main listée est toujours lisible
+        lines = ''.join(f"{h_data['id']} {h_data.get('tournament_id', '')}\n" for h_data in hands).encode('utf-8')
+        with self._lock:
+            with self._locked_ids_file() as f:
+                self._read_new_ids(f)
+                f.write(lines)
+                self._ids_size += len(lines)
+
+    def delete(self, hand_ids: List[str]) -> int:
+        """Tombstones dans le shard de chaque main"""
+        by_tournament: Dict[str, List[str]] = {}
+        for hand_id in hand_ids:
+            if self.get(hand_id) is not None:
+                by_tournament.setdefault(self._tournament_by_hand[hand_id], []).append(hand_id)
+
+        deleted = 0
+        for tournament_id, group in by_tournament.items():
+            deleted += self._shards[tournament_id].delete(group)
+            for hand_id in group:
+                self._tournament_by_hand.pop(hand_id, None)
+        return deleted
+
+    def delete_tournament(self, tournament_id: str) -> int:
+        """Supprime le shard du tournoi (fichier et entrée du manifeste)"""
+        with self._lock:
+            self._load_manifest()
+            shard = self._shards.get(tournament_id)
+            if shard is None:
+                return 0
+            count = len(shard)
+            path = self._shard_path(tournament_id)
+            del self._manifest['tournaments'][tournament_id]
+            self._save_manifest()
+            self._drop_shard(tournament_id)
+            for file_path in (path, f"{path}.lock"):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            return count
+
+    def rewrite(self, hands: List[Dict[str, Any]]) -> None:
+        """Remplace tout le contenu du stockage"""
+        with self._lock:
+            self.clear()
+            self.append(hands)
+
+    def clear(self) -> None:
+        with self._lock:
+            for tournament_id in list(self._manifest['tournaments']):
+                self.delete_tournament(tournament_id)
+            with self._locked_ids_file() as f:
+                f.truncate(0)
+                self._ids_size = 0
+
+    def size_bytes(self) -> int:
+        return sum(shard.size_bytes() for shard in self._shard_list())
+
+    def sync(self) -> None:
+        for shard in self._shard_list():
+            shard.sync()
+
+    # ----- compaction -----
+    def maybe_compact(self) -> bool:
+        return any([shard.maybe_compact() for shard in self._shard_list()])
+
+    def compact(self) -> Dict[str, Any]:
+        for shard in self._shard_list():
+            shard.compact()
+        return self.stats()
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        for shard in self._shard_list():
+            shard.wait_for_compaction(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques agrégées des shards"""
+        shard_stats = [shard.stats() for shard in self._shard_list()]
+        file_bytes = sum(s['file_bytes'] for s in shard_stats)
+        live_bytes = sum(s['live_bytes'] for s in shard_stats)
+        return {
+            'layout': 'sharded',
+            'payload_format': self.payload_format or 'json',
+            'shards': len(shard_stats),
+            'live_records': sum(s['live_records'] for s in shard_stats),
+            'file_bytes': file_bytes,
+            'live_bytes': live_bytes,
+            'garbage_ratio': round(1 - live_bytes / file_bytes, 4) if file_bytes else 0.0,
+            'compaction': {
+                'running': sum(1 for s in shard_stats if s['compaction']['running']),
+                'runs': sum(s['compaction']['runs'] for s in shard_stats),
+                'bytes_reclaimed': sum(s['compaction']['bytes_reclaimed'] for s in shard_stats)
+            }
+        }
+
+
+def migrate_to_shards(source, shards: ShardedHandStore) -> int:
+    """Copie les mains d'un stockage (HandLog) vers les shards ; retourne le nombre de mains"""
+    count = 0
+    for tournament_id in source.tournament_ids():
+        hands = source.by_tournament(tournament_id)
+        shards.append(hands)
+        count += len(hands)
+        logger.info(f"Migrated {len(hands)} hands of tournament {tournament_id} to its shard")
+    return count
+
+
+def main():
+    """Passe un dossier de données au stockage par tournoi : python -m app.hand_shards"""
+    from .storage import FileStorage
+
+    arg_parser = argparse.ArgumentParser(description="Migration des mains vers un shard par tournoi")
+    arg_parser.add_argument('--data-dir', default='data')
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    storage = FileStorage(args.data_dir, hands_layout='sharded')
+    logger.info(f"Sharded layout ready: {storage.hands.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# hero_rollup.py
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Paliers de buy-in : (borne haute incluse, libellé)
+BUY_IN_TIERS: List[Tuple[float, str]] = [
+    (0.0, 'freeroll'),
+    (2.0, 'micro'),
+    (10.0, 'low'),
+    (50.0, 'mid'),
+    (float('inf'), 'high')
+]
+BREAKDOWNS = ('month', 'tournament_type', 'buy_in_tier')
+
+
+def buy_in_tier(buy_in: float) -> str:
+    for bound, label in BUY_IN_TIERS:
+        if buy_in <= bound:
+            return label
+    return BUY_IN_TIERS[-1][1]
+
+
+class _Bucket:
+    """Agrégats additifs d'un ensemble de tournois (retrait possible)"""
+    __slots__ = ('tournaments', 'hands', 'profit', 'cost', 'positions_sum', 'positions_count', 'itm', 'results')
+
+    def __init__(self):
+        self.tournaments = 0
+        self.hands = 0
+        self.profit = 0.0
+        self.cost = 0.0
+        self.positions_sum = 0
+        self.positions_count = 0
+        self.itm = 0
+        # Profits triés : meilleur et pire résultat restent exacts après un retrait
+        self.results: List[float] = []
+
+    def apply(self, contribution: Tuple, sign: int):
+        profit, cost, position, hands = contribution[5:]
+        self.tournaments += sign
+        self.hands += sign * hands
+        self.profit += sign * profit
+        self.cost += sign * cost
+        if position > 0:
+            self.positions_sum += sign * position
+            self.positions_count += sign
+        if profit > 0:
+            self.itm += sign
+        if sign > 0:
+            insort(self.results, profit)
+        else:
+            del self.results[bisect_left(self.results, profit)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        count = self.tournaments
+        return {
+            'tournaments_played': count,
+            'total_hands': self.hands,
+            'total_profit': round(self.profit, 2),
+            'total_cost': round(self.cost, 2),
+            'avg_profit_per_tournament': round(self.profit / count, 2) if count else 0,
+            'roi_percentage': round(self.profit / self.cost * 100, 2) if self.cost > 0 else 0,
+            'avg_position': round(self.positions_sum / self.positions_count, 1) if self.positions_count else 0,
+            'itm_rate': round(self.itm / count * 100, 1) if count else 0,
+            'best_result': self.results[-1] if self.results else 0,
+            'worst_result': self.results[0] if self.results else 0
+        }
+
+
+class HeroRollup:
+    """
+    Agrégats du tableau de bord par (utilisateur, héros), tenus à jour à
+    chaque écriture au lieu d'être recalculés : un tournoi compte pour un
+    héros dès qu'il contient au moins une de ses mains. Chaque changement
+    retire l'ancienne contribution du tournoi puis ajoute la nouvelle
+    (global, par mois, par type de tournoi, par palier de buy-in).
+
+    Les appels de mise à jour se font sous le verrou d'écriture du stockage ;
+    flush() publie ensuite un dictionnaire immuable par héros modifié, que
+    stats() retourne en O(1) sans verrou.
+    """
+
+    def __init__(self):
+        self.built = False
+        self._rows: Dict[str, Tuple[str, str, str, float, float, float, int]] = {}
+        self._hero_hands: Dict[str, Dict[str, int]] = {}
+        self._buckets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._published: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    # ----- construction -----
+    def build(self, rows: List[Mapping[str, Any]], hero_hands: Dict[str, Dict[str, int]]) -> None:
+        """Construit la rollup depuis les tournois et le nombre de mains par (tournoi, héros)"""
+        self._rows = {}
+        self._hero_hands = {tournament_id: dict(counts) for tournament_id, counts in hero_hands.items()}
+        self._buckets = {}
+        self._published = {}
+        for row in rows:
+            self._rows[row['id']] = self._row_fields(row)
+        for tournament_id in self._rows:
+            for contribution in self._contributions(tournament_id):
+                self._apply(contribution, 1)
+        self.built = True
+        self.flush()
+        logger.info(f"Hero rollup built: {len(self._rows)} tournaments, {len(self._buckets)} heroes")
+
+    def reset(self) -> None:
+        """Invalide la rollup (reconstruite au prochain usage)"""
+        self.built = False
+        self._rows = {}
+        self._hero_hands = {}
+        self._buckets = {}
+        self._dirty = set()
+        self._published = {}
+
+    @staticmethod
+    def _row_fields(row: Mapping[str, Any]) -> Tuple[str, str, str, float, float, float, int]:
+        buy_in = float(row.get('buy_in') or 0.0)
+        total_cost = float(row.get('total_cost') or 0.0) or buy_in * int(row.get('total_entries') or 1)
+        return (
+            row.get('user_id', ''),
+            (row.get('date') or '')[:7],
+            row.get('tournament_type') or 'Unknown',
+            buy_in,
+            float(row.get('profit_loss') or 0.0),
+            total_cost,
+            int(row.get('final_position') or 0)
+        )
+
+    def _contributions(self, tournament_id: str) -> List[Tuple]:
+        """(user, héros, mois, type, palier, profit, coût, position, mains) par héros du tournoi"""
+        fields = self._rows.get(tournament_id)
+        if fields is None:
+            return []
+        user_id, month, tournament_type, buy_in, profit, cost, position = fields
+        tier = buy_in_tier(buy_in)
+        return [(user_id, hero, month, tournament_type, tier, profit, cost, position, hands)
+                for hero, hands in self._hero_hands.get(tournament_id, {}).items() if hands > 0]
+
+    def _apply(self, contribution: Tuple, sign: int):
+        user_id, hero, month, tournament_type, tier = contribution[:5]
+        key = (user_id, hero)
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = self._buckets[key] = {'overall': _Bucket(), 'month': {},
+                                            'tournament_type': {}, 'buy_in_tier': {}}
+        buckets['overall'].apply(contribution, sign)
+        for breakdown, value in (('month', month), ('tournament_type', tournament_type), ('buy_in_tier', tier)):
+            bucket = buckets[breakdown].get(value)
+            if bucket is None:
+                bucket = buckets[breakdown][value] = _Bucket()
+            bucket.apply(contribution, sign)
+            if bucket.tournaments == 0:
+                del buckets[breakdown][value]
+        self._dirty.add(key)
+
+    def _change(self, tournament_id: str, mutate) -> None:
+        """Retire la contribution du tournoi, applique la modification, ajoute la nouvelle"""
+        if not self.built:
+            return
+        for contribution in self._contributions(tournament_id):
+            self._apply(contribution, -1)
+        mutate()
+        for contribution in self._contributions(tournament_id):
+            self._apply(contribution, 1)
+
+    # ----- mises à jour -----
+    def set_tournament(self, tournament_id: str, row: Optional[Mapping[str, Any]]) -> None:
+        """Tournoi créé ou modifié (row) ou supprimé (None)"""
+        def mutate():
+            if row is None:
+                self._rows.pop(tournament_id, None)
+                self._hero_hands.pop(tournament_id, None)
+            else:
+                self._rows[tournament_id] = self._row_fields(row)
+        self._change(tournament_id, mutate)
+
+    def add_hands(self, tournament_id: str, hero_name: str, delta: int) -> None:
+        """Mains du héros ajoutées (delta > 0) ou retirées (delta < 0) dans un tournoi"""
+        def mutate():
+            counts = self._hero_hands.setdefault(tournament_id, {})
+            counts[hero_name] = counts.get(hero_name, 0) + delta
+            if counts[hero_name] <= 0:
+                del counts[hero_name]
+        self._change(tournament_id, mutate)
+
+    def clear_hands(self, tournament_id: str) -> None:
+        self._change(tournament_id, lambda: self._hero_hands.pop(tournament_id, None))
+
+    def flush(self) -> None:
+        """Publie les agrégats des héros modifiés (dictionnaires remplacés, jamais modifiés)"""
+        for key in self._dirty:
+            buckets = self._buckets.get(key)
+            if buckets is None or buckets['overall'].tournaments == 0:
+                self._buckets.pop(key, None)
+                self._published.pop(key, None)
+                continue
+            self._published[key] = {
+                **buckets['overall'].to_dict(),
+                'breakdowns': {
+                    breakdown: {value: bucket.to_dict() for value, bucket in sorted(buckets[breakdown].items())}
+                    for breakdown in BREAKDOWNS
+                }
+            }
+        self._dirty = set()
+
+    # ----- lecture -----
+    def stats(self, user_id: str, hero_name: str) -> Dict[str, Any]:
+        """Agrégats publiés du héros (EMPTY_STATS s'il n'a aucun tournoi)"""
+        return self._published.get((user_id, hero_name), EMPTY_STATS)
+
+
+EMPTY_STATS: Dict[str, Any] = {**_Bucket().to_dict(), 'breakdowns': {breakdown: {} for breakdown in BREAKDOWNS}}
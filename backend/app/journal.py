@@ -0,0 +1,276 @@
+# journal.py
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Any, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Au-delà de cette taille, le journal est vidé dès qu'aucune transaction n'est ouverte
+CHECKPOINT_BYTES = 1024 * 1024
+
+
+class WriteAheadJournal:
+    """
+    Journal d'écriture anticipée des opérations en plusieurs étapes
+    (upload, mise à jour par summary, suppression en cascade).
+
+    Une transaction écrit 'begin' (avec les données utiles à la reprise),
+    d'éventuelles étapes 'step', puis 'commit' ou 'abort'. Au démarrage, chaque
+    transaction restée ouverte est confiée au gestionnaire de son type :
+    annulation ('undo') ou rejeu ('redo'), puis marquée comme récupérée.
+
+    Les fsync sont groupés : un thread d'écriture regroupe les enregistrements
+    en attente (de plusieurs transactions concurrentes) et les rend durables
+    en un seul fsync, précédé de la synchronisation des fichiers de données.
+    Si ce groupe échoue, l'erreur est levée dans chaque appel qui l'attendait.
+    """
+
+    def __init__(self, path: str, group_commit_interval: float = 0.005):
+        self.path = path
+        self.group_commit_interval = group_commit_interval
+
+        self._handlers: Dict[str, Dict[str, Any]] = {}
+        self._sync_hooks: List[Callable[[], None]] = []
+        self._open: Dict[str, Dict[str, Any]] = {}
+
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._written_seq = 0
+        self._durable_seq = 0
+        self._flushed_seq = 0
+        # Groupes non rendus durables : (premier, dernier numéro, erreur)
+        self._failed: List[Tuple[int, int, Exception]] = []
+        self._flusher: Optional[threading.Thread] = None
+        self._recovering = False
+
+        self.stats = {'transactions': 0, 'fsyncs': 0, 'records': 0, 'recovered': 0}
+
+        # Verrou partagé tenu par chaque processus utilisant le journal : la reprise
+        # et la troncature n'ont lieu que si aucun autre processus n'est actif
+        self._lock_file = open(f"{path}.lock", 'a') if fcntl else None
+        self._share()
+
+    def _share(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_SH)
+
+    def _try_exclusive(self) -> bool:
+        if self._lock_file is None:
+            return True
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], None], mode: str = 'undo'):
+        """
+        Associe un gestionnaire de reprise à un type de transaction.
+        'undo' : le gestionnaire annule les effets partiels (aussi appelé si la
+        transaction échoue en cours d'exécution) ; 'redo' : il rejoue l'opération
+        (idempotente) au démarrage.
+        """
+        if mode not in ('undo', 'redo'):
+            raise ValueError(f"Mode de reprise inconnu: {mode}")
+        self._handlers[kind] = {'handler': handler, 'mode': mode}
+
+    def add_sync_hook(self, hook: Callable[[], None]):
+        """Fonction de synchronisation des données appelée avant chaque fsync du journal"""
+        self._sync_hooks.append(hook)
+
+    # ----- écriture groupée -----
+    def _append(self, record: Dict[str, Any], wait: bool) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._cond:
+            self._pending.append(line)
+            self._written_seq += 1
+            seq = self._written_seq
+            self.stats['records'] += 1
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="journal-group-commit",
+                                                 daemon=True)
+                self._flusher.start()
+            self._cond.notify_all()
+            if wait:
+                while self._flushed_seq < seq:
+                    self._cond.wait()
+                for first, last, error in self._failed:
+                    if first <= seq <= last:
+                        raise RuntimeError(f"journal {self.path} non rendu durable: {error}") from error
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Laisser d'autres transactions rejoindre ce groupe
+            time.sleep(self.group_commit_interval)
+            with self._cond:
+                lines = self._pending
+                self._pending = []
+                first = self._flushed_seq + 1
+                seq = self._written_seq
+            error = None
+            try:
+                for hook in self._sync_hooks:
+                    hook()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    start = f.tell()
+                    try:
+                        f.writelines(lines)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    except Exception:
+                        # Pas de ligne partielle : les enregistrements suivants resteraient illisibles
+                        f.truncate(start)
+                        raise
+                self.stats['fsyncs'] += 1
+            except Exception as e:
+                logger.error(f"Error flushing journal {self.path}: {e}")
+                error = e
+            with self._cond:
+                if error is None:
+                    self._durable_seq = seq
+                else:
+                    self._failed.append((first, seq, error))
+                self._flushed_seq = seq
+                self._cond.notify_all()
+
+    # ----- transactions -----
+    def begin(self, kind: str, **data) -> str:
+        """Ouvre une transaction ; 'begin' est durable avant le retour"""
+        txn = str(uuid.uuid4())
+        self._open[txn] = {'kind': kind, 'data': dict(data)}
+        self.stats['transactions'] += 1
+        try:
+            self._append({'txn': txn, 'op': 'begin', 'kind': kind, 'data': data}, wait=True)
+        except Exception:
+            # Rien n'a encore été écrit pour cette transaction
+            self._open.pop(txn, None)
+            raise
+        return txn
+
+    def step(self, txn: str, **data) -> None:
+        """Complète les données de reprise ; durable avant le retour (à appeler avant d'écrire ce qu'elles décrivent)"""
+        self._open[txn]['data'].update(data)
+        self._append({'txn': txn, 'op': 'step', 'data': data}, wait=True)
+
+    def commit(self, txn: str) -> None:
+        """
+        Valide la transaction ; retourne une fois le commit (et les données) durables.
+        En cas d'échec, la transaction reste ouverte : la reprise au démarrage la traitera.
+        """
+        self._append({'txn': txn, 'op': 'commit'}, wait=True)
+        self._open.pop(txn, None)
+        self._maybe_checkpoint()
+
+    def abort(self, txn: str) -> None:
+        self._append({'txn': txn, 'op': 'abort'}, wait=True)
+        self._open.pop(txn, None)
+        self._maybe_checkpoint()
+
+    @contextmanager
+    def transaction(self, kind: str, **data):
+        """Transaction validée en sortie de bloc ; en cas d'exception, annulée (mode 'undo')"""
+        txn = self.begin(kind, **data)
+        try:
+            yield txn
+        except BaseException:
+            entry = self._handlers.get(kind)
+            if entry and entry['mode'] == 'undo':
+                try:
+                    entry['handler'](self._open[txn]['data'])
+                except Exception as e:
+                    # Laissée ouverte : la reprise au démarrage réessaiera
+                    logger.error(f"Error rolling back {kind} transaction {txn}: {e}")
+                    raise
+            self.abort(txn)
+            raise
+        self.commit(txn)
+
+    # ----- reprise -----
+    def _read(self) -> List[Dict[str, Any]]:
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un arrêt brutal
+                    logger.warning(f"Ignoring truncated journal record in {self.path}")
+                    break
+        return records
+
+    def recover(self) -> int:
+        """Annule ou rejoue les transactions restées ouvertes ; retourne leur nombre"""
+        if not self._try_exclusive():
+            # Un autre processus est actif : ses transactions ouvertes sont en cours
+            logger.info(f"Journal {self.path} used by another process, recovery skipped")
+            return 0
+        self._recovering = True
+        try:
+            return self._recover()
+        finally:
+            self._recovering = False
+            self._share()
+
+    def _recover(self) -> int:
+        incomplete: Dict[str, Dict[str, Any]] = {}
+        for record in self._read():
+            txn = record.get('txn')
+            op = record.get('op')
+            if op == 'begin':
+                incomplete[txn] = {'kind': record.get('kind'), 'data': dict(record.get('data') or {})}
+            elif op == 'step' and txn in incomplete:
+                incomplete[txn]['data'].update(record.get('data') or {})
+            elif op in ('commit', 'abort'):
+                incomplete.pop(txn, None)
+
+        recovered = 0
+        unhandled = 0
+        for txn, entry in incomplete.items():
+            handler = self._handlers.get(entry['kind'])
+            if handler is None:
+                logger.warning(f"No recovery handler for {entry['kind']} transaction {txn}")
+                unhandled += 1
+                continue
+            logger.warning(f"Recovering {entry['kind']} transaction {txn} ({handler['mode']}): {entry['data']}")
+            handler['handler'](entry['data'])
+            self._append({'txn': txn, 'op': 'abort' if handler['mode'] == 'undo' else 'commit',
+                          'recovered': True}, wait=True)
+            recovered += 1
+
+        self.stats['recovered'] += recovered
+        if not unhandled:
+            self._maybe_checkpoint(force=True)
+        return recovered
+
+    def _maybe_checkpoint(self, force: bool = False):
+        """Vide le journal quand aucune transaction n'est ouverte"""
+        with self._cond:
+            if self._open or self._pending or self._durable_seq < self._written_seq:
+                return
+            if self._recovering and not force:
+                return
+            if not os.path.exists(self.path):
+                return
+            if not (force or os.path.getsize(self.path) > CHECKPOINT_BYTES):
+                return
+            if not self._try_exclusive():
+                return
+            try:
+                open(self.path, 'w').close()
+            finally:
+                self._share()
@@ -1,7 +1,8 @@
 # main.py
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Optional
 import uvicorn
 import os
 import sys
@@ -19,7 +20,13 @@ load_dotenv()
 
 from .storage import storage
 from .models import Tournament, TournamentSummary
-from .services.winamax_parser import WinamaxParser
+from .services.tournament_importer import TournamentImporter, parse_summary
+from .services.archive_import import ArchiveImporter, archive_kind
+from .services.chunked_upload import ChunkedUploads, MAX_CHUNK_SIZE
+from .services.summary_matcher import SummaryMatcher
+from .hand_index import STREETS
+from .tournament_index import PROFIT_SIGNS, SORT_OPTIONS
+from .hero_rollup import BREAKDOWNS
 
 app = FastAPI(
     title="Poker Tournament Replay API",
@@ -35,8 +42,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-parser_service = WinamaxParser()
 DEFAULT_USER_ID = "default_user"
+importer = TournamentImporter(storage, DEFAULT_USER_ID)
+# Processus de parsing des archives uploadées
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+chunked_uploads = ChunkedUploads(storage, DEFAULT_USER_ID, os.path.join(storage.data_dir, "uploads"))
+summary_matcher = SummaryMatcher(storage, DEFAULT_USER_ID, workers=IMPORT_WORKERS)
 
 @app.get("/")
 async def root():
@@ -57,66 +68,9 @@ async def upload_tournament(file: UploadFile = File(...)):
         content_str = content.decode('utf-8')
         logger.info(f"File read successfully - size: {len(content_str)} characters")
         
-        # Parser les informations du tournoi
-        tournament_data = parser_service.parse_tournament_file(content_str)
-        logger.info(f"Tournament data parsed: {tournament_data}")
-        
-        # ✅ VÉRIFICATION: Contrôler si le tournoi existe déjà
-        existing_tournament = storage.get_existing_tournament(
-            name=tournament_data['name'],
-            date=tournament_data['date'],
-            user_id=DEFAULT_USER_ID
-        )
-        
-        if existing_tournament:
-            logger.warning(f"Tournament already exists: {tournament_data['name']} on {tournament_data['date']}")
-            
-            # Compter les mains existantes
-            existing_hands = storage.get_hands_by_tournament(existing_tournament.id)
-            
-            return {
-                "tournament_id": existing_tournament.id,
-                "name": existing_tournament.name,
-                "total_hands": len(existing_hands),
-                "tournament_type": existing_tournament.tournament_type,
-                "message": "Ce tournoi est déjà présent dans votre collection",
-                "status": "exists",
-                "existing": True
-            }
-        
-        # Si le tournoi n'existe pas, le créer
-        tournament = storage.create_tournament(
-            user_id=DEFAULT_USER_ID,
-            name=tournament_data['name'],
-            date=tournament_data['date'],
-            buy_in=tournament_data['buy_in'],
-            fee=tournament_data['fee'],
-            total_players=tournament_data.get('total_players', 0),
-            final_position=tournament_data.get('final_position', 0),
-            profit_loss=tournament_data['profit_loss'],
-            tournament_type=tournament_data.get('tournament_type', 'Unknown')
-        )
-        logger.info(f"Tournament created with ID: {tournament.id}")
-        
-        # Parser et sauvegarder toutes les mains
-        hands_data = parser_service.extract_hands(content_str)
-        logger.info(f"Extracted {len(hands_data)} hands")
-        
-        for i, hand_data in enumerate(hands_data):
-            try:
-                storage.create_hand(tournament.id, hand_data)
-            except Exception as e:
-                logger.error(f"Error creating hand {i}: {e}")
-        
-        result = {
-            "tournament_id": tournament.id,
-            "name": tournament.name,
-            "total_hands": len(hands_data),
-            "tournament_type": tournament_data.get('tournament_type', 'Unknown'),
-            "message": "Tournoi uploadé et parsé avec succès",
-            "status": "created",
-            "existing": False
-        }
+        # Parsing et écriture hors de la boucle d'événements : les lectures
+        # (servies par le snapshot du stockage) ne sont jamais bloquées par un upload
+        result = await run_in_threadpool(_ingest_tournament, content_str)
         logger.info(f"Upload successful: {result}")
         return result
         
@@ -124,6 +78,123 @@ async def upload_tournament(file: UploadFile = File(...)):
         logger.error(f"Error during upload: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erreur lors du parsing: {str(e)}")
 
+def _ingest_tournament(content_str: str) -> Dict[str, Any]:
+    """Parse un fichier de tournoi et l'enregistre avec ses mains (exécuté dans un thread)"""
+    return importer.import_tournament(content_str)
+
+@app.post("/api/tournaments/upload-archive")
+async def upload_archive(file: UploadFile = File(...)):
+    """Upload d'une archive (.zip, .tar.gz) d'historiques et de summaries Winamax"""
+    logger.info(f"Archive upload request received - filename: {file.filename}")
+    
+    if not file.filename or archive_kind(file.filename) is None:
+        raise HTTPException(status_code=400, detail="Seules les archives .zip, .tar.gz et .tar sont acceptées")
+    
+    try:
+        # Archive lue en flux depuis le fichier temporaire de l'upload (jamais chargée entièrement)
+        archive_importer = ArchiveImporter(storage, DEFAULT_USER_ID, workers=IMPORT_WORKERS)
+        report = await run_in_threadpool(archive_importer.import_archive, file.file, file.filename)
+        logger.info(f"Archive {file.filename} imported: {report['tournaments_created']} tournaments created, "
+                    f"{report['errors']} errors")
+        return report
+        
+    except ValueError as e:
+        logger.error(f"Invalid archive {file.filename}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error during archive upload: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de l'import de l'archive: {str(e)}")
+
+@app.post("/api/uploads")
+async def create_upload_session(filename: str, size: Optional[int] = None):
+    """Ouvre un upload reprenable par morceaux (PUT /api/uploads/{id}?offset=N, puis finalize)"""
+    if not filename.endswith('.txt'):
+        raise HTTPException(status_code=400, detail="Seuls les fichiers .txt sont acceptés")
+    if size is not None and size < 0:
+        raise HTTPException(status_code=400, detail="Taille invalide")
+    
+    return await run_in_threadpool(chunked_uploads.create, filename, size)
+
+@app.get("/api/uploads/{session_id}")
+async def get_upload_session(session_id: str):
+    """État d'un upload : offset à partir duquel reprendre l'envoi"""
+    status = await run_in_threadpool(chunked_uploads.status, session_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Session d'upload non trouvée")
+    return status
+
+@app.put("/api/uploads/{session_id}")
+async def upload_chunk(session_id: str, offset: int, request: Request):
+    """Ajoute un morceau du fichier (corps brut) commençant à l'octet offset"""
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Offset invalide")
+    
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_CHUNK_SIZE:
+            raise HTTPException(status_code=413, detail=f"Morceau trop volumineux (maximum {MAX_CHUNK_SIZE} octets)")
+        chunks.append(chunk)
+    
+    try:
+        status = await run_in_threadpool(chunked_uploads.write_chunk, session_id, offset, b''.join(chunks))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error writing chunk for upload {session_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de l'upload: {str(e)}")
+    
+    if status is None:
+        raise HTTPException(status_code=404, detail="Session d'upload non trouvée")
+    return status
+
+@app.post("/api/uploads/{session_id}/finalize")
+async def finalize_upload(session_id: str):
+    """Termine un upload par morceaux : les mains sont déjà enregistrées au fil de l'envoi"""
+    try:
+        result = await run_in_threadpool(chunked_uploads.finalize, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error finalizing upload {session_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du parsing: {str(e)}")
+    
+    if result is None:
+        raise HTTPException(status_code=404, detail="Session d'upload non trouvée")
+    logger.info(f"Chunked upload successful: {result}")
+    return result
+
+@app.delete("/api/uploads/{session_id}")
+async def abort_upload(session_id: str):
+    """Abandonne un upload par morceaux (le tournoi en cours de création est supprimé)"""
+    if not await run_in_threadpool(chunked_uploads.abort, session_id):
+        raise HTTPException(status_code=404, detail="Session d'upload non trouvée")
+    return {"message": "Upload abandonné"}
+
+@app.post("/api/tournaments/summaries")
+async def update_tournaments_summaries(files: List[UploadFile] = File(...)):
+    """Met à jour plusieurs tournois depuis leurs fichiers summary (association automatique)"""
+    logger.info(f"Bulk summary update called with {len(files)} files")
+    
+    contents = []
+    for file in files:
+        if not file.filename or not file.filename.endswith('.txt'):
+            raise HTTPException(status_code=400, detail=f"Seuls les fichiers .txt sont acceptés ({file.filename})")
+        try:
+            contents.append((file.filename, (await file.read()).decode('utf-8')))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail=f"Fichier illisible (UTF-8 attendu) : {file.filename}")
+    
+    try:
+        result = await run_in_threadpool(summary_matcher.update_from_summaries, contents)
+        logger.info(f"{result['updated']} tournaments updated from {result['total_files']} summaries")
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error updating tournament summaries: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la mise à jour: {str(e)}")
+
 @app.post("/api/tournaments/{tournament_id}/update-summary")
 async def update_tournament_summary(tournament_id: str, file: UploadFile = File(...)):
     """Met à jour un tournoi avec les données du fichier summary"""
@@ -142,25 +213,13 @@ async def update_tournament_summary(tournament_id: str, file: UploadFile = File(
         content_str = content.decode('utf-8')
         
         # Parser le fichier summary
-        summary_data = parser_service.parse_summary_file(content_str)
+        summary_data = parse_summary(content_str)
         logger.info(f"Summary data parsed: {summary_data}")
         
         # Mettre à jour le tournoi avec les nouvelles données
         if summary_data:
-            updated_tournament = storage.update_tournament(
-                tournament_id=tournament_id,
-                final_position=summary_data.get('final_position', tournament.final_position),
-                total_players=summary_data.get('total_players', tournament.total_players),
-                profit_loss=summary_data.get('profit_loss', tournament.profit_loss),
-                buy_in=summary_data.get('buy_in', tournament.buy_in),
-                fee=0,
-                late_registration_count=summary_data.get('late_registration_count', 0),
-                re_entries_count=summary_data.get('re_entries_count', 0),
-                total_entries=summary_data.get('entries_count', 1),
-                total_cost=summary_data.get('total_cost', tournament.buy_in),
-                total_winnings=summary_data.get('combined_winnings', 0.0)  # ✅ Nouveau
-            )
-            
+            # Journalisée : rejouée au redémarrage si le processus s'arrête en cours
+            await run_in_threadpool(importer.apply_summary, tournament_id, summary_data)
             logger.info(f"Tournament {tournament_id} updated successfully")
         
         return {
@@ -172,21 +231,76 @@ async def update_tournament_summary(tournament_id: str, file: UploadFile = File(
         logger.error(f"Error updating tournament summary: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erreur lors de la mise à jour: {str(e)}")
 
+def _parse_date_bound(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    """Borne de date ISO ; une date seule (AAAA-MM-JJ) couvre toute la journée"""
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            day = datetime.fromisoformat(value)
+            return day.replace(hour=23, minute=59, second=59, microsecond=999999) if end_of_day else day
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Date invalide: {value}")
+
 @app.get("/api/tournaments")
-async def get_tournaments():
-    logger.info("Get tournaments called")
+async def get_tournaments(date_from: Optional[str] = None,
+                          date_to: Optional[str] = None,
+                          tournament_type: Optional[str] = None,
+                          buy_in_min: Optional[float] = None,
+                          buy_in_max: Optional[float] = None,
+                          profit: Optional[str] = None,
+                          q: Optional[str] = None,
+                          sort: str = "date_desc",
+                          cursor: Optional[str] = None,
+                          limit: Optional[int] = None):
+    """
+    Liste des tournois filtrée, triée et paginée côté serveur.
+    date_from / date_to : dates ISO (AAAA-MM-JJ inclut toute la journée) ;
+    profit : positive, negative ou zero ; q : sous-chaîne du nom ;
+    sort : date, profit, position, hands, buy_in ou name suivi de _desc/_asc.
+    Sans limit, tous les tournois correspondants sont retournés.
+    """
+    logger.info(f"Get tournaments called - sort: {sort}, cursor: {cursor}, limit: {limit}")
+    
+    if sort not in SORT_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Tri invalide, valeurs possibles: {', '.join(SORT_OPTIONS)}")
+    if profit is not None and profit not in PROFIT_SIGNS:
+        raise HTTPException(status_code=400, detail=f"profit invalide, valeurs possibles: {', '.join(PROFIT_SIGNS)}")
+    if limit is not None and (limit < 1 or limit > 500):
+        raise HTTPException(status_code=400, detail="limit doit être compris entre 1 et 500")
+    
+    try:
+        result = storage.query_tournaments(
+            DEFAULT_USER_ID,
+            date_from=_parse_date_bound(date_from),
+            date_to=_parse_date_bound(date_to, end_of_day=True),
+            tournament_type=tournament_type,
+            buy_in_min=buy_in_min,
+            buy_in_max=buy_in_max,
+            profit=profit,
+            name=q,
+            sort=sort,
+            cursor=cursor,
+            limit=limit
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Curseur invalide: {str(e)}")
+    
     try:
-        tournaments = storage.get_tournaments_by_user(DEFAULT_USER_ID)
-        logger.info(f"Found {len(tournaments)} tournaments")
+        tournaments = result['tournaments']
+        logger.info(f"Found {len(tournaments)} tournaments (total: {result['total']})")
         
         tournament_summaries = []
         for tournament in tournaments:
             try:
-                hands = storage.get_hands_by_tournament(tournament.id)
+                # Compte via l'index et première main seulement pour le héros
+                total_hands = storage.count_hands(tournament.id)
+                first_hand = storage.get_hands_page(tournament.id, 0, 1)
                 
                 hero_name = "Unknown"
-                if hands and len(hands) > 0:
-                    hero_name = hands[0].hero_name or "Unknown"
+                if first_hand:
+                    hero_name = first_hand[0].hero_name or "Unknown"
                 
                 tournament_summary = {
                     "id": tournament.id,
@@ -194,7 +308,7 @@ async def get_tournaments():
                     "date": tournament.date.isoformat(),
                     "buy_in": tournament.buy_in,
                     "fee": tournament.fee,
-                    "total_hands": len(hands),
+                    "total_hands": total_hands,
                     "hero_name": hero_name,
                     "final_position": tournament.final_position,
                     "profit_loss": tournament.profit_loss,
@@ -212,7 +326,12 @@ async def get_tournaments():
                 logger.error(f"Error processing tournament {tournament.id}: {e}")
                 continue
         
-        return tournament_summaries
+        return {
+            "tournaments": tournament_summaries,
+            "total": result['total'],
+            "limit": limit,
+            "next_cursor": result['next_cursor']
+        }
         
     except Exception as e:
         logger.error(f"Error in get_tournaments: {e}")
@@ -226,15 +345,16 @@ async def get_tournament(tournament_id: str):
         if not tournament:
             raise HTTPException(status_code=404, detail="Tournoi non trouvé")
         
-        hands = storage.get_hands_by_tournament(tournament_id)
+        total_hands = storage.count_hands(tournament_id)
+        first_hand = storage.get_hands_page(tournament_id, 0, 1)
         
         hero_name = "Unknown"
-        if hands and len(hands) > 0:
-            hero_name = hands[0].hero_name or "Unknown"
+        if first_hand:
+            hero_name = first_hand[0].hero_name or "Unknown"
         
         return {
             "tournament": tournament.to_dict(),
-            "total_hands": len(hands),
+            "total_hands": total_hands,
             "hero_name": hero_name
         }
         
@@ -252,18 +372,17 @@ async def get_tournament_hands(tournament_id: str, page: int = 1, limit: int = 2
         if not tournament:
             raise HTTPException(status_code=404, detail="Tournoi non trouvé")
         
-        hands = storage.get_hands_by_tournament(tournament_id)
-        
+        # Seules les mains de la page sont lues
+        total = storage.count_hands(tournament_id)
         start = (page - 1) * limit
-        end = start + limit
-        paginated_hands = hands[start:end]
+        paginated_hands = storage.get_hands_page(tournament_id, start, limit)
         
         return {
             "hands": [hand.to_dict() for hand in paginated_hands],
-            "total": len(hands),
+            "total": total,
             "page": page,
             "limit": limit,
-            "total_pages": (len(hands) + limit - 1) // limit
+            "total_pages": (total + limit - 1) // limit
         }
         
     except HTTPException:
@@ -272,6 +391,228 @@ async def get_tournament_hands(tournament_id: str, page: int = 1, limit: int = 2
         logger.error(f"Error in get_tournament_hands: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur lors du chargement des mains: {str(e)}")
 
+@app.get("/api/tournaments/{tournament_id}/stack-timeline")
+async def get_tournament_stack_timeline(tournament_id: str):
+    """Évolution du stack du héros (stack, BB, M-ratio, niveau) main par main"""
+    logger.info(f"Get stack timeline called for ID: {tournament_id}")
+    try:
+        tournament = storage.get_tournament_by_id(tournament_id)
+        if not tournament:
+            raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+        
+        return storage.get_stack_timeline(tournament_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_tournament_stack_timeline: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul de la timeline: {str(e)}")
+
+@app.get("/api/tournaments/{tournament_id}/replays")
+async def get_tournament_replays(tournament_id: str, page: int = 1, limit: int = 20):
+    """Timelines de replay précalculées, paginées comme /hands pour le préchargement"""
+    logger.info(f"Get tournament replays called for ID: {tournament_id}, page: {page}, limit: {limit}")
+    try:
+        tournament = storage.get_tournament_by_id(tournament_id)
+        if not tournament:
+            raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+        
+        # Seules les timelines de la page sont lues (stockées avec les mains)
+        total = storage.count_hands(tournament_id)
+        start = (page - 1) * limit
+        replays = await run_in_threadpool(storage.get_replays_by_tournament, tournament_id, start, limit)
+        
+        return {
+            "replays": replays,
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "total_pages": (total + limit - 1) // limit
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_tournament_replays: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du chargement des replays: {str(e)}")
+
+@app.get("/api/hands/search")
+async def search_hands(position: Optional[str] = None,
+                       hole_cards: Optional[str] = None,
+                       street: Optional[str] = None,
+                       showdown: Optional[bool] = None,
+                       min_pot_bb: Optional[float] = None,
+                       max_pot_bb: Optional[float] = None,
+                       level: Optional[int] = None,
+                       min_level: Optional[int] = None,
+                       max_level: Optional[int] = None,
+                       date_from: Optional[datetime] = None,
+                       date_to: Optional[datetime] = None,
+                       tournament_type: Optional[str] = None,
+                       hero: Optional[str] = None,
+                       cursor: Optional[str] = None,
+                       limit: int = 50):
+    """
+    Recherche multi-critères des mains.
+    position et hole_cards acceptent plusieurs valeurs séparées par des virgules
+    (ex: position=BTN,CO&hole_cards=pair,AKs). street filtre les mains ayant
+    atteint au moins cette street.
+    """
+    logger.info(f"Search hands called - position: {position}, hole_cards: {hole_cards}, street: {street}")
+    
+    if street is not None and street not in STREETS:
+        raise HTTPException(status_code=400, detail=f"Street invalide, valeurs possibles: {', '.join(STREETS)}")
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="limit doit être compris entre 1 et 500")
+    
+    try:
+        return storage.search_hands(
+            positions=[p.strip() for p in position.split(',') if p.strip()] if position else None,
+            hole_cards=[c.strip() for c in hole_cards.split(',') if c.strip()] if hole_cards else None,
+            min_street=street,
+            showdown=showdown,
+            min_pot_bb=min_pot_bb,
+            max_pot_bb=max_pot_bb,
+            min_level=level if level is not None else min_level,
+            max_level=level if level is not None else max_level,
+            date_from=date_from,
+            date_to=date_to,
+            tournament_type=tournament_type,
+            hero_name=hero,
+            cursor=cursor,
+            limit=limit
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Curseur invalide: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error in search_hands: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la recherche: {str(e)}")
+
+@app.get("/api/hands/text-search")
+async def search_hands_text(q: Optional[str] = None, player: Optional[str] = None,
+                            tournament_id: Optional[str] = None,
+                            limit: int = 50, offset: int = 0):
+    """
+    Recherche plein texte dans l'historique des mains.
+    q : termes combinés en ET, phrases exactes entre guillemets (ex: "collected" "raises 50 to 100")
+    player : nom exact d'un joueur présent à la table
+    """
+    logger.info(f"Text search called - q: {q}, player: {player}")
+    
+    if not q and not player:
+        raise HTTPException(status_code=400, detail="Paramètre q ou player requis")
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="limit doit être compris entre 1 et 500")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset doit être positif ou nul")
+    
+    try:
+        return await run_in_threadpool(storage.search_hands_text, query=q, player=player,
+                                       tournament_id=tournament_id, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Requête invalide: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error in search_hands_text: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la recherche plein texte: {str(e)}")
+
+@app.get("/api/hands/{hand_id}")
+async def get_hand(hand_id: str):
+    logger.info(f"Get hand called for ID: {hand_id}")
+    try:
+        hand = storage.get_hand_by_id(hand_id)
+        if not hand:
+            raise HTTPException(status_code=404, detail="Main non trouvée")
+        
+        return hand.to_dict()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_hand: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du chargement de la main: {str(e)}")
+
+@app.get("/api/hands/{hand_id}/replay")
+async def get_hand_replay(hand_id: str):
+    """Timeline de replay précalculée d'une main"""
+    logger.info(f"Get hand replay called for ID: {hand_id}")
+    try:
+        replay = await run_in_threadpool(storage.get_hand_replay, hand_id)
+        if not replay:
+            raise HTTPException(status_code=404, detail="Main non trouvée")
+        
+        return replay
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_hand_replay: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du chargement du replay: {str(e)}")
+
+@app.get("/api/heroes/{hero_name}/stats")
+async def get_hero_stats(hero_name: str, breakdown: Optional[str] = None):
+    """
+    Statistiques globales du héros (ROI, ITM, position moyenne, meilleur et
+    pire résultat), lues dans la rollup maintenue à chaque écriture.
+    breakdown : liste séparée par des virgules parmi month, tournament_type, buy_in_tier.
+    """
+    logger.info(f"Get hero stats called for: {hero_name}, breakdown: {breakdown}")
+    
+    breakdowns = [b.strip() for b in breakdown.split(',') if b.strip()] if breakdown else []
+    unknown = [b for b in breakdowns if b not in BREAKDOWNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Détail invalide, valeurs possibles: {', '.join(BREAKDOWNS)}")
+    
+    try:
+        stats = await run_in_threadpool(storage.get_hero_overall_stats, hero_name, DEFAULT_USER_ID, breakdowns)
+        if not stats:
+            raise HTTPException(status_code=500, detail="Erreur lors du calcul des statistiques")
+        if not stats['tournaments_played']:
+            raise HTTPException(status_code=404, detail="Aucun tournoi trouvé pour ce joueur")
+        
+        return stats
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_hero_stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul des statistiques: {str(e)}")
+
+@app.get("/api/heroes/{hero_name}/hand-stats")
+async def get_hero_hand_stats(hero_name: str, tournament_id: Optional[str] = None):
+    """Statistiques main par main du héros (VPIP, PFR, showdown, gains en BB, par position)"""
+    logger.info(f"Get hero hand stats called for: {hero_name}, tournament: {tournament_id}")
+    try:
+        stats = storage.get_hero_hand_stats(hero_name, tournament_id)
+        if not stats.get('hands'):
+            raise HTTPException(status_code=404, detail="Aucune main trouvée pour ce joueur")
+        
+        return stats
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_hero_hand_stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul des statistiques: {str(e)}")
+
+@app.get("/api/storage/compaction")
+async def get_compaction_stats():
+    """Métriques du journal de mains : octets vivants, proportion de déchets, compaction"""
+    try:
+        return storage.get_compaction_stats()
+    except Exception as e:
+        logger.error(f"Error in get_compaction_stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la lecture des métriques: {str(e)}")
+
+@app.post("/api/storage/compaction")
+async def compact_storage():
+    """Déclenche une compaction du journal de mains"""
+    logger.info("Hand log compaction requested")
+    try:
+        return storage.compact_hands()
+    except Exception as e:
+        logger.error(f"Error in compact_storage: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la compaction: {str(e)}")
+
 @app.delete("/api/tournaments/{tournament_id}")
 async def delete_tournament(tournament_id: str):
     """Supprime un tournoi et toutes ses mains associées"""
@@ -289,41 +630,14 @@ async def delete_tournament(tournament_id: str):
             logger.warning(f"Unauthorized delete attempt for tournament: {tournament_id}")
             raise HTTPException(status_code=403, detail="Non autorisé à supprimer ce tournoi")
         
-        # Supprimer toutes les mains associées d'abord
-        hands = storage.get_hands_by_tournament(tournament_id)
-        hands_count = len(hands)
-        
-        logger.info(f"Deleting {hands_count} hands for tournament {tournament_id}")
-        
-        # Supprimer les mains une par une (si votre storage a une méthode delete_hand)
-        # ou en batch (si votre storage a une méthode delete_hands_by_tournament)
-        try:
-            # Essayer d'abord avec une méthode batch si elle existe
-            if hasattr(storage, 'delete_hands_by_tournament'):
-                storage.delete_hands_by_tournament(tournament_id)
-            elif hasattr(storage, 'delete_hand'):
-                # Sinon supprimer une par une
-                for hand in hands:
-                    storage.delete_hand(hand.id)
-            else:
-                logger.warning("No delete method found for hands, attempting direct deletion")
-                
-        except Exception as e:
-            logger.error(f"Error deleting hands for tournament {tournament_id}: {e}")
-            raise HTTPException(status_code=500, detail=f"Erreur lors de la suppression des mains: {str(e)}")
-        
-        # Supprimer le tournoi
+        # Suppression en cascade (mains, analyses, statistiques, tournoi) en une passe par fichier
         try:
-            if hasattr(storage, 'delete_tournament'):
-                storage.delete_tournament(tournament_id)
-            else:
-                logger.error("No delete_tournament method found in storage")
-                raise HTTPException(status_code=500, detail="Méthode de suppression non implémentée")
-                
+            result = await run_in_threadpool(storage.delete_tournament_and_hands, tournament_id)
         except Exception as e:
             logger.error(f"Error deleting tournament {tournament_id}: {e}")
             raise HTTPException(status_code=500, detail=f"Erreur lors de la suppression du tournoi: {str(e)}")
         
+        hands_count = result["hands_deleted"]
         logger.info(f"Tournament {tournament_id} and {hands_count} hands deleted successfully")
         
         return {
@@ -100,6 +100,8 @@ class Hand:
     # Champs additionnels pour plus de précision
     small_blind: int = 0
     big_blind: int = 0
+    # Métriques dérivées calculées à l'ingestion (voir services/hand_metrics.py)
+    metrics: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self):
         return {
@@ -132,9 +134,189 @@ class Hand:
             'summary': self.summary,
             'pot_size': self.pot_size,
             'rake': self.rake,
-            'raw_text': self.raw_text
+            'raw_text': self.raw_text,
+            'metrics': self.metrics
         }
 
+class HandRecord:
+    """
+    Main en lecture, hydratée paresseusement depuis sa forme sérialisée (dict).
+    Les champs scalaires sont copiés dans des slots ; les joueurs, les actions
+    par street, le texte brut et la date ne sont décodés qu'au premier accès.
+    """
+
+    SCALAR_FIELDS = (
+        'id', 'tournament_id', 'hand_id', 'hand_number', 'level', 'blinds', 'ante',
+        'small_blind', 'big_blind', 'table_name', 'max_players', 'button_seat',
+        'hero_name', 'hero_position', 'hole_cards', 'pot_size', 'rake',
+        'flop', 'turn', 'river'
+    )
+    LIST_FIELDS = (
+        'ante_blinds_actions', 'preflop_actions', 'flop_actions', 'turn_actions',
+        'river_actions', 'showdown', 'summary'
+    )
+
+    __slots__ = SCALAR_FIELDS + ('_data', '_players', '_date')
+
+    def __init__(self, data: Dict[str, Any]):
+        self.id = data.get('id', '')
+        self.tournament_id = data.get('tournament_id', '')
+        self.hand_id = data.get('hand_id', '')
+        self.hand_number = data.get('hand_number', 0)
+        self.level = data.get('level', 1)
+        self.blinds = data.get('blinds', '')
+        self.ante = data.get('ante', 0)
+        self.small_blind = data.get('small_blind', 0)
+        self.big_blind = data.get('big_blind', 0)
+        self.table_name = data.get('table_name', '')
+        self.max_players = data.get('max_players', 0)
+        self.button_seat = data.get('button_seat', 0)
+        self.hero_name = data.get('hero_name', '')
+        self.hero_position = data.get('hero_position', '')
+        self.hole_cards = data.get('hole_cards', '')
+        self.pot_size = data.get('pot_size', 0)
+        self.rake = data.get('rake', 0)
+        self.flop = data.get('flop')
+        self.turn = data.get('turn')
+        self.river = data.get('river')
+
+        self._data = data
+        self._players: Optional[List[Player]] = None
+        self._date: Optional[datetime] = None
+
+    @property
+    def players(self) -> List[Player]:
+        if self._players is None:
+            self._players = [
+                Player(
+                    name=p.get('name', ''),
+                    seat=p.get('seat', 0),
+                    stack=p.get('stack', 0),
+                    bounty=p.get('bounty', 0.0)
+                )
+                for p in self._data.get('players', []) if isinstance(p, dict)
+            ]
+        return self._players
+
+    @property
+    def date(self) -> datetime:
+        if self._date is None:
+            value = self._data.get('date')
+            if isinstance(value, datetime):
+                self._date = value
+            else:
+                try:
+                    self._date = datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    self._date = datetime.now()
+        return self._date
+
+    @property
+    def date_key(self) -> str:
+        """Date ISO brute, triable sans décodage"""
+        value = self._data.get('date')
+        return value.isoformat() if isinstance(value, datetime) else (value or '')
+
+    @property
+    def raw_text(self) -> str:
+        return self._data.get('raw_text', '')
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return self._data.get('metrics') or {}
+
+    @property
+    def ante_blinds_actions(self) -> List[str]:
+        return self._data.get('ante_blinds_actions') or []
+
+    @property
+    def preflop_actions(self) -> List[str]:
+        return self._data.get('preflop_actions') or []
+
+    @property
+    def flop_actions(self) -> List[str]:
+        return self._data.get('flop_actions') or []
+
+    @property
+    def turn_actions(self) -> List[str]:
+        return self._data.get('turn_actions') or []
+
+    @property
+    def river_actions(self) -> List[str]:
+        return self._data.get('river_actions') or []
+
+    @property
+    def showdown(self) -> List[str]:
+        return self._data.get('showdown') or []
+
+    @property
+    def summary(self) -> List[str]:
+        return self._data.get('summary') or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Même forme que Hand.to_dict(), sans hydrater les champs paresseux"""
+        if self._players is not None:
+            players = [player.to_dict() for player in self._players]
+        else:
+            players = [
+                {
+                    'name': p.get('name', ''),
+                    'seat': p.get('seat', 0),
+                    'stack': p.get('stack', 0),
+                    'bounty': p.get('bounty', 0.0)
+                }
+                for p in self._data.get('players', []) if isinstance(p, dict)
+            ]
+
+        if self._date is not None or not self.date_key:
+            date = self.date.isoformat()
+        else:
+            date = self.date_key
+
+        return {
+            'id': self.id,
+            'tournament_id': self.tournament_id,
+            'hand_id': self.hand_id,
+            'hand_number': self.hand_number,
+            'level': self.level,
+            'blinds': self.blinds,
+            'ante': self.ante,
+            'small_blind': self.small_blind,
+            'big_blind': self.big_blind,
+            'date': date,
+            'table_name': self.table_name,
+            'max_players': self.max_players,
+            'button_seat': self.button_seat,
+            'players': players,
+            'hero_name': self.hero_name,
+            'hero_position': self.hero_position,
+            'hole_cards': self.hole_cards,
+            'ante_blinds_actions': self.ante_blinds_actions,
+            'preflop_actions': self.preflop_actions,
+            'flop': self.flop,
+            'flop_actions': self.flop_actions,
+            'turn': self.turn,
+            'turn_actions': self.turn_actions,
+            'river': self.river,
+            'river_actions': self.river_actions,
+            'showdown': self.showdown,
+            'summary': self.summary,
+            'pot_size': self.pot_size,
+            'rake': self.rake,
+            'raw_text': self.raw_text,
+            'metrics': self.metrics
+        }
+
+    def to_hand(self) -> Hand:
+        """Hydrate complètement la main en dataclass Hand"""
+        return Hand(
+            players=self.players,
+            date=self.date,
+            raw_text=self.raw_text,
+            metrics=self.metrics,
+            **{name: getattr(self, name) for name in self.SCALAR_FIELDS + self.LIST_FIELDS}
+        )
+
 @dataclass
 class TournamentSummary:
     id: str
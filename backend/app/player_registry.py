@@ -0,0 +1,239 @@
+# player_registry.py
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+
+from .serialization import Codec
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Champs des mains contenant des lignes d'action ("<joueur> <action>")
+ACTION_FIELDS = (
+    'ante_blinds_actions', 'preflop_actions', 'flop_actions', 'turn_actions',
+    'river_actions', 'showdown'
+)
+
+
+class PlayerRegistry:
+    """
+    Registre des joueurs : chaque pseudo reçoit un identifiant entier compact,
+    attribué une seule fois. Les mains, replays et statistiques sont stockés
+    avec ces identifiants et résolus en pseudos à la lecture ; tous les pseudos
+    lus sont alors les mêmes objets str (un par joueur, partagés en mémoire).
+
+    Fichier en ajout seul, un pseudo JSON par ligne (l'identifiant est le
+    numéro de ligne), partagé par les processus utilisant le même dossier de
+    données : un nouveau pseudo est ajouté sous verrou de fichier, après
+    relecture des lignes ajoutées par les autres. Le fichier est rendu durable
+    (sync) avant que les données qui référencent ses pseudos ne soient écrites.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._size = 0  # octets des lignes complètes déjà lues
+        self._dirty = False
+        self.created = not os.path.exists(path)
+        if not self.created:
+            self.refresh()
+
+    def _read_new(self, f) -> None:
+        """Lit les lignes ajoutées depuis la dernière lecture ; f est ouvert et verrouillé"""
+        f.seek(self._size)
+        data = f.read()
+        offset = 0
+        while True:
+            newline = data.find(b'\n', offset)
+            if newline < 0:
+                break
+            try:
+                name = json.loads(data[offset:newline])
+            except ValueError:
+                break
+            self._ids.setdefault(name, len(self._names))
+            self._names.append(name)
+            offset = newline + 1
+        self._size += offset
+        if offset < len(data):
+            # Ligne incomplète en fin de fichier (arrêt pendant une écriture) : tronquée,
+            # sinon le pseudo suivant serait collé à elle
+            logger.warning(f"Truncating incomplete player entry at end of {self.path}")
+            f.truncate(self._size)
+
+    @contextmanager
+    def _locked_file(self) -> Iterator[Any]:
+        with open(self.path, 'a+b') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield f
+
+    def refresh(self) -> None:
+        """Relit les pseudos ajoutés par d'autres processus"""
+        with self._lock:
+            with self._locked_file() as f:
+                self._read_new(f)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: str) -> int:
+        """Identifiant du joueur, attribué (et écrit) au premier usage"""
+        player_id = self._ids.get(name)
+        if player_id is not None:
+            return player_id
+        with self._lock:
+            with self._locked_file() as f:
+                # Identifiant = numéro de ligne : relire d'abord les lignes des autres processus
+                self._read_new(f)
+                player_id = self._ids.get(name)
+                if player_id is None:
+                    line = json.dumps(name, ensure_ascii=False).encode('utf-8') + b'\n'
+                    f.write(line)
+                    f.flush()
+                    self._size += len(line)
+                    self._dirty = True
+                    player_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = player_id
+            return player_id
+
+    def sync(self) -> None:
+        """Rend durables les pseudos ajoutés (fsync), avant les données qui les référencent"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        with open(self.path, 'ab') as f:
+            os.fsync(f.fileno())
+
+    def id(self, name: str) -> Optional[int]:
+        """Identifiant d'un joueur connu, sans en créer"""
+        return self._ids.get(name)
+
+    def name(self, player_id: int) -> str:
+        self._ensure(player_id)
+        return self._names[player_id]
+
+    def _ensure(self, player_id: int) -> None:
+        # Identifiant attribué par un autre processus depuis la dernière lecture
+        if player_id >= len(self._names):
+            self.refresh()
+
+    # ----- mains -----
+    def encode_hand(self, h_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Forme stockée d'une main : pseudos remplacés par leurs identifiants"""
+        if 'hero_id' in h_data:
+            return h_data
+        encoded = dict(h_data)
+        players = h_data.get('players') or []
+        encoded['players'] = [
+            {**{k: v for k, v in p.items() if k != 'name'}, 'pid': self.intern(p.get('name', ''))}
+            if isinstance(p, dict) else p
+            for p in players
+        ]
+        hero_name = encoded.pop('hero_name', '')
+        encoded['hero_id'] = self.intern(hero_name)
+
+        # Pseudos les plus longs d'abord : un pseudo peut en préfixer un autre
+        names = {p.get('name', '') for p in players if isinstance(p, dict)}
+        names.add(hero_name)
+        candidates = sorted((n for n in names if n), key=len, reverse=True)
+        for field in ACTION_FIELDS:
+            lines = h_data.get(field)
+            if lines:
+                encoded[field] = [self._encode_line(line, candidates) for line in lines]
+        if h_data.get('replay'):
+            encoded['replay'] = self.encode_replay(h_data['replay'])
+        return encoded
+
+    def _encode_line(self, line: Any, candidates: List[str]) -> Any:
+        if isinstance(line, str):
+            for name in candidates:
+                if line.startswith(name + ' '):
+                    return [self.intern(name), line[len(name):]]
+        return line
+
+    def decode_hand(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        """Main stockée -> main avec pseudos (les mains d'avant le registre sont laissées telles quelles)"""
+        if 'hero_id' not in stored:
+            return stored
+        players = stored.get('players') or []
+        self._ensure(max([stored['hero_id']] + [p['pid'] for p in players if isinstance(p, dict) and 'pid' in p]))
+        names = self._names
+        stored['players'] = [
+            {'name': names[p.pop('pid')], **p} if isinstance(p, dict) and 'pid' in p else p
+            for p in players
+        ]
+        stored['hero_name'] = names[stored.pop('hero_id')]
+        for field in ACTION_FIELDS:
+            lines = stored.get(field)
+            if lines:
+                stored[field] = [names[line[0]] + line[1] if isinstance(line, list) else line
+                                 for line in lines]
+        if stored.get('replay'):
+            self.decode_replay(stored['replay'])
+        return stored
+
+    # ----- replays et statistiques -----
+    def encode_replay(self, replay: Dict[str, Any]) -> Dict[str, Any]:
+        # Forme stockée : 'shown' en liste de [identifiant, cartes]
+        if isinstance(replay.get('shown'), list):
+            return replay
+        encoded = dict(replay)
+        encoded['players'] = [
+            {**{k: v for k, v in p.items() if k != 'name'}, 'pid': self.intern(p.get('name', ''))}
+            for p in replay.get('players') or []
+        ]
+        encoded['shown'] = [[self.intern(name), cards] for name, cards in (replay.get('shown') or {}).items()]
+        return encoded
+
+    def decode_replay(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(stored.get('shown'), list):
+            return stored
+        self._ensure(max([p['pid'] for p in stored.get('players') or [] if 'pid' in p] +
+                         [player_id for player_id, _ in stored['shown']], default=0))
+        names = self._names
+        stored['players'] = [{'name': names[p.pop('pid')], **p} if 'pid' in p else p
+                             for p in stored.get('players') or []]
+        stored['shown'] = {names[player_id]: cards for player_id, cards in stored['shown']}
+        return stored
+
+    def encode_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        if 'player_name' not in stats:
+            return stats
+        encoded = {k: v for k, v in stats.items() if k != 'player_name'}
+        encoded['player_id'] = self.intern(stats['player_name'])
+        return encoded
+
+    def decode_stats(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        if 'player_id' in stored:
+            stored['player_name'] = self.name(stored.pop('player_id'))
+        return stored
+
+
+class InterningCodec(Codec):
+    """Codec des payloads de mains : pseudos internés dans le registre avant sérialisation"""
+
+    def __init__(self, inner: Codec, registry: PlayerRegistry):
+        self.inner = inner
+        self.registry = registry
+        self.name = inner.name
+        self.extension = inner.extension
+
+    def dumps(self, data: Any) -> bytes:
+        return self.inner.dumps(self.registry.encode_hand(data))
+
+    def loads(self, raw: bytes) -> Any:
+        return self.registry.decode_hand(self.inner.loads(raw))
+
+    def matches(self, raw: bytes) -> bool:
+        return self.inner.matches(raw)
@@ -0,0 +1,154 @@
+# serialization.py
+import json
+import zlib
+from typing import Any, List, Optional
+import logging
+
+try:
+    import msgpack
+except ImportError:  # Format binaire optionnel
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+ZLIB_LEVEL = 6
+
+
+class Codec:
+    """Format de sérialisation des fichiers de stockage"""
+    name = ""
+    extension = ""
+
+    def dumps(self, data: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, raw: bytes) -> Any:
+        raise NotImplementedError
+
+    def matches(self, raw: bytes) -> bool:
+        """Le contenu brut est-il dans ce format ?"""
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """JSON lisible (indent=2, format historique) ou compact"""
+
+    def __init__(self, pretty: bool = True):
+        self.pretty = pretty
+        self.name = "json" if pretty else "json-compact"
+        self.extension = ".json"
+
+    def dumps(self, data: Any) -> bytes:
+        if self.pretty:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, raw: bytes) -> Any:
+        if not raw.strip():
+            return []
+        return json.loads(raw)
+
+    def matches(self, raw: bytes) -> bool:
+        return not raw.strip() or raw.lstrip()[:1] in (b'[', b'{')
+
+
+class MsgpackCodec(Codec):
+    """MessagePack : binaire compact, rapide à décoder (nécessite le paquet msgpack)"""
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ValueError("Le format msgpack nécessite le paquet 'msgpack' (pip install msgpack)")
+
+    def dumps(self, data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, raw: bytes) -> Any:
+        if not raw:
+            return []
+        return msgpack.unpackb(raw, raw=False)
+
+    def matches(self, raw: bytes) -> bool:
+        # Les fichiers de stockage sont des listes : fixarray, array16 ou array32
+        return bool(raw) and (0x90 <= raw[0] <= 0x9f or raw[0] in (0xdc, 0xdd))
+
+
+class ZlibCodec(Codec):
+    """Compression zlib d'un autre format"""
+
+    def __init__(self, inner: Codec, level: int = ZLIB_LEVEL):
+        self.inner = inner
+        self.level = level
+        self.name = f"{inner.name}+zlib"
+        self.extension = f"{inner.extension}.z"
+
+    def dumps(self, data: Any) -> bytes:
+        return zlib.compress(self.inner.dumps(data), self.level)
+
+    def loads(self, raw: bytes) -> Any:
+        if not raw:
+            return []
+        return self.inner.loads(zlib.decompress(raw))
+
+    def matches(self, raw: bytes) -> bool:
+        # En-tête zlib : 0x78 suivi d'un octet tel que l'en-tête soit multiple de 31
+        if len(raw) < 2 or raw[0] != 0x78 or (raw[0] * 256 + raw[1]) % 31 != 0:
+            return False
+        # Décompression du début seulement, jusqu'à obtenir quelques octets du format interne
+        decompressor = zlib.decompressobj()
+        head = b''
+        try:
+            for offset in range(0, len(raw), 4096):
+                head += decompressor.decompress(raw[offset:offset + 4096], 16 - len(head))
+                if len(head) >= 16 or decompressor.eof:
+                    break
+        except zlib.error:
+            return False
+        return bool(head) and self.inner.matches(head)
+
+
+def get_codec(name: Optional[str]) -> Codec:
+    """Codec à partir de son nom : json, json-compact, msgpack, avec suffixe +zlib optionnel"""
+    name = (name or "json").lower()
+    base, _, compression = name.partition('+')
+    if base == "json":
+        codec: Codec = JsonCodec(pretty=True)
+    elif base == "json-compact":
+        codec = JsonCodec(pretty=False)
+    elif base == "msgpack":
+        codec = MsgpackCodec()
+    else:
+        raise ValueError(f"Format de stockage inconnu: {name}")
+
+    if compression == "zlib":
+        codec = ZlibCodec(codec)
+    elif compression:
+        raise ValueError(f"Compression inconnue: {compression}")
+    return codec
+
+
+def available_codecs() -> List[str]:
+    names = ["json", "json-compact", "json+zlib", "json-compact+zlib"]
+    if msgpack is not None:
+        names += ["msgpack", "msgpack+zlib"]
+    return names
+
+
+def detect_codec(raw: bytes) -> Codec:
+    """Devine le format d'un contenu brut (compressé d'abord, puis binaire, puis JSON)"""
+    candidates: List[Codec] = [ZlibCodec(JsonCodec())]
+    if msgpack is not None:
+        candidates += [ZlibCodec(MsgpackCodec()), MsgpackCodec()]
+    candidates.append(JsonCodec())
+    for codec in candidates:
+        if codec.matches(raw):
+            return codec
+    raise ValueError("Format de fichier de stockage non reconnu")
+
+
+def load_file(file_path: str) -> Any:
+    """Charge un fichier de stockage quel que soit son format"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    return detect_codec(raw).loads(raw)
@@ -0,0 +1,84 @@
+# services/action_parser.py
+import re
+from typing import List, Optional
+import logging
+
+from ..models import ActionDetails
+
+logger = logging.getLogger(__name__)
+
+class ActionParser:
+    """Transforme les lignes d'action Winamax en ActionDetails typées"""
+
+    def __init__(self):
+        self.ante_pattern = re.compile(r'posts ante (\d+)')
+        self.small_blind_pattern = re.compile(r'posts small blind (\d+)')
+        self.big_blind_pattern = re.compile(r'posts big blind (\d+)')
+        self.raise_pattern = re.compile(r'raises (\d+) to (\d+)')
+        self.call_pattern = re.compile(r'calls (\d+)')
+        self.bet_pattern = re.compile(r'bets (\d+)')
+        self.collected_pattern = re.compile(r'collected (\d+) from')
+        self.shows_pattern = re.compile(r'shows \[([^\]]+)\]')
+
+    def _match_player(self, line: str, player_names: List[str]) -> str:
+        """Retrouve le joueur en tête de ligne (les pseudos peuvent contenir des espaces)"""
+        for name in sorted(player_names, key=len, reverse=True):
+            if line.startswith(name + ' '):
+                return name
+        return line.split(' ', 1)[0]
+
+    def parse_shown_cards(self, line: str) -> Optional[str]:
+        """Extrait les cartes montrées au showdown ("shows [Ah Kd]")"""
+        match = self.shows_pattern.search(line)
+        return match.group(1) if match else None
+
+    def parse_action(self, line: str, player_names: List[str], phase: str = "") -> Optional[ActionDetails]:
+        """Parse une ligne d'action, retourne None si la ligne n'est pas une action"""
+        line = line.strip()
+        if not line or line.startswith('***') or line.startswith('Seat ') or line.startswith('Board:'):
+            return None
+
+        player = self._match_player(line, player_names)
+        rest = line[len(player):]
+        is_all_in = 'all-in' in rest
+
+        match = self.ante_pattern.search(rest)
+        if match:
+            return ActionDetails(player, 'ante', int(match.group(1)), is_all_in, phase, line)
+
+        match = self.small_blind_pattern.search(rest)
+        if match:
+            return ActionDetails(player, 'smallblind', int(match.group(1)), is_all_in, phase, line)
+
+        match = self.big_blind_pattern.search(rest)
+        if match:
+            return ActionDetails(player, 'bigblind', int(match.group(1)), is_all_in, phase, line)
+
+        if rest.startswith(' folds'):
+            return ActionDetails(player, 'fold', 0, False, phase, line)
+
+        if rest.startswith(' checks'):
+            return ActionDetails(player, 'check', 0, False, phase, line)
+
+        # Pour une relance, le montant est le total misé sur la street ("raises X to Y")
+        match = self.raise_pattern.search(rest)
+        if match:
+            return ActionDetails(player, 'raise', int(match.group(2)), is_all_in, phase, line)
+
+        match = self.call_pattern.search(rest)
+        if match:
+            return ActionDetails(player, 'call', int(match.group(1)), is_all_in, phase, line)
+
+        match = self.bet_pattern.search(rest)
+        if match:
+            return ActionDetails(player, 'bet', int(match.group(1)), is_all_in, phase, line)
+
+        match = self.collected_pattern.search(rest)
+        if match:
+            return ActionDetails(player, 'win', int(match.group(1)), False, phase, line)
+
+        if self.shows_pattern.search(rest):
+            return ActionDetails(player, 'show', 0, False, phase, line)
+
+        logger.debug(f"Unrecognized action line: {line}")
+        return None
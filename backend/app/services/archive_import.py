@@ -0,0 +1,207 @@
+# services/archive_import.py
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from .batch_import import pair_key
+from .tournament_importer import TournamentImporter, parse_summary, parse_tournament
+from .winamax_parser import HAND_HEADER
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_KINDS = (('.zip', 'zip'), ('.tar.gz', 'tar'), ('.tgz', 'tar'), ('.tar', 'tar'))
+SUMMARY_HEADER = 'Winamax Poker - Tournament summary'
+# Taille maximale d'un fichier décompressé (protection contre les archives piégées)
+MAX_MEMBER_SIZE = 256 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+
+
+def archive_kind(filename: str) -> Optional[str]:
+    """'zip', 'tar' ou None selon l'extension du fichier"""
+    lowered = filename.lower()
+    return next((kind for suffix, kind in ARCHIVE_KINDS if lowered.endswith(suffix)), None)
+
+
+def iter_members(fileobj: IO[bytes], filename: str) -> Iterator[Tuple[str, int, IO[bytes]]]:
+    """
+    Fichiers d'une archive (nom, taille annoncée, flux décompressé). Chaque
+    flux doit être lu avant de passer au suivant : les tar sont lus en flux
+    (compression détectée automatiquement), sans retour en arrière.
+    """
+    if archive_kind(filename) == 'zip':
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, info.file_size, member
+        return
+
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            stream = archive.extractfile(member)
+            if stream is not None:
+                yield member.name, member.size, stream
+
+
+def read_member(stream: IO[bytes], limit: int = MAX_MEMBER_SIZE) -> str:
+    """Lit un fichier décompressé par blocs, en s'arrêtant au-delà de limit octets"""
+    chunks = []
+    size = 0
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            raise ValueError(f"Fichier trop volumineux (plus de {limit // (1024 * 1024)} Mo décompressés)")
+        chunks.append(chunk)
+    return b''.join(chunks).decode('utf-8')
+
+
+def _parse_history(content: str) -> Dict[str, Any]:
+    """Parse un historique dans un worker"""
+    try:
+        return parse_tournament(content)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+class ArchiveImporter:
+    """
+    Import d'une archive d'historiques Winamax (.zip, .tar.gz) : les fichiers
+    sont décompressés un par un, les historiques parsés en parallèle (au plus
+    `window` fichiers en mémoire) et enregistrés par lots ; les summaries sont
+    appliqués au tournoi de l'historique correspondant (voir pair_key).
+    Une instance par archive.
+    """
+
+    def __init__(self, storage, user_id: str, workers: int = 2, batch_size: int = 20):
+        self.storage = storage
+        self.importer = TournamentImporter(storage, user_id)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.window = max(1, workers) * 2
+
+        self._files: List[Dict[str, Any]] = []
+        self._summaries: Dict[Tuple[str, str], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._tournaments: Dict[Tuple[str, str], str] = {}
+        self._batch: List[Tuple[Dict[str, Any], Tuple[str, str], Dict[str, Any]]] = []
+
+    def import_archive(self, fileobj: IO[bytes], filename: str) -> Dict[str, Any]:
+        """Importe l'archive et renvoie un rapport par fichier"""
+        pending: Deque[Tuple[Dict[str, Any], Tuple[str, str], Future]] = deque()
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for name, size, stream in iter_members(fileobj, filename):
+                entry = {'file': name, 'type': None, 'status': None}
+                self._files.append(entry)
+                if not name.lower().endswith('.txt'):
+                    entry.update(type='other', status='ignored')
+                    continue
+                try:
+                    if size > MAX_MEMBER_SIZE:
+                        raise ValueError(f"Fichier trop volumineux ({size} octets décompressés)")
+                    content = read_member(stream)
+                except (ValueError, UnicodeDecodeError) as e:
+                    entry.update(status='error', error=str(e))
+                    continue
+
+                key, _ = pair_key(name)
+                if content.lstrip().startswith(SUMMARY_HEADER):
+                    entry['type'] = 'summary'
+                    self._summaries[key] = (entry, parse_summary(content))
+                elif HAND_HEADER in content:
+                    entry['type'] = 'history'
+                    if executor is None:
+                        self._collect(entry, key, _parse_history(content))
+                    else:
+                        # Fenêtre bornée : on attend le plus ancien parsing avant d'en lancer d'autres
+                        while len(pending) >= self.window:
+                            self._collect(*self._result(pending.popleft()))
+                        pending.append((entry, key, executor.submit(_parse_history, content)))
+                else:
+                    entry.update(type='other', status='ignored')
+                # Libéré avant de décompresser le fichier suivant
+                del content
+
+            while pending:
+                self._collect(*self._result(pending.popleft()))
+            self._store()
+        except (zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+            for _, _, future in pending:
+                future.cancel()
+            raise ValueError(f"Archive illisible : {e}")
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        self._apply_remaining_summaries()
+        return self._report()
+
+    @staticmethod
+    def _result(item: Tuple[Dict[str, Any], Tuple[str, str], Future]):
+        entry, key, future = item
+        return entry, key, future.result()
+
+    def _collect(self, entry: Dict[str, Any], key: Tuple[str, str], parsed: Dict[str, Any]):
+        if 'error' in parsed:
+            logger.error(f"Error parsing {entry['file']}: {parsed['error']}")
+            entry.update(status='error', error=parsed['error'])
+            return
+        self._batch.append((entry, key, parsed))
+        if len(self._batch) >= self.batch_size:
+            self._store()
+
+    def _store(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        merged: Dict[int, Dict[str, Any]] = {}
+        for i, (entry, key, parsed) in enumerate(batch):
+            # Summary déjà lu : ses champs sont enregistrés avec le tournoi
+            if key in self._summaries:
+                merged[i], parsed['summary'] = self._summaries.pop(key)
+        results = self.importer.store_many([parsed for _, _, parsed in batch])
+        for i, ((entry, key, _), result) in enumerate(zip(batch, results)):
+            self._tournaments[key] = result['tournament_id']
+            entry.update(status=result['status'], tournament_id=result['tournament_id'],
+                         name=result['name'], total_hands=result['total_hands'])
+            if i in merged:
+                merged[i].update(status='applied', tournament_id=result['tournament_id'])
+
+    def _apply_remaining_summaries(self):
+        for key, (entry, summary_data) in self._summaries.items():
+            tournament_id = self._tournaments.get(key)
+            if tournament_id is None:
+                entry['status'] = 'orphan'
+                continue
+            try:
+                self.importer.apply_summary(tournament_id, summary_data)
+                entry.update(status='applied', tournament_id=tournament_id)
+            except Exception as e:
+                logger.error(f"Error applying summary {entry['file']}: {e}")
+                entry.update(status='error', error=str(e))
+
+    def _report(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for entry in self._files:
+            statuses[entry['status']] = statuses.get(entry['status'], 0) + 1
+        return {
+            'files': self._files,
+            'total_files': len(self._files),
+            'tournaments_created': statuses.get('created', 0),
+            'tournaments_existing': statuses.get('exists', 0),
+            'summaries_applied': statuses.get('applied', 0),
+            'orphan_summaries': statuses.get('orphan', 0),
+            'ignored': statuses.get('ignored', 0),
+            'errors': statuses.get('error', 0),
+            'total_hands': sum(entry.get('total_hands', 0) for entry in self._files
+                               if entry['status'] == 'created')
+        }
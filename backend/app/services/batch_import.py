@@ -0,0 +1,289 @@
+# services/batch_import.py
+"""
+Import en masse d'un dossier d'historiques Winamax :
+
+    python -m app.services.batch_import /chemin/vers/history --data-dir data
+
+Chaque historique est associé à son summary (même nom suffixé de _summary),
+les fichiers sont parsés en parallèle par un pool de processus puis
+enregistrés par lots. Les fichiers traités sont mémorisés (chemin, taille,
+mtime, empreinte SHA-256) : une relance n'importe que les fichiers nouveaux
+ou modifiés.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from .tournament_importer import TournamentImporter, parse_summary, parse_tournament
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "imports.json"
+SUMMARY_SUFFIX = "_summary"
+# Identifiant Winamax du tournoi dans le nom de fichier : "NOM(941402733)"
+TOURNAMENT_ID_PATTERN = re.compile(r'\((\d+)\)')
+
+
+def _read(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _parse_job(job: Tuple[Optional[str], Optional[str]]) -> Dict[str, Any]:
+    """Parse un couple (historique, summary) dans un worker"""
+    history_path, summary_path = job
+    try:
+        summary_content = _read(summary_path) if summary_path else None
+        if history_path is None:
+            return {'summary': parse_summary(summary_content)}
+        return parse_tournament(_read(history_path), summary_content)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ImportManifest:
+    """Fichiers déjà importés : chemin -> taille, mtime, empreinte, tournoi"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get('files', {})
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def changed(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        État courant du fichier s'il est nouveau ou modifié, None sinon.
+        L'empreinte n'est calculée que si la taille ou le mtime ont changé.
+        """
+        stat = os.stat(path)
+        entry = self.files.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return None
+        sha256 = file_sha256(path)
+        if entry and entry['sha256'] == sha256:
+            # Fichier touché mais identique
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return None
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+
+    def record(self, path: str, state: Dict[str, Any], tournament_id: Optional[str]):
+        self.files[path] = {**state, 'tournament_id': tournament_id, 'imported_at': datetime.now().isoformat()}
+
+    def tournament_id(self, path: Optional[str]) -> Optional[str]:
+        entry = self.files.get(path) if path else None
+        return entry.get('tournament_id') if entry else None
+
+
+def pair_key(path: str) -> Tuple[Tuple[str, str], bool]:
+    """
+    Clé d'association historique/summary d'un fichier (dossier et identifiant
+    Winamax du tournoi, à défaut nom sans le suffixe _summary) et s'il s'agit
+    d'un summary.
+    """
+    directory, filename = os.path.split(path)
+    stem = os.path.splitext(filename)[0]
+    is_summary = stem.endswith(SUMMARY_SUFFIX)
+    if is_summary:
+        stem = stem[:-len(SUMMARY_SUFFIX)]
+    match = TOURNAMENT_ID_PATTERN.search(stem)
+    return (directory, match.group(1) if match else stem), is_summary
+
+
+def pair_files(root: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Couples (historique, summary) d'une arborescence, associés par pair_key"""
+    pairs: Dict[Tuple[str, str], List[Optional[str]]] = {}
+    for directory, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if not filename.endswith('.txt'):
+                continue
+            key, is_summary = pair_key(os.path.join(directory, filename))
+            pair = pairs.setdefault(key, [None, None])
+            pair[1 if is_summary else 0] = os.path.abspath(os.path.join(directory, filename))
+    return [tuple(pair) for _, pair in sorted(pairs.items())]
+
+
+class BatchImporter:
+    """Import incrémental d'un dossier : sélection des fichiers modifiés, parsing parallèle, écriture par lots"""
+
+    def __init__(self, storage, user_id: str, manifest: ImportManifest,
+                 workers: Optional[int] = None, batch_size: int = 20):
+        self.storage = storage
+        self.importer = TournamentImporter(storage, user_id)
+        self.manifest = manifest
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.stats = {
+            'files_scanned': 0, 'files_unchanged': 0, 'tournaments_created': 0,
+            'tournaments_existing': 0, 'summaries_applied': 0, 'orphan_summaries': 0,
+            'hands': 0, 'bytes': 0, 'errors': 0, 'parse_seconds': 0.0, 'store_seconds': 0.0
+        }
+
+    def _jobs(self, root: str) -> List[Dict[str, Any]]:
+        jobs = []
+        for history_path, summary_path in pair_files(root):
+            states = {}
+            for path in (history_path, summary_path):
+                if path is None:
+                    continue
+                self.stats['files_scanned'] += 1
+                state = self.manifest.changed(path)
+                if state is None:
+                    self.stats['files_unchanged'] += 1
+                else:
+                    states[path] = state
+            if not states:
+                continue
+
+            if history_path is None or history_path not in states:
+                # Seul le summary est nouveau : appliqué au tournoi déjà importé
+                tournament_id = self.manifest.tournament_id(history_path)
+                if tournament_id is None:
+                    self.stats['orphan_summaries'] += 1
+                    logger.warning(f"No imported hand history for summary {summary_path}")
+                    continue
+                jobs.append({'parse': (None, summary_path), 'states': states, 'tournament_id': tournament_id})
+            else:
+                jobs.append({'parse': (history_path, summary_path), 'states': states, 'tournament_id': None})
+            self.stats['bytes'] += sum(state['size'] for state in states.values())
+        return jobs
+
+    def _parsed(self, jobs: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        parse_jobs = [job['parse'] for job in jobs]
+        if self.workers <= 1 or len(jobs) <= 1:
+            yield from zip(jobs, map(_parse_job, parse_jobs))
+            return
+        # Fenêtre bornée de fichiers en cours de parsing : les résultats en attente
+        # d'écriture ne s'accumulent pas en mémoire
+        window = self.workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for job, parse_job in zip(jobs, parse_jobs):
+                pending.append((job, executor.submit(_parse_job, parse_job)))
+                if len(pending) >= window:
+                    job, future = pending.popleft()
+                    yield job, future.result()
+            while pending:
+                job, future = pending.popleft()
+                yield job, future.result()
+
+    def _store(self, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]):
+        started = time.perf_counter()
+        histories = [(job, parsed) for job, parsed in batch if job['tournament_id'] is None]
+        results = self.importer.store_many([parsed for _, parsed in histories]) if histories else []
+        for (job, parsed), result in zip(histories, results):
+            job['tournament_id'] = result['tournament_id']
+            if result['status'] == 'created':
+                self.stats['tournaments_created'] += 1
+                self.stats['hands'] += result['total_hands']
+            else:
+                self.stats['tournaments_existing'] += 1
+                # Historique modifié d'un tournoi déjà importé : mains ajoutées depuis
+                self.stats['hands'] += self._append_new_hands(result['tournament_id'], parsed['hands'])
+            if parsed.get('summary'):
+                self.stats['summaries_applied'] += 1
+
+        for job, parsed in batch:
+            if job['parse'][0] is None:
+                self.importer.apply_summary(job['tournament_id'], parsed['summary'])
+                self.stats['summaries_applied'] += 1
+            for path, state in job['states'].items():
+                self.manifest.record(path, state, job['tournament_id'])
+        # Progression conservée après chaque lot
+        self.manifest.save()
+        self.stats['store_seconds'] += time.perf_counter() - started
+
+    def _append_new_hands(self, tournament_id: str, hands: List[Dict[str, Any]]) -> int:
+        """Enregistre les mains de numéro supérieur à la dernière main stockée (voir HistoryFollower)"""
+        count = self.storage.count_hands(tournament_id)
+        last = self.storage.get_hands_page(tournament_id, count - 1, 1) if count else []
+        stored_until = last[0].hand_number if last else 0
+        new_hands = [h_data for h_data in hands if h_data.get('hand_number', 0) > stored_until]
+        if new_hands:
+            self.storage.create_hands(tournament_id, new_hands)
+            logger.info(f"{len(new_hands)} new hands appended to tournament {tournament_id}")
+        return len(new_hands)
+
+    def run(self, root: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        jobs = self._jobs(root)
+        logger.info(f"{len(jobs)} tournaments to import from {root} ({self.workers} workers)")
+
+        batch = []
+        parse_started = time.perf_counter()
+        for job, parsed in self._parsed(jobs):
+            if 'error' in parsed:
+                self.stats['errors'] += 1
+                logger.error(f"Error parsing {job['parse'][0] or job['parse'][1]}: {parsed['error']}")
+                continue
+            batch.append((job, parsed))
+            if len(batch) >= self.batch_size:
+                self.stats['parse_seconds'] += time.perf_counter() - parse_started
+                self._store(batch)
+                batch = []
+                parse_started = time.perf_counter()
+        self.stats['parse_seconds'] += time.perf_counter() - parse_started
+        if batch:
+            self._store(batch)
+        self.manifest.save()
+
+        elapsed = time.perf_counter() - started
+        self.stats['elapsed_seconds'] = elapsed
+        self.stats['hands_per_second'] = round(self.stats['hands'] / elapsed, 1) if elapsed else 0.0
+        self.stats['mb_per_second'] = round(self.stats['bytes'] / (1024 * 1024) / elapsed, 2) if elapsed else 0.0
+        for key in ('parse_seconds', 'store_seconds', 'elapsed_seconds'):
+            self.stats[key] = round(self.stats[key], 2)
+        return self.stats
+
+
+def main():
+    from ..storage import FileStorage
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('directory', help="Dossier des historiques (parcouru récursivement)")
+    arg_parser.add_argument('--data-dir', default='data')
+    arg_parser.add_argument('--user-id', default='default_user')
+    arg_parser.add_argument('--workers', type=int, default=None, help="Processus de parsing (défaut : nombre de CPU)")
+    arg_parser.add_argument('--batch-size', type=int, default=20, help="Tournois enregistrés par écriture")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    storage = FileStorage(args.data_dir)
+    manifest = ImportManifest(os.path.join(args.data_dir, MANIFEST_FILE))
+    stats = BatchImporter(storage, args.user_id, manifest, workers=args.workers,
+                          batch_size=args.batch_size).run(args.directory)
+
+    print(f"Fichiers analysés      : {stats['files_scanned']} ({stats['files_unchanged']} inchangés)")
+    print(f"Tournois importés      : {stats['tournaments_created']} (déjà présents : {stats['tournaments_existing']})")
+    print(f"Summaries appliqués    : {stats['summaries_applied']} (sans historique : {stats['orphan_summaries']})")
+    print(f"Mains importées        : {stats['hands']}")
+    print(f"Erreurs                : {stats['errors']}")
+    print(f"Durée                  : {stats['elapsed_seconds']} s "
+          f"(parsing {stats['parse_seconds']} s, écriture {stats['store_seconds']} s)")
+    print(f"Débit                  : {stats['hands_per_second']} mains/s, {stats['mb_per_second']} Mo/s")
+
+
+if __name__ == "__main__":
+    main()
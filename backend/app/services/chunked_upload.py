@@ -0,0 +1,255 @@
+# services/chunked_upload.py
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import logging
+
+from .history_follower import HistoryFollower
+
+logger = logging.getLogger(__name__)
+
+# Taille maximale d'un morceau envoyé en une requête
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+DATA_FILE = "data.txt"
+META_FILE = "meta.json"
+# Session sans morceau reçu depuis ce délai : abandonnée, son tournoi partiel est supprimé
+SESSION_TTL = timedelta(hours=24)
+
+
+class _Session:
+    """Session en mémoire : état persistant, verrou (un morceau à la fois), ingestion incrémentale"""
+
+    def __init__(self, directory: str, meta: Dict[str, Any], follower: HistoryFollower):
+        self.directory = directory
+        self.meta = meta
+        self.follower = follower
+        self.lock = threading.Lock()
+
+
+class ChunkedUploads:
+    """
+    Uploads reprenables par morceaux : une session par fichier, les morceaux
+    (avec leur offset) sont ajoutés à un fichier d'attente sur disque. Les
+    mains complètes sont parsées et enregistrées au fil des morceaux (voir
+    HistoryFollower), la finalisation n'a plus qu'à traiter la dernière main.
+
+    L'état de chaque session (octets reçus, tournoi) est conservé dans
+    data/uploads/<session_id>/ : après un redémarrage, l'upload reprend à
+    l'offset enregistré et les mains déjà stockées ne sont pas reparsées.
+    Une session inactive depuis SESSION_TTL expire : le tournoi partiel
+    qu'elle a créé est supprimé (comme pour abort).
+    """
+
+    def __init__(self, storage, user_id: str, root: str):
+        self.storage = storage
+        self.user_id = user_id
+        self.root = root
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+
+    def create(self, filename: str, size: Optional[int] = None) -> Dict[str, Any]:
+        """Ouvre une session d'upload ; size (optionnel) est vérifié à la finalisation"""
+        self.expire()
+        session_id = str(uuid.uuid4())
+        directory = os.path.join(self.root, session_id)
+        os.makedirs(directory)
+        open(os.path.join(directory, DATA_FILE), 'wb').close()
+        meta = {
+            'session_id': session_id,
+            'filename': filename,
+            'size': size,
+            'offset': 0,
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat(),
+            'tournament_id': None,
+            'tournament_created': False
+        }
+        self._save_meta(directory, meta)
+        logger.info(f"Upload session {session_id} created for {filename}")
+        return self._status(self._open(session_id, meta))
+
+    def status(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self._get(session_id)
+        return self._status(session) if session else None
+
+    def write_chunk(self, session_id: str, offset: int, data: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Ajoute un morceau commençant à offset. Un morceau déjà (partiellement)
+        reçu n'est pas réécrit (renvoi après une coupure) ; un offset au-delà
+        des octets reçus est refusé (ValueError). Si les mains du morceau ne
+        peuvent être enregistrées, le morceau est retiré : à renvoyer.
+        """
+        session = self._get(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            received = session.meta['offset']
+            if offset > received:
+                raise ValueError(f"Offset {offset} invalide : {received} octets reçus")
+            data = data[received - offset:]
+            if data:
+                data_path = os.path.join(session.directory, DATA_FILE)
+                with open(data_path, 'ab') as f:
+                    f.write(data)
+                try:
+                    self._ingest(session)
+                except Exception:
+                    # Offset inchangé : le fichier revient aux octets reçus et la session
+                    # est relue depuis le disque à la prochaine requête (comme après un redémarrage)
+                    os.truncate(data_path, received)
+                    self._save_meta(session.directory, session.meta)
+                    with self._lock:
+                        self._sessions.pop(session_id, None)
+                    raise
+                session.meta['offset'] = received + len(data)
+                session.meta['updated_at'] = datetime.now().isoformat()
+                self._save_meta(session.directory, session.meta)
+            return self._status(session)
+
+    def finalize(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Termine l'upload : dernière main, résultat comparable à l'upload simple, session supprimée"""
+        session = self._get(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            meta = session.meta
+            if meta['size'] is not None and meta['offset'] != meta['size']:
+                raise ValueError(f"Upload incomplet : {meta['offset']} octets reçus sur {meta['size']}")
+            self._ingest(session, final=True)
+            tournament_id = meta['tournament_id']
+            tournament = self.storage.get_tournament_by_id(tournament_id) if tournament_id else None
+            if tournament is None:
+                raise ValueError("Aucune main de tournoi Winamax dans le fichier")
+
+            self._discard(session_id)
+            return {
+                "tournament_id": tournament.id,
+                "name": tournament.name,
+                "total_hands": self.storage.count_hands(tournament.id),
+                "tournament_type": tournament.tournament_type,
+                "message": ("Tournoi uploadé et parsé avec succès" if meta['tournament_created']
+                            else "Ce tournoi est déjà présent dans votre collection"),
+                "status": "created" if meta['tournament_created'] else "exists",
+                "existing": not meta['tournament_created']
+            }
+
+    def abort(self, session_id: str) -> bool:
+        """Abandonne l'upload ; le tournoi créé par la session est supprimé avec ses mains"""
+        session = self._get(session_id)
+        if session is None:
+            return False
+        with session.lock:
+            self._undo(session_id, session.meta)
+        return True
+
+    def expire(self) -> int:
+        """Supprime les sessions inactives depuis SESSION_TTL ; retourne le nombre de sessions expirées"""
+        if not os.path.isdir(self.root):
+            return 0
+        expired = 0
+        for session_id in os.listdir(self.root):
+            session = self._sessions.get(session_id)
+            if session is not None:
+                with session.lock:
+                    if self._expired(session.meta):
+                        self._undo(session_id, session.meta)
+                        expired += 1
+                continue
+            meta = self._load_meta(session_id)
+            if meta is not None and self._expired(meta):
+                self._undo(session_id, meta)
+                expired += 1
+        return expired
+
+    @staticmethod
+    def _expired(meta: Dict[str, Any]) -> bool:
+        updated_at = datetime.fromisoformat(meta.get('updated_at') or meta['created_at'])
+        return datetime.now() - updated_at > SESSION_TTL
+
+    def _undo(self, session_id: str, meta: Dict[str, Any]):
+        """Supprime le tournoi créé par la session (avec ses mains) puis la session"""
+        if meta['tournament_created']:
+            self.storage.delete_tournament_and_hands(meta['tournament_id'])
+        logger.info(f"Upload session {session_id} discarded")
+        self._discard(session_id)
+
+    def _ingest(self, session: _Session, final: bool = False):
+        follower = session.follower
+        created = follower.stats['tournaments_created']
+        errors = follower.stats['errors']
+        follower.poll(final=final)
+        # Tournoi retenu même en cas d'échec : supprimé par abort ou à l'expiration
+        followed = follower.files[0]
+        if session.meta['tournament_id'] is None and followed.tournament_id is not None:
+            session.meta['tournament_id'] = followed.tournament_id
+            session.meta['tournament_created'] = follower.stats['tournaments_created'] > created
+        if follower.stats['errors'] > errors:
+            raise ValueError(f"Erreur lors du parsing des mains de {session.meta['filename']}")
+
+    def _open(self, session_id: str, meta: Dict[str, Any]) -> _Session:
+        directory = os.path.join(self.root, session_id)
+        follower = HistoryFollower(self.storage, self.user_id, [os.path.join(directory, DATA_FILE)])
+        session = _Session(directory, meta, follower)
+        with self._lock:
+            return self._sessions.setdefault(session_id, session)
+
+    def _get(self, session_id: str) -> Optional[_Session]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            return session
+        # Session d'avant un redémarrage : relue depuis le disque
+        meta = self._load_meta(session_id)
+        if meta is None:
+            return None
+        if self._expired(meta):
+            self._undo(session_id, meta)
+            return None
+        # Octets écrits après le dernier état enregistré : renvoyés par le client à la reprise
+        data_path = os.path.join(self.root, session_id, DATA_FILE)
+        if os.path.getsize(data_path) > meta['offset']:
+            os.truncate(data_path, meta['offset'])
+        session = self._open(session_id, meta)
+        if meta['tournament_id'] is not None:
+            # Reprise : les mains déjà enregistrées sont seulement redécoupées, pas reparsées
+            with session.lock:
+                session.follower.poll()
+        return session
+
+    def _load_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            uuid.UUID(session_id)
+        except ValueError:
+            return None
+        meta_path = os.path.join(self.root, session_id, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _discard(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        shutil.rmtree(os.path.join(self.root, session_id), ignore_errors=True)
+
+    @staticmethod
+    def _save_meta(directory: str, meta: Dict[str, Any]):
+        tmp_path = os.path.join(directory, f"{META_FILE}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(directory, META_FILE))
+
+    def _status(self, session: _Session) -> Dict[str, Any]:
+        meta = session.meta
+        return {
+            'session_id': meta['session_id'],
+            'filename': meta['filename'],
+            'size': meta['size'],
+            'offset': meta['offset'],
+            'tournament_id': meta['tournament_id'],
+            'hands_parsed': self.storage.count_hands(meta['tournament_id']) if meta['tournament_id'] else 0,
+            'max_chunk_size': MAX_CHUNK_SIZE
+        }
@@ -0,0 +1,180 @@
+# services/hand_metrics.py
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from .replay_builder import ReplayBuilder
+
+logger = logging.getLogger(__name__)
+
+class HandContext:
+    """Données partagées par toutes les métriques d'une main (calculées une seule fois)"""
+
+    def __init__(self, hand_data: Dict[str, Any], replay: Dict[str, Any]):
+        self.hand = hand_data
+        self.replay = replay
+        self.steps = replay.get('steps', [])
+        self.players = hand_data.get('players', [])
+
+        hero_name = hand_data.get('hero_name', '')
+        self.hero_index = next((i for i, p in enumerate(self.players) if p.get('name') == hero_name), None)
+
+    def hero_steps(self, phase: Optional[str] = None) -> List[List[Any]]:
+        return [step for step in self.steps
+                if step[1] == self.hero_index and (phase is None or step[0] == phase)]
+
+    @property
+    def hero_stack(self) -> int:
+        if self.hero_index is None:
+            return 0
+        return self.players[self.hero_index].get('stack', 0)
+
+
+# Registre des métriques dérivées : nom -> fonction(HandContext) -> valeur
+METRICS: Dict[str, Callable[[HandContext], Any]] = {}
+
+def register_metric(name: str):
+    """Décorateur d'enregistrement d'une métrique dans le registre"""
+    def decorator(func: Callable[[HandContext], Any]) -> Callable[[HandContext], Any]:
+        METRICS[name] = func
+        return func
+    return decorator
+
+
+@register_metric('hero_net_chips')
+def hero_net_chips(ctx: HandContext) -> int:
+    """Jetons gagnés (ou perdus) par le héros sur la main"""
+    hero_steps = ctx.hero_steps()
+    if not hero_steps:
+        return 0
+    return hero_steps[-1][5] - ctx.hero_stack
+
+@register_metric('effective_stack_bb')
+def effective_stack_bb(ctx: HandContext) -> float:
+    """Stack effectif du héros (face au plus gros stack adverse) en big blinds"""
+    big_blind = ctx.hand.get('big_blind', 0)
+    if ctx.hero_index is None or not big_blind:
+        return 0.0
+    opponents = [p.get('stack', 0) for i, p in enumerate(ctx.players) if i != ctx.hero_index]
+    effective = min(ctx.hero_stack, max(opponents)) if opponents else ctx.hero_stack
+    return round(effective / big_blind, 2)
+
+@register_metric('vpip')
+def vpip(ctx: HandContext) -> bool:
+    """Le héros a mis de l'argent volontairement dans le pot préflop"""
+    return any(step[2] in ('call', 'bet', 'raise') for step in ctx.hero_steps('preflop'))
+
+@register_metric('pfr')
+def pfr(ctx: HandContext) -> bool:
+    """Le héros a relancé préflop"""
+    return any(step[2] == 'raise' for step in ctx.hero_steps('preflop'))
+
+@register_metric('three_bet')
+def three_bet(ctx: HandContext) -> bool:
+    """Le héros a fait la deuxième relance préflop (3-bet)"""
+    raises = 0
+    for step in ctx.steps:
+        if step[0] != 'preflop' or step[2] != 'raise':
+            continue
+        raises += 1
+        if step[1] == ctx.hero_index and ctx.hero_index is not None:
+            return raises == 2
+    return False
+
+@register_metric('last_street')
+def last_street(ctx: HandContext) -> str:
+    """Dernière street atteinte par la main"""
+    for street in ('river', 'turn', 'flop'):
+        if ctx.hand.get(street):
+            return street
+    return 'preflop'
+
+@register_metric('showdown')
+def showdown(ctx: HandContext) -> bool:
+    """La main est allée à l'abattage"""
+    return bool(ctx.hand.get('showdown'))
+
+@register_metric('all_in')
+def all_in(ctx: HandContext) -> bool:
+    """Au moins un joueur a été à tapis"""
+    return any(step[2] in ('smallblind', 'bigblind', 'call', 'bet', 'raise') and step[5] == 0
+               for step in ctx.steps)
+
+@register_metric('players_remaining')
+def players_remaining(ctx: HandContext) -> int:
+    """Nombre de joueurs n'ayant pas foldé en fin de main"""
+    folded = {step[1] for step in ctx.steps if step[2] == 'fold'}
+    return len(ctx.players) - len(folded)
+
+
+def _compute_chunk(args) -> List[Dict[str, Any]]:
+    """Calcule un lot de métriques (exécuté dans un processus du pool)"""
+    hands, names = args
+    pipeline = HandMetricsPipeline()
+    return [pipeline.compute(hand_data, names=names) for hand_data in hands]
+
+
+class HandMetricsPipeline:
+    """
+    Étape d'ingestion qui calcule une fois par main l'ensemble des métriques
+    dérivées du registre, à stocker avec la main.
+    """
+
+    def __init__(self):
+        self.replay_builder = ReplayBuilder()
+
+    def registered(self) -> List[str]:
+        """Noms des métriques du registre"""
+        return list(METRICS)
+
+    def compute(self, hand_data: Dict[str, Any], replay: Optional[Dict[str, Any]] = None,
+                names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Calcule les métriques (toutes ou seulement names) d'une main sérialisée"""
+        ctx = HandContext(hand_data, replay or self.replay_builder.build(hand_data))
+        metrics = {}
+        for name in names or METRICS:
+            try:
+                metrics[name] = METRICS[name](ctx)
+            except Exception as e:
+                logger.warning(f"Metric {name} failed for hand {hand_data.get('hand_id')}: {e}")
+        return metrics
+
+    def process(self, hands_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Étape d'ingestion : ajoute les métriques aux mains extraites par WinamaxParser"""
+        for hand_data in hands_data:
+            hand_data['metrics'] = self.compute(hand_data)
+        return hands_data
+
+    def compute_many(self, hands: List[Dict[str, Any]], names: Optional[List[str]] = None,
+                     workers: Optional[int] = None, chunk_size: int = 500) -> List[Dict[str, Any]]:
+        """Calcule les métriques d'un grand nombre de mains, en parallèle par lots"""
+        workers = workers or os.cpu_count() or 1
+        chunks = [(hands[i:i + chunk_size], names) for i in range(0, len(hands), chunk_size)]
+
+        if workers <= 1 or len(chunks) <= 1:
+            return [metrics for chunk in chunks for metrics in _compute_chunk(chunk)]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [metrics for result in executor.map(_compute_chunk, chunks) for metrics in result]
+
+
+def main():
+    """Recalcule les métriques des mains existantes : python -m app.services.hand_metrics"""
+    from ..storage import FileStorage
+
+    arg_parser = argparse.ArgumentParser(description="Backfill des métriques dérivées des mains")
+    arg_parser.add_argument('--data-dir', default='data')
+    arg_parser.add_argument('--metrics', nargs='*', choices=sorted(METRICS),
+                            help="Métriques à recalculer (par défaut : les métriques manquantes)")
+    arg_parser.add_argument('--workers', type=int, default=None)
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    updated = FileStorage(args.data_dir).backfill_hand_metrics(names=args.metrics, workers=args.workers)
+    logger.info(f"Metrics backfilled for {updated} hands")
+
+
+if __name__ == "__main__":
+    main()
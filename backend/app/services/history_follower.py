@@ -0,0 +1,362 @@
+# services/history_follower.py
+"""
+Suivi en direct d'historiques Winamax en cours d'écriture :
+
+    python -m app.services.history_follower /chemin/historique.txt [...] --data-dir data
+
+Seuls les octets ajoutés depuis la dernière lecture sont lus ; les mains
+complètes sont découpées au fil de l'eau (HandStreamSplitter), parsées puis
+ajoutées au tournoi, qui est créé à la première main s'il n'existe pas
+encore. Les compteurs du tournoi (nombre de mains de l'index, agrégats du
+héros) sont mis à jour à chaque lot. Attente des modifications par inotify
+(Linux) ou à défaut par scrutation espacée quand rien ne change.
+"""
+import argparse
+import codecs
+import ctypes
+import ctypes.util
+import io
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Set
+import logging
+
+from .tournament_importer import TournamentImporter, parse_hands
+from .winamax_parser import HandStreamSplitter, WinamaxParser
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1024 * 1024
+# Délai avant un nouvel essai d'enregistrement des mains en échec
+RETRY_DELAY = 5.0
+
+
+class PollingBackend:
+    """
+    Attente par os.stat : l'intervalle double tant qu'aucun fichier ne change
+    (jusqu'à max_interval) et revient au minimum dès qu'un fichier bouge.
+    """
+
+    name = 'polling'
+
+    def __init__(self, paths: List[str], min_interval: float = 0.2, max_interval: float = 5.0):
+        self.paths = paths
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._interval = min_interval
+        self._states = {path: self._state(path) for path in paths}
+
+    @staticmethod
+    def _state(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def wait(self, stop: threading.Event) -> Set[str]:
+        """Fichiers modifiés (bloque jusqu'à une modification ou l'arrêt)"""
+        while not stop.is_set():
+            changed = set()
+            for path in self.paths:
+                state = self._state(path)
+                if state != self._states[path]:
+                    self._states[path] = state
+                    changed.add(path)
+            if changed:
+                self._interval = self.min_interval
+                return changed
+            stop.wait(self._interval)
+            self._interval = min(self._interval * 2, self.max_interval)
+        return set()
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """
+    Attente par inotify (Linux, via la libc) : aucun réveil tant que les
+    dossiers surveillés ne changent pas. Les dossiers parents sont surveillés
+    pour suivre aussi la création et le remplacement des fichiers.
+    """
+
+    name = 'inotify'
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, paths: List[str], timeout: float = 30.0):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._libc = libc
+        self.paths = paths
+        # Réveil de sécurité périodique (systèmes de fichiers réseau sans événements)
+        self.timeout = timeout
+        self._idle = 0.0
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs: Dict[int, str] = {}
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        for directory in sorted({os.path.dirname(path) for path in paths}):
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+            if wd < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._dirs[wd] = directory
+
+    @classmethod
+    def available(cls) -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        library = ctypes.util.find_library('c')
+        return library is not None and hasattr(ctypes.CDLL(library), 'inotify_init1')
+
+    def wait(self, stop: threading.Event) -> Set[str]:
+        followed = set(self.paths)
+        step = min(self.timeout, 1.0)
+        while not stop.is_set():
+            # Délai court : l'arrêt est vu sans attendre un événement
+            ready, _, _ = select.select([self._fd], [], [], step)
+            if not ready:
+                self._idle += step
+                if self._idle >= self.timeout:
+                    self._idle = 0.0
+                    return followed
+                continue
+            self._idle = 0.0
+            changed = set()
+            for path in self._read_events():
+                if path in followed:
+                    changed.add(path)
+            if changed:
+                return changed
+        return set()
+
+    def _read_events(self) -> List[str]:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            directory = self._dirs.get(wd)
+            if directory is not None and name:
+                paths.append(os.path.join(directory, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_backend(paths: List[str], kind: str = 'auto'):
+    """Backend d'attente : 'inotify', 'polling' ou 'auto' (inotify si disponible)"""
+    if kind == 'polling':
+        return PollingBackend(paths)
+    if kind == 'inotify' or (kind == 'auto' and InotifyBackend.available()):
+        try:
+            return InotifyBackend(paths)
+        except OSError as e:
+            if kind == 'inotify':
+                raise
+            logger.warning(f"inotify unavailable, falling back to polling: {e}")
+    return PollingBackend(paths)
+
+
+class FollowedFile:
+    """Historique suivi : position lue, main incomplète en attente, tournoi associé"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reset()
+
+    def reset(self, inode: Optional[int] = None):
+        self.inode = inode
+        self.offset = 0
+        self.splitter = HandStreamSplitter()
+        # Décodage incrémental : un caractère UTF-8 ou un \r\n peut être coupé entre deux lectures
+        self.decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(errors='replace'),
+                                                    translate=True)
+        self.tournament_id: Optional[str] = None
+        # Rang de la dernière main déjà enregistrée (reprise d'un tournoi existant)
+        self.stored_until = 0
+        self.detached = False
+        # Mains lues mais non enregistrées (échec) : réessayées au prochain passage
+        self.pending: List[str] = []
+        self.pending_index = 0
+
+
+class HistoryFollower:
+    """Ingestion incrémentale d'historiques en cours d'écriture"""
+
+    def __init__(self, storage, user_id: str, paths: List[str], backend: str = 'auto'):
+        self.storage = storage
+        self.importer = TournamentImporter(storage, user_id)
+        self.user_id = user_id
+        self.files = [FollowedFile(os.path.abspath(path)) for path in paths]
+        self.backend_kind = backend
+        self.parser = WinamaxParser()
+        self.stats = {'hands': 0, 'bytes': 0, 'batches': 0, 'tournaments_created': 0, 'errors': 0}
+
+    def poll(self, final: bool = False) -> int:
+        """Lit la suite de chaque fichier ; final : fin de lecture, la dernière main est rendue"""
+        return sum(self._process(followed, final) for followed in self.files)
+
+    def run(self, stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        backend = make_backend([followed.path for followed in self.files], self.backend_kind)
+        logger.info(f"Following {len(self.files)} file(s) with {backend.name} backend")
+        by_path = {followed.path: followed for followed in self.files}
+        try:
+            self.poll()
+            while not stop.is_set():
+                if any(followed.pending for followed in self.files):
+                    # Le fichier peut ne plus changer : nouvel essai après un délai
+                    stop.wait(RETRY_DELAY)
+                    self.poll()
+                    continue
+                for path in backend.wait(stop):
+                    self._process(by_path[path])
+        finally:
+            backend.close()
+
+    def _process(self, followed: FollowedFile, final: bool = False) -> int:
+        if followed.detached:
+            return 0
+        try:
+            stat = os.stat(followed.path)
+        except FileNotFoundError:
+            return 0
+
+        if stat.st_ino != followed.inode or stat.st_size < followed.offset:
+            if followed.inode is not None:
+                logger.warning(f"{followed.path} was replaced or truncated, reading from start")
+            followed.reset(stat.st_ino)
+
+        blocks = list(followed.pending)
+        first_index = followed.pending_index if blocks else followed.splitter.next_index
+        if stat.st_size > followed.offset:
+            with open(followed.path, 'rb') as f:
+                f.seek(followed.offset)
+                while True:
+                    chunk = f.read(READ_SIZE)
+                    if not chunk:
+                        break
+                    followed.offset += len(chunk)
+                    self.stats['bytes'] += len(chunk)
+                    blocks.extend(followed.splitter.feed(followed.decoder.decode(chunk)))
+        if final:
+            blocks.extend(followed.splitter.flush())
+        if not blocks:
+            return 0
+
+        try:
+            count = self._ingest(followed, blocks, first_index)
+        except Exception as e:
+            # Blocs déjà consommés (position avancée) : conservés pour le prochain essai,
+            # les mains déjà enregistrées étant sautées via stored_until
+            followed.pending, followed.pending_index = blocks, first_index
+            self.stats['errors'] += 1
+            logger.error(f"Error ingesting hands from {followed.path}, {len(blocks)} hands kept for retry: {e}")
+            return 0
+        followed.pending = []
+        return count
+
+    def _ingest(self, followed: FollowedFile, blocks: List[str], first_index: int) -> int:
+        storage = self.storage
+        if followed.tournament_id is None:
+            tournament_data = self.parser.parse_tournament_file(blocks[0])
+            existing = storage.get_existing_tournament(name=tournament_data['name'],
+                                                       date=tournament_data['date'],
+                                                       user_id=self.user_id)
+            if existing is None:
+                hands = parse_hands(blocks, first_index)
+                result = self.importer.store_many([{'tournament': tournament_data, 'hands': hands,
+                                                    'summary': None}])[0]
+                followed.tournament_id = result['tournament_id']
+                followed.stored_until = first_index + len(blocks) - 1
+                self.stats['tournaments_created'] += 1
+                return self._done(followed, len(hands))
+
+            followed.tournament_id = existing.id
+            count = storage.count_hands(existing.id)
+            last = storage.get_hands_page(existing.id, count - 1, 1) if count else []
+            # hand_number = rang + 1 (voir WinamaxParser.parse_hand_blocks)
+            followed.stored_until = last[0].hand_number - 1 if last else 0
+            logger.info(f"Resuming tournament {existing.id} after hand {followed.stored_until + 1}")
+
+        # Mains déjà enregistrées (reprise) : ni parsées ni réécrites
+        skip = max(0, followed.stored_until - first_index + 1)
+        blocks, first_index = blocks[skip:], first_index + skip
+        if not blocks:
+            return 0
+
+        if storage.get_tournament_by_id(followed.tournament_id) is None:
+            logger.warning(f"Tournament {followed.tournament_id} was deleted, stop following {followed.path}")
+            followed.detached = True
+            return 0
+
+        hands = parse_hands(blocks, first_index)
+        storage.create_hands(followed.tournament_id, hands)
+        followed.stored_until = first_index + len(blocks) - 1
+        return self._done(followed, len(hands))
+
+    def _done(self, followed: FollowedFile, count: int) -> int:
+        self.stats['hands'] += count
+        self.stats['batches'] += 1
+        logger.info(f"{count} new hands from {os.path.basename(followed.path)} "
+                    f"(tournament {followed.tournament_id})")
+        return count
+
+
+def main():
+    from ..storage import FileStorage
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('files', nargs='+', help="Historiques à suivre")
+    arg_parser.add_argument('--data-dir', default='data')
+    arg_parser.add_argument('--user-id', default='default_user')
+    arg_parser.add_argument('--backend', choices=('auto', 'inotify', 'polling'), default='auto')
+    arg_parser.add_argument('--once', action='store_true',
+                            help="Importe le contenu actuel des fichiers puis s'arrête")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    storage = FileStorage(args.data_dir)
+    follower = HistoryFollower(storage, args.user_id, args.files, backend=args.backend)
+    started = time.perf_counter()
+    try:
+        if args.once:
+            follower.poll(final=True)
+        else:
+            follower.run()
+    except KeyboardInterrupt:
+        pass
+
+    stats = follower.stats
+    print(f"Mains importées        : {stats['hands']} en {stats['batches']} lots "
+          f"({stats['tournaments_created']} tournois créés)")
+    print(f"Octets lus             : {stats['bytes']}")
+    print(f"Erreurs                : {stats['errors']}")
+    print(f"Durée                  : {round(time.perf_counter() - started, 2)} s")
+
+
+if __name__ == "__main__":
+    main()
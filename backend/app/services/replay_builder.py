@@ -0,0 +1,96 @@
+# services/replay_builder.py
+from typing import Dict, List, Any
+import logging
+
+from .action_parser import ActionParser
+
+logger = logging.getLogger(__name__)
+
+class ReplayBuilder:
+    """
+    Précalcule la timeline de replay d'une main : une ligne par action avec
+    l'état de la table après l'action (pot, stack et mise du joueur).
+    """
+
+    # Colonnes de chaque étape de la timeline
+    FIELDS = ['phase', 'player', 'action', 'amount', 'pot', 'stack', 'committed']
+
+    # (phase, clé des actions, clé du board distribué en début de street)
+    PHASES = [
+        ('ante', 'ante_blinds_actions', None),
+        ('preflop', 'preflop_actions', None),
+        ('flop', 'flop_actions', 'flop'),
+        ('turn', 'turn_actions', 'turn'),
+        ('river', 'river_actions', 'river'),
+        ('showdown', 'showdown', None)
+    ]
+
+    def __init__(self):
+        self.action_parser = ActionParser()
+
+    def build(self, hand_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit la timeline compacte d'une main sérialisée (dict)"""
+        players = hand_data.get('players', [])
+        names = [p.get('name', '') for p in players]
+        seat_index = {name: i for i, name in enumerate(names)}
+
+        stacks = [p.get('stack', 0) for p in players]
+        committed = [0] * len(players)
+        pot = 0
+        steps: List[List[Any]] = []
+        shown: Dict[str, str] = {}
+
+        for phase, actions_key, board_key in self.PHASES:
+            if board_key:
+                if not hand_data.get(board_key):
+                    continue
+                # Nouvelle street : les mises de la street précédente vont au pot
+                committed = [0] * len(players)
+                steps.append([phase, -1, 'deal', 0, pot, 0, 0])
+
+            for line in hand_data.get(actions_key) or []:
+                action = self.action_parser.parse_action(line, names, phase)
+                if action is None or action.player not in seat_index:
+                    continue
+
+                i = seat_index[action.player]
+                amount = action.amount
+
+                if action.action_type == 'ante':
+                    # Les antes sont du "dead money" : au pot mais pas dans la mise de la street
+                    stacks[i] -= amount
+                    pot += amount
+                elif action.action_type == 'raise':
+                    amount = max(0, action.amount - committed[i])
+                    committed[i] = action.amount
+                    stacks[i] -= amount
+                    pot += amount
+                elif action.action_type in ('smallblind', 'bigblind', 'call', 'bet'):
+                    committed[i] += amount
+                    stacks[i] -= amount
+                    pot += amount
+                elif action.action_type == 'win':
+                    stacks[i] += amount
+                    pot = max(0, pot - amount)
+                elif action.action_type == 'show':
+                    cards = self.action_parser.parse_shown_cards(action.raw_text)
+                    if cards:
+                        shown[action.player] = cards
+
+                steps.append([phase, i, action.action_type, amount, pot, stacks[i], committed[i]])
+
+        return {
+            'hand_number': hand_data.get('hand_number', 0),
+            'players': [
+                {'name': p.get('name', ''), 'seat': p.get('seat', 0), 'stack': p.get('stack', 0)}
+                for p in players
+            ],
+            'board': {
+                'flop': hand_data.get('flop'),
+                'turn': hand_data.get('turn'),
+                'river': hand_data.get('river')
+            },
+            'shown': shown,
+            'fields': self.FIELDS,
+            'steps': steps
+        }
@@ -0,0 +1,132 @@
+# services/summary_matcher.py
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import logging
+
+from .tournament_importer import TournamentImporter, parse_summary
+
+logger = logging.getLogger(__name__)
+
+# Identifiant Winamax du tournoi dans le nom de table : "TRIDENT SPACE KO(941402733)#0056"
+TABLE_TOURNAMENT_ID = re.compile(r'\((\d+)\)#')
+# Fenêtre d'association par date : la première main suit le début du tournoi (inscription tardive)
+MATCH_BEFORE = timedelta(hours=1)
+MATCH_AFTER = timedelta(hours=24)
+# En dessous, le parsing reste dans le processus (démarrage du pool plus coûteux)
+PARALLEL_MIN_FILES = 32
+
+
+def _parse_summary_safe(content: str) -> Dict[str, Any]:
+    try:
+        return parse_summary(content)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def parse_summaries(contents: List[str], workers: int = 2) -> List[Dict[str, Any]]:
+    """Parse des summaries, en parallèle quand ils sont nombreux"""
+    if workers <= 1 or len(contents) < PARALLEL_MIN_FILES:
+        return [_parse_summary_safe(content) for content in contents]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_summary_safe, contents, chunksize=16))
+
+
+class SummaryMatchIndex:
+    """
+    Tournois d'un utilisateur indexés pour leur associer un summary :
+    identifiant Winamax du tournoi, sinon nom et date (la date du tournoi,
+    celle de sa première main, doit suivre le début indiqué par le summary).
+    """
+
+    def __init__(self, rows: List[Mapping[str, Any]], winamax_ids: Mapping[str, str]):
+        self.by_winamax_id: Dict[str, List[Tuple[str, str]]] = {}
+        self.by_name: Dict[str, List[Tuple[datetime, str]]] = {}
+        for row in rows:
+            winamax_id = winamax_ids.get(row['id'])
+            if winamax_id:
+                self.by_winamax_id.setdefault(winamax_id, []).append((row['name'], row['id']))
+            self.by_name.setdefault(row['name'], []).append((datetime.fromisoformat(row['date']), row['id']))
+
+    def match(self, summary_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """(id du tournoi, critère utilisé) ou (None, None)"""
+        same_id = self.by_winamax_id.get(summary_data.get('winamax_id'), [])
+        if len(same_id) > 1:
+            # Import en double du même tournoi sous un autre nom : le nom départage
+            same_id = [entry for entry in same_id if entry[0] == summary_data.get('tournament_name')]
+        if same_id:
+            return same_id[0][1], 'winamax_id'
+
+        candidates = self.by_name.get(summary_data.get('tournament_name'), [])
+        started_at = summary_data.get('started_at')
+        if started_at is None:
+            # Sans date de début, seul un tournoi de ce nom est sans ambiguïté
+            return (candidates[0][1], 'name') if len(candidates) == 1 else (None, None)
+
+        in_window = [(abs(date - started_at), tournament_id) for date, tournament_id in candidates
+                     if started_at - MATCH_BEFORE <= date <= started_at + MATCH_AFTER]
+        if not in_window:
+            return None, None
+        return min(in_window)[1], 'name_date'
+
+
+class SummaryMatcher:
+    """
+    Mise à jour en masse des tournois depuis des fichiers summary : parsing
+    (parallèle), association à chaque tournoi (SummaryMatchIndex), puis toutes
+    les mises à jour en une seule écriture du stockage.
+    """
+
+    def __init__(self, storage, user_id: str, workers: int = 2):
+        self.storage = storage
+        self.user_id = user_id
+        self.workers = workers
+        self.importer = TournamentImporter(storage, user_id)
+        # Identifiant Winamax par tournoi (tiré de sa première main, ne change jamais)
+        self._winamax_ids: Dict[str, str] = {}
+
+    def _winamax_id(self, tournament_id: str) -> str:
+        winamax_id = self._winamax_ids.get(tournament_id)
+        if winamax_id is None:
+            hands = self.storage.get_hands_page(tournament_id, 0, 1)
+            match = TABLE_TOURNAMENT_ID.search(hands[0].table_name) if hands else None
+            winamax_id = match.group(1) if match else ''
+            if hands:
+                self._winamax_ids[tournament_id] = winamax_id
+        return winamax_id
+
+    def build_index(self) -> SummaryMatchIndex:
+        rows = [row for row in self.storage.snapshot.rows() if row.get('user_id') == self.user_id]
+        return SummaryMatchIndex(rows, {row['id']: self._winamax_id(row['id']) for row in rows})
+
+    def update_from_summaries(self, files: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Associe et applique des summaries (nom de fichier, contenu) ; résultat par fichier"""
+        parsed = parse_summaries([content for _, content in files], self.workers)
+        index = self.build_index()
+
+        results: List[Dict[str, Any]] = []
+        updates: List[Tuple[str, Dict[str, Any]]] = []
+        for (filename, _), summary_data in zip(files, parsed):
+            result: Dict[str, Any] = {'file': filename}
+            results.append(result)
+            if 'error' in summary_data or not summary_data.get('tournament_name'):
+                result.update(status='error', error=summary_data.get('error', "Summary Winamax illisible"))
+                continue
+
+            tournament_id, matched_by = index.match(summary_data)
+            if tournament_id is None:
+                result.update(status='unmatched', tournament_name=summary_data.get('tournament_name'))
+                continue
+            result.update(status='updated', tournament_id=tournament_id, matched_by=matched_by,
+                          summary_data=summary_data)
+            updates.append((tournament_id, summary_data))
+
+        self.importer.apply_summaries(updates)
+        return {
+            'files': results,
+            'total_files': len(results),
+            'updated': len(updates),
+            'unmatched': sum(1 for result in results if result['status'] == 'unmatched'),
+            'errors': sum(1 for result in results if result['status'] == 'error')
+        }
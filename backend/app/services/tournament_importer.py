@@ -0,0 +1,223 @@
+# services/tournament_importer.py
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from .winamax_parser import WinamaxParser
+from .hand_metrics import HandMetricsPipeline
+
+logger = logging.getLogger(__name__)
+
+# Parser et pipeline par processus (réutilisés d'un fichier à l'autre dans un worker)
+_parser: Optional[WinamaxParser] = None
+_metrics_pipeline: Optional[HandMetricsPipeline] = None
+
+
+def _components() -> Tuple[WinamaxParser, HandMetricsPipeline]:
+    global _parser, _metrics_pipeline
+    if _parser is None:
+        _parser = WinamaxParser()
+    if _metrics_pipeline is None:
+        _metrics_pipeline = HandMetricsPipeline()
+    return _parser, _metrics_pipeline
+
+
+def parse_tournament(content: str, summary_content: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse un historique de tournoi (et son summary) : infos du tournoi, mains
+    avec leurs métriques dérivées. Sans accès au stockage : exécutable dans un
+    processus worker.
+    """
+    parser, metrics_pipeline = _components()
+    tournament_data = parser.parse_tournament_file(content)
+    hands_data = metrics_pipeline.process(parser.extract_hands(content))
+    summary_data = parser.parse_summary_file(summary_content) if summary_content else None
+    return {'tournament': tournament_data, 'hands': hands_data, 'summary': summary_data}
+
+
+def parse_hands(hand_blocks: List[str], first_index: int) -> List[Dict[str, Any]]:
+    """Mains (avec métriques) de blocs découpés au fil de l'eau, voir HandStreamSplitter"""
+    parser, metrics_pipeline = _components()
+    return metrics_pipeline.process(parser.parse_hand_blocks(hand_blocks, first_index))
+
+
+def parse_summary(summary_content: str) -> Dict[str, Any]:
+    parser, _ = _components()
+    return parser.parse_summary_file(summary_content)
+
+
+def summary_fields(summary_data: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs du tournoi issus d'un summary ; current fournit les valeurs par défaut"""
+    return dict(
+        final_position=summary_data.get('final_position', current.get('final_position', 0)),
+        total_players=summary_data.get('total_players', current.get('total_players', 0)),
+        profit_loss=summary_data.get('profit_loss', current.get('profit_loss', 0.0)),
+        buy_in=summary_data.get('buy_in', current.get('buy_in', 0.0)),
+        fee=0,
+        late_registration_count=summary_data.get('late_registration_count', 0),
+        re_entries_count=summary_data.get('re_entries_count', 0),
+        total_entries=summary_data.get('entries_count', 1),
+        total_cost=summary_data.get('total_cost', current.get('buy_in', 0.0)),
+        total_winnings=summary_data.get('combined_winnings', 0.0)
+    )
+
+
+class TournamentImporter:
+    """
+    Enregistrement des tournois parsés dans le stockage : contrôle des
+    doublons, création journalisée du tournoi et de ses mains (en lot),
+    application d'un summary. Partagé par l'endpoint d'upload et l'import
+    en masse d'un dossier.
+    """
+
+    def __init__(self, storage, user_id: str):
+        self.storage = storage
+        self.user_id = user_id
+
+    def import_tournament(self, content: str, summary_content: Optional[str] = None) -> Dict[str, Any]:
+        """Parse et enregistre un tournoi (un seul bloc d'écriture)"""
+        parsed = parse_tournament(content, summary_content)
+        logger.info(f"Tournament data parsed: {parsed['tournament']}")
+        logger.info(f"Extracted {len(parsed['hands'])} hands")
+        return self.store_many([parsed])[0]
+
+    def store_many(self, parsed_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Enregistre des tournois parsés (voir parse_tournament) en une seule
+        transaction et une seule écriture de chaque fichier de stockage.
+        Un upload interrompu est annulé au redémarrage (journal).
+        """
+        storage = self.storage
+        results: List[Optional[Dict[str, Any]]] = [None] * len(parsed_list)
+        existing_list: List[Tuple[Any, Dict[str, Any]]] = []
+        planned: List[Tuple[int, str]] = []
+        duplicates: List[Tuple[int, int]] = []
+        seen: Dict[Tuple[str, datetime], int] = {}
+
+        # Écrivain unique : les tournois et leurs mains sont publiés ensemble en fin de bloc
+        with storage.snapshots.writing():
+            for i, parsed in enumerate(parsed_list):
+                tournament_data = parsed['tournament']
+                key = (tournament_data['name'], tournament_data['date'])
+
+                existing = storage.get_existing_tournament(
+                    name=tournament_data['name'],
+                    date=tournament_data['date'],
+                    user_id=self.user_id
+                )
+                if existing is not None or key in seen:
+                    logger.warning(f"Tournament already exists: {tournament_data['name']} on {tournament_data['date']}")
+                    if existing is not None:
+                        existing_list.append((existing, parsed))
+                        results[i] = self._exists_result(existing.id, existing.name,
+                                                         storage.count_hands(existing.id),
+                                                         existing.tournament_type)
+                    else:
+                        # Doublon dans le lot : même résultat que sa première occurrence
+                        duplicates.append((i, seen[key]))
+                    continue
+
+                seen[key] = i
+                planned.append((i, str(uuid.uuid4())))
+
+            # Ids attribués avant 'begin' : la reprise sait quels tournois annuler
+            # quel que soit le moment de l'arrêt
+            journaled = [
+                {
+                    'id': tournament_id,
+                    'user_id': self.user_id,
+                    'name': parsed_list[i]['tournament']['name'],
+                    'date': parsed_list[i]['tournament']['date'].isoformat()
+                }
+                for i, tournament_id in planned
+            ]
+            with storage.journal.transaction('upload', tournaments=journaled):
+                with storage.bulk_writes():
+                    for existing, parsed in existing_list:
+                        if parsed.get('summary'):
+                            self._apply_summary_fields(existing, parsed['summary'])
+
+                    for i, tournament_id in planned:
+                        parsed = parsed_list[i]
+                        tournament_data = parsed['tournament']
+                        fields = dict(
+                            buy_in=tournament_data['buy_in'],
+                            fee=tournament_data['fee'],
+                            total_players=tournament_data.get('total_players', 0),
+                            final_position=tournament_data.get('final_position', 0),
+                            profit_loss=tournament_data['profit_loss']
+                        )
+                        if parsed.get('summary'):
+                            fields.update(summary_fields(parsed['summary'], fields))
+
+                        tournament = storage.create_tournament(
+                            user_id=self.user_id,
+                            name=tournament_data['name'],
+                            date=tournament_data['date'],
+                            tournament_type=tournament_data.get('tournament_type', 'Unknown'),
+                            tournament_id=tournament_id,
+                            **fields
+                        )
+                        logger.info(f"Tournament created with ID: {tournament.id}")
+
+                        storage.create_hands(tournament.id, parsed['hands'])
+                        results[i] = {
+                            "tournament_id": tournament.id,
+                            "name": tournament.name,
+                            "total_hands": len(parsed['hands']),
+                            "tournament_type": tournament_data.get('tournament_type', 'Unknown'),
+                            "message": "Tournoi uploadé et parsé avec succès",
+                            "status": "created",
+                            "existing": False
+                        }
+
+        for i, first_index in duplicates:
+            first = results[first_index]
+            results[i] = self._exists_result(first['tournament_id'], first['name'],
+                                             first['total_hands'], first['tournament_type'])
+        return results
+
+    @staticmethod
+    def _exists_result(tournament_id: str, name: str, total_hands: int, tournament_type: str) -> Dict[str, Any]:
+        return {
+            "tournament_id": tournament_id,
+            "name": name,
+            "total_hands": total_hands,
+            "tournament_type": tournament_type,
+            "message": "Ce tournoi est déjà présent dans votre collection",
+            "status": "exists",
+            "existing": True
+        }
+
+    def _apply_summary_fields(self, tournament, summary_data: Dict[str, Any]):
+        self.storage.update_tournament(tournament.id, **summary_fields(summary_data, tournament.to_dict()))
+
+    def apply_summary(self, tournament_id: str, summary_data: Dict[str, Any]):
+        """Applique les champs d'un summary au tournoi (journalisé : rejoué au redémarrage)"""
+        tournament = self.storage.get_tournament_by_id(tournament_id)
+        if tournament is None or not summary_data:
+            return tournament
+        fields = summary_fields(summary_data, tournament.to_dict())
+        with self.storage.journal.transaction('summary_update', tournament_id=tournament_id, fields=fields):
+            return self.storage.update_tournament(tournament_id=tournament_id, **fields)
+
+    def apply_summaries(self, updates: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Applique plusieurs summaries (id du tournoi, données) en une seule
+        transaction et une seule écriture du fichier des tournois.
+        """
+        storage = self.storage
+        with storage.snapshots.writing():
+            fields_list = []
+            for tournament_id, summary_data in updates:
+                tournament = storage.get_tournament_by_id(tournament_id)
+                if tournament is not None and summary_data:
+                    fields_list.append({'tournament_id': tournament_id,
+                                        'fields': summary_fields(summary_data, tournament.to_dict())})
+            if not fields_list:
+                return
+            with storage.journal.transaction('summary_update_batch', updates=fields_list):
+                with storage.bulk_writes():
+                    for update in fields_list:
+                        storage.update_tournament(tournament_id=update['tournament_id'], **update['fields'])
@@ -1,11 +1,93 @@
 # services/winamax_parser.py
 import re
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+HAND_HEADER = 'Winamax Poker - Tournament'
+HAND_HEADER_PATTERN = re.compile(f'(?={HAND_HEADER})')
+SUMMARY_MARKER = '*** SUMMARY ***'
+SUMMARY_HEADER = 'Winamax Poker - Tournament summary'
+
+# Summary : expressions précompilées et sous-chaîne qui doit figurer sur la ligne
+SUMMARY_PATTERNS = {
+    'header': re.compile(r'Tournament summary : (.+)\((\d+)\)\s*$'),
+    'started': re.compile(r'Tournament started (\d{4})/(\d{2})/(\d{2}) (\d{2}):(\d{2}):(\d{2})'),
+    'position': re.compile(r'You finished in (\d+)(?:th|st|nd|rd) place'),
+    'players': re.compile(r'Registered players : (\d+)'),
+    'buy_in': re.compile(r'Buy-In : ([0-9.,]+)€ \+ ([0-9.,]+)€ \+ ([0-9.,]+)€'),
+    'played': re.compile(r'You played ([0-9]+)min ([0-9]+)s'),
+    'won_combined': re.compile(r'You won ([0-9.,]+)€ \+ Bounty ([0-9.,]+)€'),
+    'won_bounty': re.compile(r'You won Bounty ([0-9.,]+)€'),
+    'won_cash': re.compile(r'You won ([0-9.,]+)€(?! \+ Bounty)'),
+}
+SUMMARY_MARKERS = (
+    ('header', 'Tournament summary : '),
+    ('started', 'Tournament started '),
+    ('position', 'You finished in '),
+    ('players', 'Registered players : '),
+    ('buy_in', 'Buy-In : '),
+    ('played', 'You played '),
+)
+
+
+class HandStreamSplitter:
+    """
+    Découpage incrémental d'un historique en cours d'écriture : le texte est
+    fourni par morceaux et seules les mains complètes sont rendues (une main
+    est complète quand l'en-tête suivant est arrivé, ou quand son résumé est
+    suivi d'une ligne vide). Le reste est gardé jusqu'au morceau suivant.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        # Mains rendues ; le texte avant le premier en-tête compte comme bloc 0 (comme re.split)
+        self.emitted = 0
+
+    @property
+    def next_index(self) -> int:
+        """Rang dans le fichier de la prochaine main rendue (voir parse_hand_blocks)"""
+        return self.emitted + 1
+
+    @property
+    def pending(self) -> int:
+        """Caractères en attente d'une main complète"""
+        return len(self._buffer)
+
+    def feed(self, text: str) -> List[str]:
+        buffer = self._buffer + text
+        starts = [m.start() for m in HAND_HEADER_PATTERN.finditer(buffer)]
+        if not starts:
+            # Préambule (ou rien) avant le premier en-tête
+            self._buffer = buffer
+            return []
+
+        blocks = [buffer[start:end] for start, end in zip(starts, starts[1:])]
+        last = buffer[starts[-1]:]
+        summary = last.find(SUMMARY_MARKER)
+        end = last.find('\n\n', summary) if summary >= 0 else -1
+        if end >= 0:
+            # La main s'arrête aux lignes vides ; la suite est le début de la suivante
+            end += 2
+            while end < len(last) and last[end] == '\n':
+                end += 1
+            blocks.append(last[:end])
+            last = last[end:]
+        self._buffer = last
+        self.emitted += len(blocks)
+        return blocks
+
+    def flush(self) -> List[str]:
+        """Fin du fichier : rend la dernière main même sans ligne vide finale"""
+        last, self._buffer = self._buffer, ''
+        if not last.startswith(HAND_HEADER):
+            return []
+        self.emitted += 1
+        return [last]
+
+
 class WinamaxParser:
     def __init__(self):
         self.tournament_pattern = r'Winamax Poker - Tournament "([^"]+)" buyIn: ([0-9.,]+)€ \+ ([0-9.,]+)€'
@@ -92,12 +174,11 @@ class WinamaxParser:
             return "Unknown"
     
     def parse_summary_file(self, content: str) -> Dict[str, Any]:
-        """Parse le fichier summary avec gestion des re-entries"""
+        """Parse le fichier summary avec gestion des re-entries (une seule passe sur les lignes)"""
         try:
             summary_info = {}
             
-            summary_sections = re.split(r'(?=Winamax Poker - Tournament summary)', content)
-            summary_sections = [section.strip() for section in summary_sections if section.strip()]
+            summary_sections = [self._scan_summary_section(section) for section in self._split_summary_sections(content)]
             
             logger.info(f"Found {len(summary_sections)} tournament entries")
             
@@ -107,26 +188,29 @@ class WinamaxParser:
             total_entries = len(summary_sections)
             re_entries_count = max(0, total_entries - 1)
             
-            late_registration_count = 0
-            for section in summary_sections:
-                if "Late Registration" in section:
-                    late_registration_count += 1
-            
+            late_registration_count = sum(1 for section in summary_sections if section['late_registration'])
             has_late_registration = late_registration_count > 0
+            first_section = summary_sections[0]
             last_section = summary_sections[-1]
             
-            # Extraire la position finale
-            final_position_match = re.search(r'You finished in (\d+)(?:th|st|nd|rd) place', last_section)
-            if final_position_match:
-                summary_info['final_position'] = int(final_position_match.group(1))
+            # Identification du tournoi (association du summary à son historique)
+            if first_section['header']:
+                summary_info['tournament_name'] = first_section['header'].group(1).strip()
+                summary_info['winamax_id'] = first_section['header'].group(2)
+            
+            if first_section['started']:
+                summary_info['started_at'] = datetime(*map(int, first_section['started'].groups()))
+            
+            # Position finale
+            if last_section['position']:
+                summary_info['final_position'] = int(last_section['position'].group(1))
             
             # Nombre de joueurs
-            players_match = re.search(r'Registered players : (\d+)', last_section)
-            if players_match:
-                summary_info['total_players'] = int(players_match.group(1))
+            if last_section['players']:
+                summary_info['total_players'] = int(last_section['players'].group(1))
             
             # Buy-in
-            buyin_match = re.search(r'Buy-In : ([0-9.,]+)€ \+ ([0-9.,]+)€ \+ ([0-9.,]+)€', last_section)
+            buyin_match = last_section['buy_in']
             if buyin_match:
                 base_buyin = float(buyin_match.group(1).replace(',', '.'))
                 bounty = float(buyin_match.group(2).replace(',', '.'))
@@ -148,35 +232,13 @@ class WinamaxParser:
                     'cost_per_entry': single_buy_in
                 }
             
-            # Calculer les gains
+            # Gains (additionnés dans l'ordre des lignes, sections comprises)
             total_winnings = 0.0
             total_bounties = 0.0
-            
             for section in summary_sections:
-                section_lines = section.split('\n')
-                
-                for line in section_lines:
-                    line = line.strip()
-                    
-                    combined_match = re.search(r'You won ([0-9.,]+)€ \+ Bounty ([0-9.,]+)€', line)
-                    if combined_match:
-                        cash_win = float(combined_match.group(1).replace(',', '.'))
-                        bounty_win = float(combined_match.group(2).replace(',', '.'))
-                        total_winnings += cash_win
-                        total_bounties += bounty_win
-                        continue
-                    
-                    bounty_only_match = re.search(r'You won Bounty ([0-9.,]+)€', line)
-                    if bounty_only_match:
-                        bounty_win = float(bounty_only_match.group(1).replace(',', '.'))
-                        total_bounties += bounty_win
-                        continue
-                    
-                    cash_only_match = re.search(r'You won ([0-9.,]+)€(?! \+ Bounty)', line)
-                    if cash_only_match and 'Bounty' not in line:
-                        cash_win = float(cash_only_match.group(1).replace(',', '.'))
-                        total_winnings += cash_win
-                        continue
+                for cash_win, bounty_win in section['wins']:
+                    total_winnings += cash_win
+                    total_bounties += bounty_win
             
             summary_info['total_winnings'] = round(total_winnings, 2)
             summary_info['total_bounties'] = round(total_bounties, 2)
@@ -205,7 +267,7 @@ class WinamaxParser:
             summary_info['has_late_registration'] = has_late_registration
             
             # Temps de jeu
-            time_match = re.search(r'You played ([0-9]+)min ([0-9]+)s', last_section)
+            time_match = last_section['played']
             if time_match:
                 minutes = int(time_match.group(1))
                 seconds = int(time_match.group(2))
@@ -222,14 +284,71 @@ class WinamaxParser:
             logger.error(f"Error parsing summary file: {e}")
             return {}
     
+    @staticmethod
+    def _split_summary_sections(content: str) -> List[str]:
+        """Une section par entrée (re-entry) ; un préambule non vide compte comme une section"""
+        sections = []
+        start = 0
+        while True:
+            end = content.find(SUMMARY_HEADER, start + 1 if start or content.startswith(SUMMARY_HEADER) else 0)
+            section = content[start:end if end >= 0 else len(content)].strip()
+            if section:
+                sections.append(section)
+            if end < 0:
+                return sections
+            start = end
+    
+    @staticmethod
+    def _scan_summary_section(section: str) -> Dict[str, Any]:
+        """
+        Parcourt une fois les lignes d'une section : première occurrence de
+        chaque champ et gains ligne par ligne. Un test de sous-chaîne précède
+        chaque expression régulière (la plupart des lignes n'en déclenchent aucune).
+        """
+        fields = {'header': None, 'started': None, 'position': None, 'players': None,
+                  'buy_in': None, 'played': None, 'late_registration': False, 'wins': []}
+        wins = fields['wins']
+        for line in section.split('\n'):
+            if 'You won' in line:
+                win = WinamaxParser._summary_win(line.strip())
+                if win:
+                    wins.append(win)
+            if 'Late Registration' in line:
+                fields['late_registration'] = True
+            for field, marker in SUMMARY_MARKERS:
+                if fields[field] is None and marker in line:
+                    fields[field] = SUMMARY_PATTERNS[field].search(line)
+        return fields
+    
+    @staticmethod
+    def _summary_win(line: str) -> Optional[Tuple[float, float]]:
+        """Gain d'une ligne "You won ..." : (cash, bounty)"""
+        match = SUMMARY_PATTERNS['won_combined'].search(line)
+        if match:
+            return float(match.group(1).replace(',', '.')), float(match.group(2).replace(',', '.'))
+        match = SUMMARY_PATTERNS['won_bounty'].search(line)
+        if match:
+            return 0.0, float(match.group(1).replace(',', '.'))
+        if 'Bounty' not in line:
+            match = SUMMARY_PATTERNS['won_cash'].search(line)
+            if match:
+                return float(match.group(1).replace(',', '.')), 0.0
+        return None
+    
     def extract_hands(self, content: str) -> List[Dict[str, Any]]:
         """Extrait toutes les mains du fichier"""
-        hands = []
-        
         # Séparer les mains individuelles
-        hand_blocks = re.split(r'(?=Winamax Poker - Tournament)', content)
+        hand_blocks = HAND_HEADER_PATTERN.split(content)
+        return self.parse_hand_blocks(hand_blocks)
+    
+    def parse_hand_blocks(self, hand_blocks: List[str], first_index: int = 0) -> List[Dict[str, Any]]:
+        """
+        Parse des blocs de mains déjà découpés. first_index est le rang du
+        premier bloc dans le fichier (numérotation identique à extract_hands).
+        """
+        hands = []
         
-        for i, block in enumerate(hand_blocks):
+        for i, block in enumerate(hand_blocks, first_index):
             if not block.strip():
                 continue
                 
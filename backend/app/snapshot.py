@@ -0,0 +1,164 @@
+# snapshot.py
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set
+import logging
+
+from .tournament_index import TournamentIndex
+
+logger = logging.getLogger(__name__)
+
+_DELETED = object()
+
+
+class TournamentView:
+    """Vue immuable d'un tournoi : sa ligne (lecture seule) et ses mains figées"""
+    __slots__ = ('row', 'hands')
+
+    def __init__(self, row: Optional[Mapping[str, Any]], hands):
+        self.row = row
+        self.hands = hands
+
+
+class StorageSnapshot:
+    """État publié du stockage : jamais modifié, remplacé en bloc par l'écrivain"""
+    __slots__ = ('version', 'tournaments', 'index')
+
+    def __init__(self, version: int, tournaments: Dict[str, TournamentView], index: TournamentIndex):
+        self.version = version
+        self.tournaments: Mapping[str, TournamentView] = MappingProxyType(tournaments)
+        self.index = index
+
+    def tournament(self, tournament_id: str) -> Optional[Mapping[str, Any]]:
+        view = self.tournaments.get(tournament_id)
+        return view.row if view is not None else None
+
+    def rows(self) -> List[Mapping[str, Any]]:
+        return [view.row for view in self.tournaments.values() if view.row is not None]
+
+    def hands(self, tournament_id: str):
+        view = self.tournaments.get(tournament_id)
+        return view.hands if view is not None else None
+
+
+class SnapshotStore:
+    """
+    Contrôle de concurrence lecteurs/écrivain du stockage.
+
+    Les lecteurs prennent self.current (une simple lecture d'attribut) et
+    travaillent sur cet état immuable sans aucun verrou : une écriture en
+    cours ne les bloque jamais et ils ne voient jamais un état partiel.
+
+    Un seul écrivain à la fois (writing()). Les écritures marquent les
+    tournois modifiés ; en sortie du bloc d'écriture le plus externe, un
+    nouveau snapshot est construit par copie sur écriture (seules les vues
+    des tournois modifiés sont reconstruites, les autres sont partagées)
+    puis publié par échange atomique de la référence.
+    """
+
+    def __init__(self, load_rows: Callable[[], List[Dict[str, Any]]],
+                 load_hands: Callable[[str], Any], hand_tournament_ids: Callable[[], List[str]]):
+        self._load_rows = load_rows
+        self._load_hands = load_hands
+        self._hand_tournament_ids = hand_tournament_ids
+
+        self._writer = threading.RLock()
+        self._depth = 0
+        self._rows: Dict[str, Any] = {}
+        self._hands: Set[str] = set()
+        self._rebuild = False
+        self._publish_hooks: List[Callable[[], None]] = []
+        self.current: Optional[StorageSnapshot] = None
+        self.stats = {'published': 0, 'rebuilt': 0, 'views_rebuilt': 0}
+
+    # ----- écrivain -----
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """Bloc d'écriture exclusif ; publication du snapshot à la sortie du bloc externe"""
+        with self._writer:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._publish()
+                    for hook in self._publish_hooks:
+                        hook()
+
+    def add_publish_hook(self, hook: Callable[[], None]) -> None:
+        """Fonction appelée (verrou d'écriture tenu) à la fin de chaque bloc d'écriture externe"""
+        self._publish_hooks.append(hook)
+
+    def set_row(self, tournament_id: str, row: Optional[Dict[str, Any]]) -> None:
+        """Nouvelle ligne d'un tournoi (None : tournoi supprimé)"""
+        self._rows[tournament_id] = _DELETED if row is None else MappingProxyType(dict(row))
+
+    def touch_hands(self, tournament_id: str) -> None:
+        """Les mains du tournoi ont changé"""
+        self._hands.add(tournament_id)
+
+    def invalidate(self) -> None:
+        """Tout le stockage a changé (restauration, nettoyage) : reconstruction complète"""
+        self._rebuild = True
+
+    def build(self) -> StorageSnapshot:
+        """Construit et publie un snapshot complet depuis le disque"""
+        with self._writer:
+            tournaments: Dict[str, TournamentView] = {}
+            for row in self._load_rows():
+                tournaments[row['id']] = TournamentView(MappingProxyType(row), self._load_hands(row['id']))
+            for tournament_id in self._hand_tournament_ids():
+                if tournament_id not in tournaments:
+                    tournaments[tournament_id] = TournamentView(None, self._load_hands(tournament_id))
+
+            version = self.current.version + 1 if self.current else 1
+            self.current = StorageSnapshot(version, tournaments, TournamentIndex.build(tournaments))
+            self._rows.clear()
+            self._hands.clear()
+            self._rebuild = False
+            self.stats['rebuilt'] += 1
+            return self.current
+
+    def _publish(self):
+        if self.current is None:
+            # Pas encore construit (reprise du journal au démarrage)
+            self._rows.clear()
+            self._hands.clear()
+            return
+        if self._rebuild:
+            self.build()
+            return
+        if not self._rows and not self._hands:
+            return
+        try:
+            tournaments = dict(self.current.tournaments)
+            changed: Dict[str, Optional[TournamentView]] = {}
+            for tournament_id in set(self._rows) | self._hands:
+                previous = tournaments.get(tournament_id)
+                row = self._rows.get(tournament_id, previous.row if previous else None)
+                if row is _DELETED:
+                    row = None
+                if tournament_id in self._hands or previous is None:
+                    hands = self._load_hands(tournament_id)
+                else:
+                    hands = previous.hands
+
+                if row is None and not len(hands):
+                    tournaments.pop(tournament_id, None)
+                else:
+                    tournaments[tournament_id] = TournamentView(row, hands)
+                changed[tournament_id] = tournaments.get(tournament_id)
+                self.stats['views_rebuilt'] += 1
+
+            self.current = StorageSnapshot(self.current.version + 1, tournaments,
+                                           self.current.index.updated(changed))
+            self.stats['published'] += 1
+        except Exception as e:
+            # Snapshot incohérent avec le disque : reconstruction complète
+            logger.error(f"Error publishing storage snapshot, rebuilding: {e}")
+            self.build()
+        finally:
+            self._rows.clear()
+            self._hands.clear()
@@ -1,55 +1,381 @@
 # storage.py
+import functools
 import json
 import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from .models import User, Tournament, Hand, Player, TournamentSummary, ActionDetails, HandAnalysis, PlayerStats
+from typing import Dict, Iterator, List, Optional, Any
+from .models import User, Tournament, Hand, HandRecord, Player, TournamentSummary, ActionDetails, HandAnalysis, PlayerStats
+from .services.replay_builder import ReplayBuilder
+from .services.hand_metrics import HandMetricsPipeline
+from .hand_index import HandSearchIndex
+from .text_index import HandTextIndex
+from .columnar_store import ColumnarStore, hand_features
+from .hand_log import HandLog
+from .hand_shards import ShardedHandStore, migrate_to_shards
+from .journal import WriteAheadJournal
+from .serialization import get_codec, load_file
+from .snapshot import SnapshotStore, StorageSnapshot
+from .hero_rollup import HeroRollup
+from .player_registry import PlayerRegistry
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Intervalle minimal entre deux vérifications des écritures d'autres processus
+EXTERNAL_CHECK_INTERVAL = 1.0
+
+def _writer(method):
+    """Méthode d'écriture : un seul écrivain à la fois, snapshot publié à la fin de l'écriture"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.snapshots.writing():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class FileStorage:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", hands_layout: Optional[str] = None,
+                 storage_format: Optional[str] = None):
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
+        self._bulk = None  # (thread, fichiers en mémoire) pendant bulk_writes()
+        self._renamed = threading.Event()  # fichier remplacé depuis le dernier fsync du répertoire
+        self._next_external_check = float('inf')  # pas de vérification avant la fin de l'ouverture
         
-        # Fichiers de stockage
-        self.users_file = os.path.join(data_dir, "users.json")
-        self.tournaments_file = os.path.join(data_dir, "tournaments.json")
-        self.hands_file = os.path.join(data_dir, "hands.json")
-        self.analyses_file = os.path.join(data_dir, "analyses.json")
-        self.stats_file = os.path.join(data_dir, "player_stats.json")
+        # Format de sérialisation (STORAGE_FORMAT) : json, json-compact, msgpack,
+        # avec compression optionnelle (+zlib). Les fichiers existants dans un
+        # autre format sont convertis au démarrage.
+        self.storage_format = (storage_format or os.getenv("STORAGE_FORMAT", "json")).lower()
+        self.codec = get_codec(self.storage_format)
+        
+        # Fichiers de stockage (extension selon le format)
+        self.storage_files = {
+            name: os.path.join(data_dir, f"{name}{self.codec.extension}")
+            for name in ("users", "tournaments", "analyses", "player_stats")
+        }
+        self.users_file = self.storage_files["users"]
+        self.tournaments_file = self.storage_files["tournaments"]
+        self.hands_file = os.path.join(data_dir, "hands.json")  # Ancien format (migré au démarrage)
+        self.hands_log_file = os.path.join(data_dir, "hands.log")
+        self.hands_dir = os.path.join(data_dir, "hands")  # Un shard par tournoi (optionnel)
+        self.analyses_file = self.storage_files["analyses"]
+        self.stats_file = self.storage_files["player_stats"]
+        
+        # Registre des joueurs : mains, replays et statistiques stockent des
+        # identifiants entiers, résolus en pseudos à la lecture
+        self.players = PlayerRegistry(os.path.join(data_dir, "players.jsonl"))
+        
+        self._migrate_storage_format()
         
         # Initialiser les fichiers s'ils n'existent pas
-        for file_path in [self.users_file, self.tournaments_file, self.hands_file, 
-                         self.analyses_file, self.stats_file]:
+        for file_path in self.storage_files.values():
             if not os.path.exists(file_path):
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump([], f)
+                self._save_json(file_path, [])
+        
+        # Mains : enregistrements indexés, lus via mmap, dans un seul journal
+        # ou un journal par tournoi (HANDS_LAYOUT=sharded) ; payloads dans le même format
+        payload_format = self.storage_format.replace('json-compact', 'json')
+        layout = hands_layout or os.getenv("HANDS_LAYOUT", "single")
+        if layout == "sharded" or ShardedHandStore.exists(self.hands_dir):
+            self.hands = ShardedHandStore(self.hands_dir, payload_format=payload_format, registry=self.players)
+            self._migrate_hands_log()
+        else:
+            self.hands = HandLog(self.hands_log_file, payload_format=payload_format, registry=self.players)
+        self._migrate_hands_json()
+        self._migrate_replays()
+        self._migrate_player_ids()
+        
+        # Cache des timelines de stack par tournoi (les mains sont immuables)
+        self._stack_timeline_cache: Dict[str, Dict[str, List]] = {}
+        
+        self.replay_builder = ReplayBuilder()
+        self.metrics_pipeline = HandMetricsPipeline()
+        
+        # Index des mains (recherche multi-critères et plein texte),
+        # construits au premier usage puis maintenus à chaque écriture
+        self._search_index: Optional[HandSearchIndex] = None
+        self._text_index: Optional[HandTextIndex] = None
+        
+        # Colonnes numériques par main (NumPy, memory-mappées) pour les agrégations
+        self.columnar = ColumnarStore(os.path.join(data_dir, "columns"))
+        
+        # Snapshot immuable (tournois + mains par tournoi) lu sans verrou par les
+        # requêtes ; les écritures passent par un seul écrivain qui le republie
+        self.snapshots = SnapshotStore(
+            lambda: self._load_json(self.tournaments_file),
+            self.hands.snapshot,
+            self.hands.tournament_ids
+        )
+        
+        # Agrégats du tableau de bord par héros, construits au premier usage puis
+        # tenus à jour par les écritures et publiés en fin de bloc d'écriture
+        self.hero_rollup = HeroRollup()
+        self.snapshots.add_publish_hook(self.hero_rollup.flush)
+        
+        # Journal des opérations en plusieurs étapes, repris au démarrage
+        self.journal = WriteAheadJournal(os.path.join(data_dir, "journal.log"))
+        self.journal.add_sync_hook(self.players.sync)
+        self.journal.add_sync_hook(self.hands.sync)
+        self.journal.add_sync_hook(self._sync_data_dir)
+        self.journal.register('upload', self._undo_upload, mode='undo')
+        self.journal.register('summary_update', self._redo_summary_update, mode='redo')
+        self.journal.register('summary_update_batch', self._redo_summary_updates, mode='redo')
+        self.journal.register('cascade_delete', self._redo_cascade_delete, mode='redo')
+        recovered = self.journal.recover()
+        if recovered:
+            logger.warning(f"Recovered {recovered} incomplete operations from the journal")
+        self.snapshots.build()
+        
+        # Écritures d'autres processus (import en masse, suivi d'historiques) : état
+        # des fichiers connu à la fin de chaque écriture, comparé à la lecture
+        self._known_state = self._external_state()
+        self._external_refresh: Optional[threading.Thread] = None
+        self.snapshots.add_publish_hook(self._record_external_state)
+        self._next_external_check = 0.0
+    
+    @property
+    def snapshot(self) -> StorageSnapshot:
+        """État publié courant (lecture sans verrou)"""
+        now = time.monotonic()
+        if now >= self._next_external_check:
+            self._next_external_check = now + EXTERNAL_CHECK_INTERVAL
+            self._check_external_writes()
+        return self.snapshots.current
+    
+    def _external_state(self) -> tuple:
+        """Date et taille des tournois et des mains, modifiées par toute écriture"""
+        try:
+            stat = os.stat(self.tournaments_file)
+            tournaments = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            tournaments = None
+        try:
+            hands = self.hands.size_bytes()
+        except FileNotFoundError:
+            hands = None
+        return tournaments, hands
+    
+    def _record_external_state(self):
+        self._known_state = self._external_state()
+    
+    def _check_external_writes(self):
+        """Fichiers modifiés hors de ce processus : snapshot republié en arrière-plan (les lecteurs n'attendent pas)"""
+        if self._external_state() == self._known_state:
+            return
+        if self._external_refresh is not None and self._external_refresh.is_alive():
+            return
+        self._external_refresh = threading.Thread(target=self.refresh_external_writes, daemon=True)
+        self._external_refresh.start()
+    
+    def refresh_external_writes(self) -> bool:
+        """Reconstruit le snapshot et les index si un autre processus a écrit des tournois ou des mains"""
+        with self.snapshots.writing():
+            # Écriture de ce processus en cours pendant la vérification : état déjà enregistré
+            if self._external_state() == self._known_state:
+                return False
+            logger.info("Data files changed by another process, rebuilding snapshot")
+            self._stack_timeline_cache.clear()
+            self._search_index = None
+            self._text_index = None
+            self.hero_rollup.reset()
+            self.snapshots.invalidate()
+            return True
     
     def _load_json(self, file_path: str) -> List[Dict]:
-        """Charge un fichier JSON"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if not content.strip():
-                    return []
-                return json.loads(content)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+        """Charge un fichier de stockage (format détecté : JSON, msgpack, compressé ou non)"""
+        bulk = self._bulk_files()
+        if bulk is not None and file_path in bulk:
+            return bulk[file_path]
+        try:
+            return load_file(file_path)
+        except (FileNotFoundError, ValueError, zlib.error) as e:
             logger.warning(f"Error loading {file_path}: {e}")
             return []
     
     def _save_json(self, file_path: str, data: List[Dict]):
-        """Sauvegarde un fichier JSON"""
+        """Sauvegarde un fichier dans le format configuré (fichier temporaire puis renommage atomique)"""
+        bulk = self._bulk_files()
+        if bulk is not None:
+            bulk[file_path] = data
+            return
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Pseudos référencés (statistiques) durables avant le fichier
+            self.players.sync()
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self.codec.dumps(data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+            self._renamed.set()
         except Exception as e:
             logger.error(f"Error saving {file_path}: {e}")
             raise
     
+    def _sync_data_dir(self):
+        """Rend durables les renommages de fichiers (fsync du répertoire), avant chaque fsync du journal"""
+        if not self._renamed.is_set():
+            return
+        self._renamed.clear()
+        fd = os.open(self.data_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    @contextmanager
+    def bulk_writes(self) -> Iterator[None]:
+        """
+        Import en masse : dans ce bloc (écrivain unique), les fichiers de stockage
+        lus et réécrits par l'écrivain restent en mémoire et ne sont écrits qu'une
+        fois à la sortie. Les autres threads lisent toujours les fichiers sur disque.
+        En cas d'exception, rien n'est écrit.
+        """
+        with self.snapshots.writing():
+            if self._bulk is not None:
+                yield
+                return
+            self._bulk = (threading.get_ident(), {})
+            try:
+                yield
+                files = self._bulk[1]
+                self._bulk = None
+                for file_path, data in files.items():
+                    self._save_json(file_path, data)
+            finally:
+                self._bulk = None
+    
+    def _bulk_files(self) -> Optional[Dict[str, List[Dict]]]:
+        bulk = self._bulk
+        if bulk is not None and bulk[0] == threading.get_ident():
+            return bulk[1]
+        return None
+    
+    # ===== REPRISE DU JOURNAL =====
+    def _undo_upload(self, data: Dict[str, Any]):
+        """
+        Upload interrompu : supprime le(s) tournoi(s) partiellement importé(s).
+        Les ids sont journalisés dans 'begin', avant toute écriture ; les
+        tournois de même nom et date (absents avant l'upload) sont aussi supprimés.
+        """
+        tournament_ids = set(data.get('tournament_ids') or [data.get('tournament_id')])
+        planned = data.get('tournaments') or []
+        tournament_ids.update(t['id'] for t in planned)
+        keys = {(t.get('user_id'), t.get('name'), t.get('date')) for t in planned}
+        if keys:
+            for t_data in self._load_json(self.tournaments_file):
+                if (t_data.get('user_id'), t_data.get('name'), t_data.get('date')) in keys:
+                    tournament_ids.add(t_data.get('id'))
+        for tournament_id in tournament_ids:
+            if tournament_id:
+                self.delete_tournament_and_hands(tournament_id)
+    
+    def _redo_summary_update(self, data: Dict[str, Any]):
+        """Mise à jour par summary interrompue : la réappliquer"""
+        self.update_tournament(data['tournament_id'], **data.get('fields', {}))
+    
+    def _redo_summary_updates(self, data: Dict[str, Any]):
+        """Mise à jour en masse par summaries interrompue : la réappliquer"""
+        for update in data.get('updates', []):
+            self._redo_summary_update(update)
+    
+    def _redo_cascade_delete(self, data: Dict[str, Any]):
+        """Suppression en cascade interrompue : la terminer"""
+        self.delete_tournament_and_hands(data['tournament_id'])
+    
+    def _migrate_storage_format(self):
+        """Convertit les fichiers écrits dans un autre format (ex. .json -> .msgpack), une seule fois"""
+        for name, file_path in self.storage_files.items():
+            if os.path.exists(file_path):
+                continue
+            for extension in (".json", ".json.z", ".msgpack", ".msgpack.z"):
+                old_path = os.path.join(self.data_dir, f"{name}{extension}")
+                if old_path == file_path or not os.path.exists(old_path):
+                    continue
+                try:
+                    data = load_file(old_path)
+                    self._save_json(file_path, data)
+                    os.replace(old_path, f"{old_path}.migrated")
+                    logger.info(f"Migrated {len(data)} records from {old_path} to {file_path}")
+                except Exception as e:
+                    logger.error(f"Error migrating {old_path}: {e}")
+                    raise
+                break
+    
+    def _migrate_hands_log(self):
+        """Répartit le journal unique hands.log dans les shards par tournoi, une seule fois"""
+        if not os.path.exists(self.hands_log_file):
+            return
+        try:
+            if len(self.hands) == 0:
+                count = migrate_to_shards(HandLog(self.hands_log_file, registry=self.players), self.hands)
+                logger.info(f"Migrated {count} hands from {self.hands_log_file} to {self.hands_dir}")
+            os.replace(self.hands_log_file, f"{self.hands_log_file}.migrated")
+        except Exception as e:
+            logger.error(f"Error migrating {self.hands_log_file}: {e}")
+            raise
+    
+    def _migrate_hands_json(self):
+        """Importe l'ancien hands.json dans le journal de mains, une seule fois"""
+        if not os.path.exists(self.hands_file):
+            return
+        try:
+            if len(self.hands) == 0:
+                hands = self._load_json(self.hands_file)
+                self.hands.append(hands)
+                logger.info(f"Migrated {len(hands)} hands from {self.hands_file} to {self.hands_log_file}")
+            os.replace(self.hands_file, f"{self.hands_file}.migrated")
+        except Exception as e:
+            logger.error(f"Error migrating {self.hands_file}: {e}")
+            raise
+    
+    def _migrate_replays(self):
+        """Rattache les timelines de l'ancien fichier replays à leur main dans le journal, une seule fois"""
+        for extension in (".json", ".json.z", ".msgpack", ".msgpack.z"):
+            replays_file = os.path.join(self.data_dir, f"replays{extension}")
+            if not os.path.exists(replays_file):
+                continue
+            try:
+                replays = {r.get('hand_id'): r for r in load_file(replays_file)}
+                hands = self.hands.all()
+                attached = 0
+                for h_data in hands:
+                    replay = replays.get(h_data.get('id'))
+                    if replay is not None and not h_data.get('replay'):
+                        h_data['replay'] = self.players.decode_replay(replay)
+                        attached += 1
+                if attached:
+                    self.hands.rewrite(hands)
+                os.replace(replays_file, f"{replays_file}.migrated")
+                logger.info(f"Migrated {attached} replays from {replays_file} to {self.hands_log_file}")
+            except Exception as e:
+                logger.error(f"Error migrating {replays_file}: {e}")
+                raise
+    
+    def _migrate_player_ids(self):
+        """Premier démarrage avec le registre : réécrit mains (et leurs replays) et statistiques avec des identifiants"""
+        if not self.players.created:
+            return
+        try:
+            hands = self.hands.all()
+            if hands:
+                self.hands.rewrite(hands)
+            all_stats = self._load_json(self.stats_file)
+            if all_stats:
+                self._save_json(self.stats_file, [self.players.encode_stats(st) for st in all_stats])
+            # Registre créé même sans joueur : la migration ne se refait pas
+            open(self.players.path, 'a').close()
+            logger.info(f"Interned {len(self.players)} player names in {self.players.path}")
+        except Exception as e:
+            logger.error(f"Error interning player names: {e}")
+            raise
+    
     # ===== GESTION DES UTILISATEURS =====
+    @_writer
     def create_user(self, email: str, hashed_password: str) -> User:
         """Crée un nouvel utilisateur"""
         users = self._load_json(self.users_file)
@@ -78,6 +404,7 @@ class FileStorage:
         return None
     
     # ===== GESTION DES TOURNOIS =====
+    @_writer
     def create_tournament(self, user_id: str, name: str, date: datetime, 
                         buy_in: float, fee: float, total_players: int, 
                         final_position: int, profit_loss: float, 
@@ -86,8 +413,9 @@ class FileStorage:
                         re_entries_count: int = 0,
                         total_entries: int = 1,
                         total_cost: float = 0.0,
-                        total_winnings: float = 0.0) -> Tournament:
-        """Crée un nouveau tournoi"""
+                        total_winnings: float = 0.0,
+                        tournament_id: Optional[str] = None) -> Tournament:
+        """Crée un nouveau tournoi (tournament_id : id attribué à l'avance, ex. journalisé)"""
         tournaments = self._load_json(self.tournaments_file)
         
         # Si total_cost n'est pas fourni, calculer selon la logique : buy_in × total_entries
@@ -95,7 +423,7 @@ class FileStorage:
             total_cost = buy_in * total_entries
         
         tournament = Tournament(
-            id=str(uuid.uuid4()),
+            id=tournament_id or str(uuid.uuid4()),
             user_id=user_id,
             name=name,
             date=date,
@@ -115,6 +443,11 @@ class FileStorage:
         
         tournaments.append(tournament.to_dict())
         self._save_json(self.tournaments_file, tournaments)
+        self.snapshots.set_row(tournament.id, tournaments[-1])
+        self.hero_rollup.set_tournament(tournament.id, tournaments[-1])
+        
+        if self._search_index is not None:
+            self._search_index.set_tournament_type(tournament.id, tournament_type)
         
         logger.info(f"Tournament created: {tournament.name} (ID: {tournament.id})")
         return tournament
@@ -122,9 +455,7 @@ class FileStorage:
     def tournament_exists(self, name: str, date: datetime, user_id: str) -> bool:
         """Vérifie si un tournoi avec le même nom et la même date existe déjà"""
         try:
-            tournaments = self._load_json(self.tournaments_file)
-            
-            for t_data in tournaments:
+            for t_data in self.snapshot.rows():
                 if (t_data.get('user_id') == user_id and 
                     t_data.get('name') == name and 
                     t_data.get('date') == date.isoformat()):
@@ -139,21 +470,11 @@ class FileStorage:
     def get_existing_tournament(self, name: str, date: datetime, user_id: str) -> Optional[Tournament]:
         """Récupère un tournoi existant avec le même nom et la même date"""
         try:
-            tournaments = self._load_json(self.tournaments_file)
-            
-            for t_data in tournaments:
+            for t_data in self.snapshot.rows():
                 if (t_data.get('user_id') == user_id and 
                     t_data.get('name') == name and 
                     t_data.get('date') == date.isoformat()):
-                    
-                    # Ajouter les champs manquants avec des valeurs par défaut
-                    self._ensure_tournament_fields(t_data)
-                    
-                    # Convertir les dates
-                    t_data['date'] = datetime.fromisoformat(t_data['date'])
-                    t_data['created_at'] = datetime.fromisoformat(t_data['created_at'])
-                    
-                    return Tournament(**t_data)
+                    return self._tournament_from_row(t_data)
             
             return None
         except Exception as e:
@@ -183,21 +504,27 @@ class FileStorage:
             total_entries = t_data.get('total_entries', 1)
             t_data['total_cost'] = buy_in * total_entries
     
+    def _tournament_from_row(self, row) -> Tournament:
+        """Tournoi à partir d'une ligne stockée (copiée : les lignes du snapshot sont en lecture seule)"""
+        t_data = dict(row)
+        
+        # Ajouter les champs manquants avec des valeurs par défaut
+        self._ensure_tournament_fields(t_data)
+        
+        # Convertir les dates
+        t_data['date'] = datetime.fromisoformat(t_data['date'])
+        t_data['created_at'] = datetime.fromisoformat(t_data['created_at'])
+        
+        return Tournament(**t_data)
+    
     def get_tournaments_by_user(self, user_id: str) -> List[Tournament]:
         """Récupère tous les tournois d'un utilisateur"""
-        tournaments = self._load_json(self.tournaments_file)
         user_tournaments = []
         
-        for t_data in tournaments:
+        for t_data in self.snapshot.rows():
             if t_data.get('user_id') == user_id:
                 try:
-                    self._ensure_tournament_fields(t_data)
-                    
-                    # Convertir les dates
-                    t_data['date'] = datetime.fromisoformat(t_data['date'])
-                    t_data['created_at'] = datetime.fromisoformat(t_data['created_at'])
-                    
-                    user_tournaments.append(Tournament(**t_data))
+                    user_tournaments.append(self._tournament_from_row(t_data))
                 except Exception as e:
                     logger.error(f"Error loading tournament {t_data.get('id', 'unknown')}: {e}")
                     continue
@@ -206,26 +533,36 @@ class FileStorage:
         user_tournaments.sort(key=lambda x: x.date, reverse=True)
         return user_tournaments
     
+    def query_tournaments(self, user_id: str, **filters) -> Dict[str, Any]:
+        """
+        Tournois filtrés, triés et paginés via l'index du snapshot
+        (filtres et tri : voir TournamentIndex.query)
+        """
+        snapshot = self.snapshot
+        result = snapshot.index.query(user_id=user_id, **filters)
+        
+        tournaments = []
+        for tournament_id in result.pop('ids'):
+            try:
+                tournaments.append(self._tournament_from_row(snapshot.tournament(tournament_id)))
+            except Exception as e:
+                logger.error(f"Error loading tournament {tournament_id}: {e}")
+        result['tournaments'] = tournaments
+        return result
+    
     def get_tournament_by_id(self, tournament_id: str) -> Optional[Tournament]:
         """Récupère un tournoi par son ID"""
-        tournaments = self._load_json(self.tournaments_file)
-        
-        for t_data in tournaments:
-            if t_data.get('id') == tournament_id:
-                try:
-                    self._ensure_tournament_fields(t_data)
-                    
-                    # Convertir les dates
-                    t_data['date'] = datetime.fromisoformat(t_data['date'])
-                    t_data['created_at'] = datetime.fromisoformat(t_data['created_at'])
-                    
-                    return Tournament(**t_data)
-                except Exception as e:
-                    logger.error(f"Error loading tournament {tournament_id}: {e}")
-                    return None
+        t_data = self.snapshot.tournament(tournament_id)
+        if t_data is None:
+            return None
         
-        return None
+        try:
+            return self._tournament_from_row(t_data)
+        except Exception as e:
+            logger.error(f"Error loading tournament {tournament_id}: {e}")
+            return None
     
+    @_writer
     def update_tournament(self, tournament_id: str, **kwargs) -> Optional[Tournament]:
         """Met à jour un tournoi avec les nouvelles données"""
         try:
@@ -250,9 +587,15 @@ class FileStorage:
                     
                     tournaments[i] = t_data
                     self._save_json(self.tournaments_file, tournaments)
+                    self.snapshots.set_row(tournament_id, t_data)
+                    self.hero_rollup.set_tournament(tournament_id, t_data)
+                    
+                    if self._search_index is not None and 'tournament_type' in kwargs:
+                        self._search_index.set_tournament_type(tournament_id, t_data['tournament_type'])
                     
                     logger.info(f"Tournament {tournament_id} updated successfully")
-                    return self.get_tournament_by_id(tournament_id)
+                    # Le snapshot n'est publié qu'en fin d'écriture : construire depuis la ligne écrite
+                    return self._tournament_from_row(t_data)
             
             logger.warning(f"Tournament {tournament_id} not found for update")
             return None
@@ -261,6 +604,7 @@ class FileStorage:
             logger.error(f"Error updating tournament {tournament_id}: {e}")
             raise
     
+    @_writer
     def delete_tournament(self, tournament_id: str) -> bool:
         """Supprime un tournoi par son ID"""
         try:
@@ -272,6 +616,8 @@ class FileStorage:
             
             if len(tournaments) < original_count:
                 self._save_json(self.tournaments_file, tournaments)
+                self.snapshots.set_row(tournament_id, None)
+                self.hero_rollup.set_tournament(tournament_id, None)
                 logger.info(f"Tournament {tournament_id} deleted successfully")
                 return True
             else:
@@ -283,10 +629,54 @@ class FileStorage:
             raise
     
     # ===== GESTION DES MAINS =====
+    @_writer
     def create_hand(self, tournament_id: str, hand_data: Dict[str, Any]) -> Hand:
         """Crée une nouvelle main"""
-        hands = self._load_json(self.hands_file)
+        return self.create_hands(tournament_id, [hand_data])[0]
+    
+    @_writer
+    def create_hands(self, tournament_id: str, hands_data: List[Dict[str, Any]]) -> List[Hand]:
+        """
+        Crée les mains d'un tournoi en lot : une seule écriture du journal de
+        mains (timelines de replay incluses) et du stockage colonnaire pour tout le lot.
+        """
+        hands = []
+        hand_dicts = []
+        replays = []
+        for hand_data in hands_data:
+            hand = self._new_hand(tournament_id, hand_data)
+            hand_dict = hand.to_dict()
+            
+            # Précalculer la timeline de replay et les métriques dérivées à l'ingestion
+            replay = self._build_replay(hand_dict)
+            if not hand.metrics:
+                hand.metrics = self.metrics_pipeline.compute(hand_dict, replay)
+                hand_dict['metrics'] = hand.metrics
+            
+            hands.append(hand)
+            hand_dicts.append(hand_dict)
+            replays.append(replay)
         
+        if not hands:
+            return hands
+        
+        # La timeline est stockée avec la main : lue via l'index du journal, écrite en ajout seul
+        self.hands.append([dict(hand_dict, replay=replay)
+                           for hand_dict, replay in zip(hand_dicts, replays)])
+        self.snapshots.touch_hands(tournament_id)
+        self._stack_timeline_cache.pop(tournament_id, None)
+        for hand_dict in hand_dicts:
+            self.hero_rollup.add_hands(tournament_id, hand_dict.get('hero_name', ''), 1)
+            self._index_hand(hand_dict)
+        
+        if self.columnar.initialized:
+            self.columnar.append_hands([hand_features(hand_dict, hand_dict['metrics']) for hand_dict in hand_dicts])
+        
+        logger.debug(f"{len(hands)} hands created for tournament {tournament_id}")
+        return hands
+    
+    def _new_hand(self, tournament_id: str, hand_data: Dict[str, Any]) -> Hand:
+        """Construit une main (nouvel id) à partir des données parsées"""
         # Convertir les players
         players_list = []
         for p in hand_data.get('players', []):
@@ -339,142 +729,98 @@ class FileStorage:
             summary=hand_data['summary'],
             pot_size=hand_data.get('pot_size', 0),
             rake=hand_data.get('rake', 0),
-            raw_text=hand_data.get('raw_text', '')
+            raw_text=hand_data.get('raw_text', ''),
+            metrics=hand_data.get('metrics') or {}
         )
         
-        hands.append(hand.to_dict())
-        self._save_json(self.hands_file, hands)
-        
-        logger.debug(f"Hand created: {hand.hand_number} for tournament {tournament_id}")
         return hand
     
-    def get_hands_by_tournament(self, tournament_id: str) -> List[Hand]:
-        """Récupère toutes les mains d'un tournoi"""
-        try:
-            hands = self._load_json(self.hands_file)
-            tournament_hands = []
-            
-            for h_data in hands:
-                if h_data.get('tournament_id') == tournament_id:
-                    try:
-                        # Reconstituer les objets Player
-                        players_list = []
-                        for player_data in h_data.get('players', []):
-                            if isinstance(player_data, dict):
-                                players_list.append(Player(
-                                    name=player_data.get('name', ''),
-                                    seat=player_data.get('seat', 0),
-                                    stack=player_data.get('stack', 0),
-                                    bounty=player_data.get('bounty', 0.0)
-                                ))
-                        
-                        h_data['players'] = players_list
-                        
-                        # Assurer les valeurs par défaut
-                        h_data.setdefault('ante_blinds_actions', [])
-                        h_data.setdefault('preflop_actions', [])
-                        h_data.setdefault('flop_actions', [])
-                        h_data.setdefault('turn_actions', [])
-                        h_data.setdefault('river_actions', [])
-                        h_data.setdefault('showdown', [])
-                        h_data.setdefault('summary', [])
-                        h_data.setdefault('small_blind', 0)
-                        h_data.setdefault('big_blind', 0)
-                        
-                        # Vérifier et convertir la date
-                        date_str = h_data.get('date')
-                        if isinstance(date_str, str):
-                            try:
-                                h_data['date'] = datetime.fromisoformat(date_str)
-                            except ValueError:
-                                h_data['date'] = datetime.now()
-                        elif not isinstance(date_str, datetime):
-                            h_data['date'] = datetime.now()
-                        
-                        tournament_hands.append(Hand(**h_data))
-                        
-                    except Exception as e:
-                        logger.error(f"Error loading hand {h_data.get('id', 'unknown')}: {e}")
-                        continue
-            
-            # Trier par numéro de main
-            tournament_hands.sort(key=lambda x: x.hand_number)
-            return tournament_hands
+    def get_hands_by_tournament(self, tournament_id: str) -> List[HandRecord]:
+        """Récupère toutes les mains d'un tournoi (hydratées paresseusement)"""
+        try:
+            # Triées par numéro de main par l'index du journal, lues dans le snapshot
+            hands = self.snapshot.hands(tournament_id)
+            return [HandRecord(h_data) for h_data in hands.page()] if hands is not None else []
                     
         except Exception as e:
             logger.error(f"Error in get_hands_by_tournament: {e}")
             return []
     
-    def get_hand_by_id(self, hand_id: str) -> Optional[Hand]:
+    def get_hands_page(self, tournament_id: str, offset: int, limit: int) -> List[HandRecord]:
+        """Récupère une page de mains d'un tournoi, en ne lisant que les mains de la page"""
+        try:
+            hands = self.snapshot.hands(tournament_id)
+            return [HandRecord(h_data) for h_data in hands.page(offset, limit)] if hands is not None else []
+        except Exception as e:
+            logger.error(f"Error in get_hands_page: {e}")
+            return []
+    
+    def count_hands(self, tournament_id: str) -> int:
+        """Nombre de mains d'un tournoi (snapshot seul)"""
+        hands = self.snapshot.hands(tournament_id)
+        return len(hands) if hands is not None else 0
+    
+    def get_compaction_stats(self) -> Dict[str, Any]:
+        """Métriques du journal de mains et de sa compaction"""
+        return self.hands.stats()
+    
+    def compact_hands(self) -> Dict[str, Any]:
+        """Compacte le journal de mains (synchrone)"""
+        try:
+            return self.hands.compact()
+        except Exception as e:
+            logger.error(f"Error compacting hands: {e}")
+            raise
+    
+    def get_hand_by_id(self, hand_id: str) -> Optional[HandRecord]:
         """Récupère une main par son ID"""
         try:
-            hands = self._load_json(self.hands_file)
-            
-            for h_data in hands:
-                if h_data.get('id') == hand_id:
-                    # Reconstituer les objets Player
-                    players_list = []
-                    for player_data in h_data.get('players', []):
-                        if isinstance(player_data, dict):
-                            players_list.append(Player(
-                                name=player_data.get('name', ''),
-                                seat=player_data.get('seat', 0),
-                                stack=player_data.get('stack', 0),
-                                bounty=player_data.get('bounty', 0.0)
-                            ))
-                    
-                    h_data['players'] = players_list
-                    
-                    # Assurer les valeurs par défaut
-                    h_data.setdefault('ante_blinds_actions', [])
-                    h_data.setdefault('preflop_actions', [])
-                    h_data.setdefault('flop_actions', [])
-                    h_data.setdefault('turn_actions', [])
-                    h_data.setdefault('river_actions', [])
-                    h_data.setdefault('showdown', [])
-                    h_data.setdefault('summary', [])
-                    h_data.setdefault('small_blind', 0)
-                    h_data.setdefault('big_blind', 0)
-                    
-                    # Convertir la date
-                    date_str = h_data.get('date')
-                    if isinstance(date_str, str):
-                        try:
-                            h_data['date'] = datetime.fromisoformat(date_str)
-                        except ValueError:
-                            h_data['date'] = datetime.now()
-                    elif not isinstance(date_str, datetime):
-                        h_data['date'] = datetime.now()
-                    
-                    return Hand(**h_data)
-            
-            return None
+            h_data = self.hands.get(hand_id)
+            return HandRecord(h_data) if h_data else None
             
         except Exception as e:
             logger.error(f"Error getting hand {hand_id}: {e}")
             return None
     
-    def update_hand(self, hand_id: str, **kwargs) -> Optional[Hand]:
+    @_writer
+    def update_hand(self, hand_id: str, **kwargs) -> Optional[HandRecord]:
         """Met à jour une main"""
         try:
-            hands = self._load_json(self.hands_file)
+            h_data = self.hands.get(hand_id)
             
-            for i, h_data in enumerate(hands):
-                if h_data.get('id') == hand_id:
-                    # Mettre à jour les champs fournis
-                    for key, value in kwargs.items():
-                        if value is not None:
-                            h_data[key] = value
-                    
-                    # Convertir la date en string pour le JSON si nécessaire
-                    if 'date' in h_data and isinstance(h_data['date'], datetime):
-                        h_data['date'] = h_data['date'].isoformat()
-                    
-                    hands[i] = h_data
-                    self._save_json(self.hands_file, hands)
-                    
-                    logger.info(f"Hand {hand_id} updated successfully")
-                    return self.get_hand_by_id(hand_id)
+            if h_data:
+                previous_hero = h_data.get('hero_name', '')
+                
+                # Mettre à jour les champs fournis
+                for key, value in kwargs.items():
+                    if value is not None:
+                        h_data[key] = value
+                
+                # Convertir la date en string pour le JSON si nécessaire
+                if 'date' in h_data and isinstance(h_data['date'], datetime):
+                    h_data['date'] = h_data['date'].isoformat()
+                
+                # Recalculer la timeline de replay et les métriques dérivées de la main modifiée
+                h_data.pop('replay', None)
+                replay = self._build_replay(h_data)
+                if 'metrics' not in kwargs:
+                    h_data['metrics'] = self.metrics_pipeline.compute(h_data, replay)
+                h_data['replay'] = replay
+                
+                # Nouvelle version en fin de journal ; l'index pointe vers elle
+                self.hands.append([h_data])
+                self.snapshots.touch_hands(h_data.get('tournament_id'))
+                if h_data.get('hero_name', '') != previous_hero:
+                    self.hero_rollup.add_hands(h_data.get('tournament_id'), previous_hero, -1)
+                    self.hero_rollup.add_hands(h_data.get('tournament_id'), h_data.get('hero_name', ''), 1)
+                self._stack_timeline_cache.pop(h_data.get('tournament_id'), None)
+                self._index_hand(h_data)
+                if self.columnar.initialized:
+                    self.columnar.delete_hand(hand_id)
+                    self.columnar.append_hands([hand_features(h_data, h_data['metrics'])])
+                
+                logger.info(f"Hand {hand_id} updated successfully")
+                return self.get_hand_by_id(hand_id)
             
             logger.warning(f"Hand {hand_id} not found for update")
             return None
@@ -483,17 +829,20 @@ class FileStorage:
             logger.error(f"Error updating hand {hand_id}: {e}")
             raise
     
+    @_writer
     def delete_hand(self, hand_id: str) -> bool:
         """Supprime une main par son ID"""
         try:
-            hands = self._load_json(self.hands_file)
-            original_count = len(hands)
-            
-            # Filtrer pour garder toutes les mains sauf celle à supprimer
-            hands = [h for h in hands if h.get('id') != hand_id]
-            
-            if len(hands) < original_count:
-                self._save_json(self.hands_file, hands)
+            deleted = self.hands.get(hand_id)
+            
+            if deleted:
+                self.hands.delete([hand_id])
+                self.snapshots.touch_hands(deleted.get('tournament_id'))
+                self.hero_rollup.add_hands(deleted.get('tournament_id'), deleted.get('hero_name', ''), -1)
+                self._stack_timeline_cache.pop(deleted.get('tournament_id'), None)
+                self._unindex_hand(hand_id)
+                if self.columnar.initialized:
+                    self.columnar.delete_hand(hand_id)
                 logger.info(f"Hand {hand_id} deleted successfully")
                 return True
             else:
@@ -504,86 +853,260 @@ class FileStorage:
             logger.error(f"Error deleting hand {hand_id}: {e}")
             raise
     
+    @_writer
     def delete_hands_by_tournament(self, tournament_id: str) -> int:
         """Supprime toutes les mains d'un tournoi et retourne le nombre de mains supprimées"""
         try:
-            hands = self._load_json(self.hands_file)
-            original_count = len(hands)
-            
-            # Filtrer pour garder toutes les mains sauf celles du tournoi à supprimer
-            hands = [h for h in hands if h.get('tournament_id') != tournament_id]
-            
-            deleted_count = original_count - len(hands)
+            # Un seul tombstone pour tout le tournoi
+            deleted_count = self.hands.delete_tournament(tournament_id)
+            self.snapshots.touch_hands(tournament_id)
+            self.hero_rollup.clear_hands(tournament_id)
             
             if deleted_count > 0:
-                self._save_json(self.hands_file, hands)
+                self._unindex_tournament(tournament_id)
+                if self.columnar.initialized:
+                    self.columnar.delete_tournament(tournament_id)
                 logger.info(f"Deleted {deleted_count} hands for tournament {tournament_id}")
             
+            self._stack_timeline_cache.pop(tournament_id, None)
             return deleted_count
             
         except Exception as e:
             logger.error(f"Error deleting hands for tournament {tournament_id}: {e}")
             raise
     
-    def get_hands_by_hero(self, hero_name: str, tournament_id: str = None) -> List[Hand]:
-        """Récupère toutes les mains d'un héros spécifique"""
-        try:
-            hands = self._load_json(self.hands_file)
-            hero_hands = []
-            
-            for h_data in hands:
-                if h_data.get('hero_name') == hero_name:
-                    if tournament_id is None or h_data.get('tournament_id') == tournament_id:
-                        try:
-                            # Reconstituer la main (même logique que get_hands_by_tournament)
-                            players_list = []
-                            for player_data in h_data.get('players', []):
-                                if isinstance(player_data, dict):
-                                    players_list.append(Player(
-                                        name=player_data.get('name', ''),
-                                        seat=player_data.get('seat', 0),
-                                        stack=player_data.get('stack', 0),
-                                        bounty=player_data.get('bounty', 0.0)
-                                    ))
-                            
-                            h_data['players'] = players_list
-                            
-                            # Assurer les valeurs par défaut
-                            h_data.setdefault('ante_blinds_actions', [])
-                            h_data.setdefault('preflop_actions', [])
-                            h_data.setdefault('flop_actions', [])
-                            h_data.setdefault('turn_actions', [])
-                            h_data.setdefault('river_actions', [])
-                            h_data.setdefault('showdown', [])
-                            h_data.setdefault('summary', [])
-                            h_data.setdefault('small_blind', 0)
-                            h_data.setdefault('big_blind', 0)
-                            
-                            # Convertir la date
-                            date_str = h_data.get('date')
-                            if isinstance(date_str, str):
-                                try:
-                                    h_data['date'] = datetime.fromisoformat(date_str)
-                                except ValueError:
-                                    h_data['date'] = datetime.now()
-                            elif not isinstance(date_str, datetime):
-                                h_data['date'] = datetime.now()
-                            
-                            hero_hands.append(Hand(**h_data))
-                            
-                        except Exception as e:
-                            logger.error(f"Error loading hand {h_data.get('id', 'unknown')}: {e}")
-                            continue
-            
-            # Trier par date et numéro de main
-            hero_hands.sort(key=lambda x: (x.date, x.hand_number))
+    def get_hands_by_hero(self, hero_name: str, tournament_id: str = None) -> List[HandRecord]:
+        """Récupère toutes les mains d'un héros spécifique (hydratées paresseusement)"""
+        try:
+            hero_hands = [
+                HandRecord(h_data) for h_data in self.hands.all()
+                if h_data.get('hero_name') == hero_name
+                and (tournament_id is None or h_data.get('tournament_id') == tournament_id)
+            ]
+            
+            # Trier par date et numéro de main (les dates ISO se trient comme des chaînes)
+            hero_hands.sort(key=lambda x: (x.date_key, x.hand_number))
             return hero_hands
             
         except Exception as e:
             logger.error(f"Error getting hands for hero {hero_name}: {e}")
             return []
     
+    def _get_search_index(self) -> HandSearchIndex:
+        """Retourne l'index de recherche, construit au premier appel (sous le verrou d'écriture)"""
+        if self._search_index is None:
+            with self.snapshots.writing():
+                if self._search_index is None:
+                    self._search_index = HandSearchIndex.build(
+                        self.hands.all(),
+                        self._load_json(self.tournaments_file)
+                    )
+        return self._search_index
+    
+    def _get_text_index(self) -> HandTextIndex:
+        """Retourne l'index plein texte, construit au premier appel (sous le verrou d'écriture)"""
+        if self._text_index is None:
+            with self.snapshots.writing():
+                if self._text_index is None:
+                    self._text_index = HandTextIndex.build(self.hands.all())
+        return self._text_index
+    
+    def _index_hand(self, hand_dict: Dict[str, Any]):
+        """Répercute l'ajout (ou la mise à jour) d'une main dans les index construits"""
+        for index in (self._search_index, self._text_index):
+            if index is not None:
+                index.add_hand(hand_dict)
+    
+    def _unindex_hand(self, hand_id: str):
+        """Retire une main des index construits"""
+        for index in (self._search_index, self._text_index):
+            if index is not None:
+                index.remove_hand(hand_id)
+    
+    def _unindex_tournament(self, tournament_id: str):
+        """Retire toutes les mains d'un tournoi des index construits"""
+        for index in (self._search_index, self._text_index):
+            if index is not None:
+                index.remove_tournament(tournament_id)
+    
+    def search_hands_text(self, query: Optional[str] = None, player: Optional[str] = None,
+                          tournament_id: Optional[str] = None,
+                          limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """Recherche plein texte dans l'historique brut des mains (voir HandTextIndex.search)"""
+        try:
+            return self._get_text_index().search(query=query, player=player, tournament_id=tournament_id,
+                                                 limit=limit, offset=offset)
+        except Exception as e:
+            logger.error(f"Error in text search: {e}")
+            raise
+    
+    def search_hands(self, **filters) -> Dict[str, Any]:
+        """Recherche multi-critères des mains via l'index (voir HandSearchIndex.search)"""
+        try:
+            return self._get_search_index().search(**filters)
+        except Exception as e:
+            logger.error(f"Error searching hands: {e}")
+            raise
+    
+    def _get_columnar(self) -> ColumnarStore:
+        """Retourne le stockage colonnaire, rempli depuis les mains existantes au premier appel (sous le verrou d'écriture)"""
+        if not self.columnar.initialized:
+            with self.snapshots.writing():
+                if not self.columnar.initialized:
+                    rows = [hand_features(h_data, h_data.get('metrics') or self.metrics_pipeline.compute(h_data))
+                            for h_data in self.hands.all()]
+                    self.columnar.append_hands(rows)
+                    self.columnar.mark_initialized()
+                    logger.info(f"Columnar store backfilled with {len(rows)} hands")
+        return self.columnar
+    
+    @_writer
+    def backfill_hand_metrics(self, names: Optional[List[str]] = None, workers: Optional[int] = None) -> int:
+        """
+        Calcule en lot (et en parallèle) les métriques dérivées des mains déjà stockées.
+        Sans names, seules les métriques absentes sont calculées ; avec names,
+        ces métriques sont recalculées pour toutes les mains. Une seule réécriture du fichier.
+        """
+        try:
+            hands = self.hands.all()
+            
+            if names:
+                targets = hands
+            else:
+                registered = set(self.metrics_pipeline.registered())
+                targets = [h for h in hands if registered - set(h.get('metrics') or {})]
+            if not targets:
+                return 0
+            
+            results = self.metrics_pipeline.compute_many(targets, names=names, workers=workers)
+            for h_data, metrics in zip(targets, results):
+                h_data.setdefault('metrics', {}).update(metrics)
+            
+            self.hands.rewrite(hands)
+            self.snapshots.invalidate()
+            
+            # Le stockage colonnaire dérive des métriques : il sera reconstruit
+            self.columnar.reset()
+            
+            logger.info(f"Metrics backfilled for {len(targets)} hands")
+            return len(targets)
+            
+        except Exception as e:
+            logger.error(f"Error backfilling hand metrics: {e}")
+            raise
+    
+    def get_hero_hand_stats(self, hero_name: str, tournament_id: Optional[str] = None) -> Dict[str, Any]:
+        """Statistiques main par main du héros (VPIP, PFR, gains en BB...) via le stockage colonnaire"""
+        try:
+            return self._get_columnar().hero_stats(hero_name, tournament_id)
+        except Exception as e:
+            logger.error(f"Error computing hand stats for {hero_name}: {e}")
+            return {}
+    
+    def _reset_caches(self):
+        """Invalide les caches et index dérivés des fichiers de données"""
+        self._stack_timeline_cache.clear()
+        self._search_index = None
+        self._text_index = None
+        self.columnar.reset()
+        self.hero_rollup.reset()
+    
+    def _get_hero_rollup(self) -> HeroRollup:
+        """Retourne la rollup des héros, construite au premier appel (sous le verrou d'écriture)"""
+        if not self.hero_rollup.built:
+            with self.snapshots.writing():
+                if not self.hero_rollup.built:
+                    self.hero_rollup.build(self.snapshot.rows(), self._get_columnar().hands_per_tournament_and_hero())
+        return self.hero_rollup
+    
+    def get_stack_timeline(self, tournament_id: str) -> Dict[str, List]:
+        """
+        Calcule l'évolution du stack du héros sur un tournoi en une seule passe
+        sur les mains stockées, sans reconstruire d'objets Hand.
+        Le résultat est mis en cache par tournoi.
+        """
+        cached = self._stack_timeline_cache.get(tournament_id)
+        if cached is not None:
+            return cached
+        
+        rows = []
+        for h_data in self.hands.by_tournament(tournament_id):
+            hero_name = h_data.get('hero_name')
+            players = h_data.get('players', [])
+            stack = next((p.get('stack', 0) for p in players if p.get('name') == hero_name), None)
+            if stack is None:
+                continue
+            
+            small_blind = h_data.get('small_blind', 0)
+            big_blind = h_data.get('big_blind', 0)
+            # M-ratio = stack / coût d'un tour (SB + BB + antes de tous les joueurs)
+            orbit_cost = small_blind + big_blind + h_data.get('ante', 0) * len(players)
+            m_ratio = round(stack / orbit_cost, 2) if orbit_cost > 0 else 0.0
+            
+            rows.append((h_data.get('hand_number', 0), stack, big_blind, m_ratio, h_data.get('level', 1)))
+        
+        rows.sort()
+        timeline = {
+            'hand_numbers': [row[0] for row in rows],
+            'stacks': [row[1] for row in rows],
+            'big_blinds': [row[2] for row in rows],
+            'm_ratios': [row[3] for row in rows],
+            'levels': [row[4] for row in rows]
+        }
+        
+        self._stack_timeline_cache[tournament_id] = timeline
+        return timeline
+    
+    # ===== GESTION DES REPLAYS =====
+    def _build_replay(self, hand_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit l'entrée de replay stockée pour une main sérialisée"""
+        replay = self.replay_builder.build(hand_dict)
+        replay['hand_id'] = hand_dict.get('id')
+        replay['tournament_id'] = hand_dict.get('tournament_id')
+        return replay
+    
+    def get_hand_replay(self, hand_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère la timeline de replay d'une main (stockée avec la main)"""
+        try:
+            h_data = self.hands.get(hand_id)
+            if not h_data:
+                return None
+            
+            # Main importée avant le précalcul : construire à la volée
+            return h_data.get('replay') or self._build_replay(h_data)
+            
+        except Exception as e:
+            logger.error(f"Error getting replay for hand {hand_id}: {e}")
+            return None
+    
+    def get_replays_by_tournament(self, tournament_id: str, offset: int = 0,
+                                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Récupère les timelines de replay d'un tournoi (éventuellement une page), triées par numéro de main"""
+        try:
+            hands = self.snapshot.hands(tournament_id)
+            if hands is None:
+                return []
+            
+            page = hands.page(offset, limit)
+            missing = [h_data for h_data in page if not h_data.get('replay')]
+            if missing:
+                # Mains importées avant le précalcul : construire et persister une fois
+                for h_data in missing:
+                    h_data['replay'] = self._build_replay(h_data)
+                with self.snapshots.writing():
+                    # Seules les mains toujours présentes sont réécrites (suppression concurrente)
+                    self.hands.append([h_data for h_data in missing if h_data['id'] in self.hands])
+                    self.snapshots.touch_hands(tournament_id)
+                logger.info(f"Backfilled {len(missing)} replays for tournament {tournament_id}")
+            
+            return [h_data['replay'] for h_data in page]
+            
+        except Exception as e:
+            logger.error(f"Error getting replays for tournament {tournament_id}: {e}")
+            return []
+    
     # ===== GESTION DES ANALYSES =====
+    @_writer
     def create_hand_analysis(self, hand_analysis: HandAnalysis) -> HandAnalysis:
         """Crée une nouvelle analyse de main"""
         analyses = self._load_json(self.analyses_file)
@@ -616,6 +1139,7 @@ class FileStorage:
             logger.error(f"Error getting analysis for hand {hand_id}: {e}")
             return None
     
+    @_writer
     def update_hand_analysis(self, hand_id: str, hand_analysis: HandAnalysis) -> Optional[HandAnalysis]:
         """Met à jour l'analyse d'une main"""
         try:
@@ -646,6 +1170,7 @@ class FileStorage:
             logger.error(f"Error updating analysis for hand {hand_id}: {e}")
             raise
     
+    @_writer
     def delete_hand_analysis(self, hand_id: str) -> bool:
         """Supprime l'analyse d'une main"""
         try:
@@ -667,6 +1192,7 @@ class FileStorage:
             raise
     
     # ===== GESTION DES STATISTIQUES =====
+    @_writer
     def save_player_stats(self, tournament_id: str, player_stats: List[PlayerStats]) -> None:
         """Sauvegarde les statistiques des joueurs pour un tournoi"""
         try:
@@ -680,7 +1206,7 @@ class FileStorage:
                 stats_dict = stats.to_dict()
                 stats_dict['tournament_id'] = tournament_id
                 stats_dict['created_at'] = datetime.now().isoformat()
-                all_stats.append(stats_dict)
+                all_stats.append(self.players.encode_stats(stats_dict))
             
             self._save_json(self.stats_file, all_stats)
             logger.info(f"Player stats saved for tournament {tournament_id}")
@@ -695,15 +1221,21 @@ class FileStorage:
             all_stats = self._load_json(self.stats_file)
             filtered_stats = []
             
+            # Comparaison sur l'identifiant entier du joueur
+            player_id = self.players.id(player_name) if player_name else None
+            
             for stats_data in all_stats:
                 # Filtrer par tournoi si spécifié
                 if tournament_id and stats_data.get('tournament_id') != tournament_id:
                     continue
                 
                 # Filtrer par joueur si spécifié
-                if player_name and stats_data.get('player_name') != player_name:
+                if player_name and ('player_id' not in stats_data or stats_data['player_id'] != player_id) \
+                        and stats_data.get('player_name') != player_name:
                     continue
                 
+                self.players.decode_stats(stats_data)
+                
                 # Retirer les champs ajoutés automatiquement
                 stats_data.pop('tournament_id', None)
                 stats_data.pop('created_at', None)
@@ -717,50 +1249,67 @@ class FileStorage:
             return []
     
     # ===== MÉTHODES UTILITAIRES =====
+    @_writer
     def delete_tournament_and_hands(self, tournament_id: str) -> Dict[str, int]:
         """
         Supprime un tournoi et toutes ses données associées de manière atomique.
+        Une seule passe par fichier (analyses, statistiques, tournois) puis
+        un seul tombstone pour les mains (et leurs timelines de replay) ; en cas d'échec, les fichiers déjà
+        réécrits sont restaurés.
         Retourne un dictionnaire avec le nombre d'éléments supprimés.
         """
+        with self.journal.transaction('cascade_delete', tournament_id=tournament_id):
+            return self._delete_tournament_and_hands(tournament_id)
+    
+    def _delete_tournament_and_hands(self, tournament_id: str) -> Dict[str, int]:
+        hand_ids = set(self.hands.hand_ids(tournament_id))
+        
+        # Nouveau contenu de chaque fichier, calculé avant toute écriture
+        rewrites = []
+        counts = {}
+        for key, file_path, keep in [
+            ('analyses_deleted', self.analyses_file, lambda a: a.get('hand_id') not in hand_ids),
+            ('stats_deleted', self.stats_file, lambda st: st.get('tournament_id') != tournament_id),
+            ('tournament_deleted', self.tournaments_file, lambda t: t.get('id') != tournament_id)
+        ]:
+            original = self._load_json(file_path)
+            remaining = [item for item in original if keep(item)]
+            counts[key] = len(original) - len(remaining)
+            if len(remaining) < len(original):
+                rewrites.append((file_path, original, remaining))
+        
+        written = []
         try:
-            # Supprimer d'abord les analyses des mains
-            hands = self.get_hands_by_tournament(tournament_id)
-            deleted_analyses = 0
-            for hand in hands:
-                if self.delete_hand_analysis(hand.id):
-                    deleted_analyses += 1
-            
-            # Supprimer les statistiques du tournoi
-            try:
-                all_stats = self._load_json(self.stats_file)
-                original_stats_count = len(all_stats)
-                all_stats = [stats for stats in all_stats if stats.get('tournament_id') != tournament_id]
-                deleted_stats = original_stats_count - len(all_stats)
-                if deleted_stats > 0:
-                    self._save_json(self.stats_file, all_stats)
-            except Exception as e:
-                logger.warning(f"Error deleting stats for tournament {tournament_id}: {e}")
-                deleted_stats = 0
-            
-            # Supprimer les mains
-            deleted_hands = self.delete_hands_by_tournament(tournament_id)
-            
-            # Supprimer le tournoi
-            tournament_deleted = self.delete_tournament(tournament_id)
-            
-            result = {
-                "tournament_deleted": 1 if tournament_deleted else 0,
-                "hands_deleted": deleted_hands,
-                "analyses_deleted": deleted_analyses,
-                "stats_deleted": deleted_stats
-            }
+            for file_path, original, remaining in rewrites:
+                self._save_json(file_path, remaining)
+                written.append((file_path, original))
             
-            logger.info(f"Tournament cleanup completed: {result}")
-            return result
+            # Les mains en dernier : une seule écriture, rien à annuler ensuite
+            deleted_hands = self.hands.delete_tournament(tournament_id)
             
         except Exception as e:
-            logger.error(f"Error in delete_tournament_and_hands for {tournament_id}: {e}")
+            logger.error(f"Error in delete_tournament_and_hands for {tournament_id}, rolling back: {e}")
+            for file_path, original in reversed(written):
+                self._save_json(file_path, original)
             raise
+        
+        self.snapshots.set_row(tournament_id, None)
+        self.snapshots.touch_hands(tournament_id)
+        self.hero_rollup.set_tournament(tournament_id, None)
+        self._stack_timeline_cache.pop(tournament_id, None)
+        self._unindex_tournament(tournament_id)
+        if self.columnar.initialized:
+            self.columnar.delete_tournament(tournament_id)
+        
+        result = {
+            "tournament_deleted": counts['tournament_deleted'],
+            "hands_deleted": deleted_hands,
+            "analyses_deleted": counts['analyses_deleted'],
+            "stats_deleted": counts['stats_deleted']
+        }
+        
+        logger.info(f"Tournament cleanup completed: {result}")
+        return result
     
     def get_tournament_summary(self, tournament_id: str) -> Optional[TournamentSummary]:
         """Génère un résumé complet d'un tournoi"""
@@ -797,52 +1346,19 @@ class FileStorage:
             logger.error(f"Error generating tournament summary for {tournament_id}: {e}")
             return None
     
-    def get_hero_overall_stats(self, hero_name: str, user_id: str) -> Dict[str, Any]:
-        """Calcule les statistiques globales d'un héros"""
-        try:
-            # Récupérer tous les tournois de l'utilisateur
-            tournaments = self.get_tournaments_by_user(user_id)
-            
-            # Filtrer les tournois où le héros a joué
-            hero_tournaments = []
-            total_hands = 0
-            total_profit = 0.0
-            total_cost = 0.0
-            
-            for tournament in tournaments:
-                hands = self.get_hands_by_tournament(tournament.id)
-                if hands and any(hand.hero_name == hero_name for hand in hands):
-                    hero_tournaments.append(tournament)
-                    total_hands += len(hands)
-                    total_profit += tournament.profit_loss
-                    total_cost += tournament.total_cost
-            
-            # Calculer les statistiques
-            tournament_count = len(hero_tournaments)
-            avg_profit_per_tournament = total_profit / tournament_count if tournament_count > 0 else 0
-            roi = (total_profit / total_cost * 100) if total_cost > 0 else 0
-            
-            # Position moyenne
-            positions = [t.final_position for t in hero_tournaments if t.final_position > 0]
-            avg_position = sum(positions) / len(positions) if positions else 0
-            
-            # ITM (In The Money) rate - approximation basée sur les profits positifs
-            itm_tournaments = sum(1 for t in hero_tournaments if t.profit_loss > 0)
-            itm_rate = (itm_tournaments / tournament_count * 100) if tournament_count > 0 else 0
-            
-            return {
-                'hero_name': hero_name,
-                'tournaments_played': tournament_count,
-                'total_hands': total_hands,
-                'total_profit': round(total_profit, 2),
-                'total_cost': round(total_cost, 2),
-                'avg_profit_per_tournament': round(avg_profit_per_tournament, 2),
-                'roi_percentage': round(roi, 2),
-                'avg_position': round(avg_position, 1) if avg_position > 0 else 0,
-                'itm_rate': round(itm_rate, 1),
-                'best_result': max(hero_tournaments, key=lambda x: x.profit_loss).profit_loss if hero_tournaments else 0,
-                'worst_result': min(hero_tournaments, key=lambda x: x.profit_loss).profit_loss if hero_tournaments else 0
-            }
+    def get_hero_overall_stats(self, hero_name: str, user_id: str,
+                               breakdowns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Statistiques globales d'un héros, lues dans la rollup tenue à jour à
+        chaque écriture (O(1)). breakdowns : détail par 'month',
+        'tournament_type' et/ou 'buy_in_tier'.
+        """
+        try:
+            stats = self._get_hero_rollup().stats(user_id, hero_name)
+            result = {'hero_name': hero_name, **{k: v for k, v in stats.items() if k != 'breakdowns'}}
+            if breakdowns:
+                result['breakdowns'] = {name: stats['breakdowns'][name] for name in breakdowns}
+            return result
             
         except Exception as e:
             logger.error(f"Error calculating overall stats for {hero_name}: {e}")
@@ -857,24 +1373,23 @@ class FileStorage:
         try:
             os.makedirs(backup_path, exist_ok=True)
             
-            files_to_backup = [
-                self.tournaments_file,
-                self.hands_file,
-                self.analyses_file,
-                self.stats_file,
-                self.users_file
-            ]
-            
-            for file_path in files_to_backup:
+            # Sauvegarde toujours au format JSON lisible, quel que soit le format de stockage
+            for name, file_path in self.storage_files.items():
                 if os.path.exists(file_path):
-                    filename = os.path.basename(file_path)
+                    filename = f"{name}.json"
                     backup_file_path = os.path.join(backup_path, filename)
                     
-                    # Copier le fichier
+                    # Copier le fichier (pseudos résolus : la sauvegarde ne dépend pas du registre)
                     data = self._load_json(file_path)
+                    if name == 'player_stats':
+                        data = [self.players.decode_stats(st) for st in data]
                     with open(backup_file_path, 'w', encoding='utf-8') as f:
                         json.dump(data, f, indent=2, ensure_ascii=False)
             
+            # Les mains (timelines de replay incluses) sont sauvegardées au format JSON historique
+            with open(os.path.join(backup_path, "hands.json"), 'w', encoding='utf-8') as f:
+                json.dump(self.hands.all(), f, indent=2, ensure_ascii=False)
+            
             logger.info(f"Data backup created at: {backup_path}")
             return backup_path
             
@@ -882,12 +1397,12 @@ class FileStorage:
             logger.error(f"Error creating backup: {e}")
             raise
     
+    @_writer
     def restore_data(self, backup_path: str) -> bool:
         """Restaure les données depuis une sauvegarde"""
         try:
             backup_files = {
                 'tournaments.json': self.tournaments_file,
-                'hands.json': self.hands_file,
                 'analyses.json': self.analyses_file,
                 'player_stats.json': self.stats_file,
                 'users.json': self.users_file
@@ -899,11 +1414,20 @@ class FileStorage:
                 if os.path.exists(backup_file_path):
                     # Vérifier que le fichier de sauvegarde est valide
                     data = self._load_json(backup_file_path)
+                    if target_file == self.stats_file:
+                        data = [self.players.encode_stats(st) for st in data]
                     
                     # Restaurer le fichier
                     self._save_json(target_file, data)
                     logger.info(f"Restored {backup_filename}")
             
+            hands_backup = os.path.join(backup_path, "hands.json")
+            if os.path.exists(hands_backup):
+                self.hands.rewrite(self._load_json(hands_backup))
+                logger.info("Restored hands.json")
+            
+            self._reset_caches()
+            self.snapshots.invalidate()
             logger.info(f"Data restoration completed from: {backup_path}")
             return True
             
@@ -911,21 +1435,23 @@ class FileStorage:
             logger.error(f"Error restoring data from {backup_path}: {e}")
             return False
     
+    @_writer
     def clear_all_data(self):
         """Fonction utilitaire pour nettoyer toutes les données"""
         try:
             files_to_clear = [
                 self.tournaments_file,
-                self.hands_file,
                 self.analyses_file,
                 self.stats_file
             ]
             
             for file_path in files_to_clear:
                 if os.path.exists(file_path):
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump([], f)
+                    self._save_json(file_path, [])
             
+            self.hands.clear()
+            self._reset_caches()
+            self.snapshots.invalidate()
             logger.info("All data cleared successfully")
             
         except Exception as e:
@@ -938,7 +1464,7 @@ class FileStorage:
             info = {
                 'data_directory': self.data_dir,
                 'tournaments_count': len(self._load_json(self.tournaments_file)),
-                'hands_count': len(self._load_json(self.hands_file)),
+                'hands_count': len(self.hands),
                 'analyses_count': len(self._load_json(self.analyses_file)),
                 'stats_count': len(self._load_json(self.stats_file)),
                 'users_count': len(self._load_json(self.users_file))
@@ -948,14 +1474,23 @@ class FileStorage:
             total_size = 0
             file_sizes = {}
             
-            for file_path in [self.tournaments_file, self.hands_file, self.analyses_file, 
+            for file_path in [self.tournaments_file, self.analyses_file, 
                             self.stats_file, self.users_file]:
                 if os.path.exists(file_path):
                     size = os.path.getsize(file_path)
                     file_sizes[os.path.basename(file_path)] = size
                     total_size += size
             
+            file_sizes['hands'] = self.hands.size_bytes()
+            total_size += file_sizes['hands']
+            if os.path.exists(self.players.path):
+                file_sizes['players'] = os.path.getsize(self.players.path)
+                total_size += file_sizes['players']
+            
             info['file_sizes'] = file_sizes
+            info['players_count'] = len(self.players)
+            info['hands_log'] = self.hands.stats()
+            info['storage_format'] = self.storage_format
             info['total_size_bytes'] = total_size
             info['total_size_mb'] = round(total_size / (1024 * 1024), 2)
             
@@ -965,5 +1500,17 @@ class FileStorage:
             logger.error(f"Error getting storage info: {e}")
             return {}
 
-# Instance globale
-storage = FileStorage()
\ No newline at end of file
+# Instance globale, créée au premier accès (from .storage import storage) : les
+# outils en ligne de commande qui importent seulement FileStorage n'ouvrent pas data/
+_storage: Optional[FileStorage] = None
+_storage_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    global _storage
+    if name != 'storage':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _storage_lock:
+        if _storage is None:
+            _storage = FileStorage()
+    return _storage
\ No newline at end of file
@@ -0,0 +1,168 @@
+# text_index.py
+import re
+import shlex
+from typing import Dict, List, Optional, Any, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[^\s\[\](),|:]+")
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en tokens normalisés (minuscules)"""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class HandTextIndex:
+    """
+    Index inversé positionnel sur le texte brut des mains.
+    Chaque token pointe vers les mains qui le contiennent et ses positions,
+    ce qui permet les requêtes par termes, par phrase exacte et par joueur.
+    Modifié par l'écrivain unique du stockage et lu sans verrou : une recherche
+    travaille sur des copies et ignore les mains retirées (ou pas encore
+    entièrement indexées) pendant son exécution.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.player_postings: Dict[str, Set[int]] = {}
+
+        self.doc_by_hand: Dict[str, int] = {}
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self.docs_by_tournament: Dict[str, Set[int]] = {}
+        self._next_doc = 0
+
+    @classmethod
+    def build(cls, hands: List[Dict[str, Any]]) -> "HandTextIndex":
+        """Construit l'index à partir des mains sérialisées"""
+        index = cls()
+        for h_data in hands:
+            index.add_hand(h_data)
+        logger.info(f"Hand text index built: {len(index.docs)} hands, {len(index.postings)} tokens")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add_hand(self, h_data: Dict[str, Any]) -> None:
+        """Indexe le texte brut et les joueurs d'une main"""
+        hand_id = h_data.get('id')
+        if hand_id in self.doc_by_hand:
+            self.remove_hand(hand_id)
+
+        doc = self._next_doc
+        self._next_doc += 1
+
+        tokens = tokenize(h_data.get('raw_text', ''))
+        for position, token in enumerate(tokens):
+            self.postings.setdefault(token, {}).setdefault(doc, []).append(position)
+
+        players = [p.get('name', '').lower() for p in h_data.get('players', []) if isinstance(p, dict)]
+        for name in players:
+            self.player_postings.setdefault(name, set()).add(doc)
+
+        tournament_id = h_data.get('tournament_id', '')
+        self.doc_by_hand[hand_id] = doc
+        self.docs[doc] = {
+            'id': hand_id,
+            'tournament_id': tournament_id,
+            'hand_number': h_data.get('hand_number', 0),
+            'tokens': set(tokens),
+            'players': players
+        }
+        self.docs_by_tournament.setdefault(tournament_id, set()).add(doc)
+
+    def remove_hand(self, hand_id: str) -> bool:
+        """Retire une main de toutes les listes de postings"""
+        doc = self.doc_by_hand.pop(hand_id, None)
+        if doc is None:
+            return False
+
+        info = self.docs.pop(doc)
+        for token in info['tokens']:
+            doc_positions = self.postings.get(token)
+            if doc_positions is not None:
+                doc_positions.pop(doc, None)
+                if not doc_positions:
+                    del self.postings[token]
+        for name in info['players']:
+            docs = self.player_postings.get(name)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self.player_postings[name]
+        self.docs_by_tournament.get(info['tournament_id'], set()).discard(doc)
+        return True
+
+    def remove_tournament(self, tournament_id: str) -> int:
+        """Retire toutes les mains d'un tournoi"""
+        docs = list(self.docs_by_tournament.pop(tournament_id, set()))
+        for doc in docs:
+            self.remove_hand(self.docs[doc]['id'])
+        return len(docs)
+
+    def _phrase_docs(self, tokens: List[str]) -> Set[int]:
+        """Mains contenant la suite exacte de tokens"""
+        posting_lists = [self.postings.get(token) for token in tokens]
+        if not tokens or any(p is None for p in posting_lists):
+            return set()
+
+        candidates = set(min(posting_lists, key=len))
+        for doc_positions in posting_lists:
+            candidates &= doc_positions.keys()
+        if len(tokens) == 1:
+            return candidates
+
+        matches = set()
+        for doc in candidates:
+            positions = [p.get(doc) for p in posting_lists]
+            if any(p is None for p in positions):
+                continue
+            following = [set(p) for p in positions[1:]]
+            for start in list(positions[0]):
+                if all(start + offset + 1 in positions for offset, positions in enumerate(following)):
+                    matches.add(doc)
+                    break
+        return matches
+
+    def search(self, query: Optional[str] = None, player: Optional[str] = None,
+               tournament_id: Optional[str] = None,
+               limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        Recherche plein texte. La requête est une suite de termes combinés en ET ;
+        un terme entre guillemets est une phrase exacte ("raises 50 to 100").
+        player filtre sur le nom exact d'un joueur assis à la table.
+        """
+        result_sets: List[Set[int]] = []
+
+        if query:
+            for part in shlex.split(query):
+                result_sets.append(self._phrase_docs(tokenize(part)))
+        if player:
+            result_sets.append(set(self.player_postings.get(player.lower(), set())))
+        if tournament_id:
+            result_sets.append(set(self.docs_by_tournament.get(tournament_id, set())))
+
+        if not result_sets:
+            return {'hands': [], 'total': 0, 'limit': limit, 'offset': offset}
+
+        result_sets.sort(key=len)
+        docs = result_sets[0]
+        for other in result_sets[1:]:
+            docs = docs & other
+
+        # Mains retirées depuis le début de la recherche ignorées
+        ordered = [info for info in (self.docs.get(doc) for doc in sorted(docs)) if info is not None]
+        return {
+            'hands': [
+                {
+                    'id': info['id'],
+                    'tournament_id': info['tournament_id'],
+                    'hand_number': info['hand_number']
+                }
+                for info in ordered[offset:offset + limit]
+            ],
+            'total': len(ordered),
+            'limit': limit,
+            'offset': offset
+        }
@@ -0,0 +1,222 @@
+# tournament_index.py
+import base64
+import json
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Clés de tri exposées par l'API -> attribut de TournamentEntry
+SORT_FIELDS = {
+    'date': 'date',
+    'profit': 'profit_loss',
+    'position': 'final_position',
+    'hands': 'total_hands',
+    'buy_in': 'buy_in',
+    'name': 'name_key'
+}
+SORT_OPTIONS = [f"{field}_{direction}" for field in SORT_FIELDS for direction in ('desc', 'asc')]
+PROFIT_SIGNS = ('positive', 'negative', 'zero')
+
+
+class TournamentEntry:
+    """Champs indexés d'un tournoi (valeurs typées pour le tri)"""
+    __slots__ = ('id', 'user_id', 'name_key', 'date', 'tournament_type', 'buy_in',
+                 'profit_loss', 'final_position', 'total_hands')
+
+    def __init__(self, tournament_id: str, row: Mapping[str, Any], total_hands: int):
+        self.id = tournament_id
+        self.user_id = row.get('user_id', '')
+        self.name_key = (row.get('name') or '').lower()
+        self.date = row.get('date') or ''
+        self.tournament_type = row.get('tournament_type') or 'Unknown'
+        self.buy_in = float(row.get('buy_in') or 0.0)
+        self.profit_loss = float(row.get('profit_loss') or 0.0)
+        self.final_position = int(row.get('final_position') or 0)
+        self.total_hands = total_hands
+
+
+class TournamentIndex:
+    """
+    Index des tournois d'un snapshot : une liste triée (valeur, id) par clé de
+    tri et un index par type de tournoi. Immuable comme le snapshot qui le
+    porte : updated() retourne un nouvel index où seules les entrées des
+    tournois modifiés sont retirées puis réinsérées (bisect).
+    """
+
+    def __init__(self, entries: Dict[str, TournamentEntry], sorted_keys: Dict[str, List[Tuple[Any, str]]],
+                 by_type: Dict[str, Set[str]], user_counts: Dict[str, int]):
+        self.entries = entries
+        self.sorted_keys = sorted_keys
+        self.by_type = by_type
+        self.user_counts = user_counts
+
+    @staticmethod
+    def _entry(tournament_id: str, view) -> Optional[TournamentEntry]:
+        if view is None or view.row is None:
+            return None
+        return TournamentEntry(tournament_id, view.row, len(view.hands))
+
+    @classmethod
+    def build(cls, views: Mapping[str, Any]) -> 'TournamentIndex':
+        entries = {}
+        for tournament_id, view in views.items():
+            entry = cls._entry(tournament_id, view)
+            if entry is not None:
+                entries[tournament_id] = entry
+
+        sorted_keys = {
+            field: sorted((getattr(entry, attr), entry.id) for entry in entries.values())
+            for field, attr in SORT_FIELDS.items()
+        }
+        by_type: Dict[str, Set[str]] = {}
+        user_counts: Dict[str, int] = {}
+        for entry in entries.values():
+            by_type.setdefault(entry.tournament_type, set()).add(entry.id)
+            user_counts[entry.user_id] = user_counts.get(entry.user_id, 0) + 1
+        return cls(entries, sorted_keys, by_type, user_counts)
+
+    def updated(self, views: Mapping[str, Any]) -> 'TournamentIndex':
+        """Nouvel index après modification des tournois donnés (vue None : tournoi supprimé)"""
+        entries = dict(self.entries)
+        sorted_keys = {field: list(keys) for field, keys in self.sorted_keys.items()}
+        by_type = dict(self.by_type)
+        user_counts = dict(self.user_counts)
+
+        for tournament_id, view in views.items():
+            previous = entries.pop(tournament_id, None)
+            if previous is not None:
+                for field, attr in SORT_FIELDS.items():
+                    keys = sorted_keys[field]
+                    i = bisect_left(keys, (getattr(previous, attr), tournament_id))
+                    if i < len(keys) and keys[i][1] == tournament_id:
+                        del keys[i]
+                by_type[previous.tournament_type] = by_type[previous.tournament_type] - {tournament_id}
+                user_counts[previous.user_id] -= 1
+
+            entry = self._entry(tournament_id, view)
+            if entry is not None:
+                entries[tournament_id] = entry
+                for field, attr in SORT_FIELDS.items():
+                    insort(sorted_keys[field], (getattr(entry, attr), tournament_id))
+                by_type[entry.tournament_type] = by_type.get(entry.tournament_type, set()) | {tournament_id}
+                user_counts[entry.user_id] = user_counts.get(entry.user_id, 0) + 1
+
+        return TournamentIndex(entries, sorted_keys, by_type, user_counts)
+
+    @staticmethod
+    def encode_cursor(key: Tuple[Any, str]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[Any, str]:
+        value, tournament_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (value, str(tournament_id))
+
+    def query(self,
+              user_id: Optional[str] = None,
+              date_from: Optional[datetime] = None,
+              date_to: Optional[datetime] = None,
+              tournament_type: Optional[str] = None,
+              buy_in_min: Optional[float] = None,
+              buy_in_max: Optional[float] = None,
+              profit: Optional[str] = None,
+              name: Optional[str] = None,
+              sort: str = 'date_desc',
+              cursor: Optional[str] = None,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Filtre et trie les tournois ; pagination par curseur (dernière clé de
+        tri renvoyée). Retourne les ids de la page, le total filtré et le curseur suivant.
+        """
+        field, _, direction = sort.rpartition('_')
+        if field not in SORT_FIELDS or direction not in ('asc', 'desc'):
+            raise ValueError(f"Tri inconnu: {sort}")
+        if profit is not None and profit not in PROFIT_SIGNS:
+            raise ValueError(f"Signe de profit inconnu: {profit}")
+        descending = direction == 'desc'
+        keys = self.sorted_keys[field]
+
+        # Plage de dates résolue par bisect quand le tri est chronologique
+        low, high = 0, len(keys)
+        date_low = date_from.isoformat() if date_from else None
+        date_high = date_to.isoformat() if date_to else None
+        if field == 'date':
+            if date_low is not None:
+                low = bisect_left(keys, (date_low, ''))
+            if date_high is not None:
+                high = bisect_right(keys, (date_high, '\uffff'))
+
+        type_ids = self.by_type.get(tournament_type, set()) if tournament_type else None
+        name_key = name.lower() if name else None
+        after = self.decode_cursor(cursor) if cursor else None
+        entries = self.entries
+
+        def matches(entry: TournamentEntry) -> bool:
+            if user_id is not None and entry.user_id != user_id:
+                return False
+            if type_ids is not None and entry.id not in type_ids:
+                return False
+            if date_low is not None and entry.date < date_low:
+                return False
+            if date_high is not None and entry.date > date_high:
+                return False
+            if buy_in_min is not None and entry.buy_in < buy_in_min:
+                return False
+            if buy_in_max is not None and entry.buy_in > buy_in_max:
+                return False
+            if profit == 'positive' and entry.profit_loss <= 0:
+                return False
+            if profit == 'negative' and entry.profit_loss >= 0:
+                return False
+            if profit == 'zero' and entry.profit_loss != 0:
+                return False
+            if name_key and name_key not in entry.name_key:
+                return False
+            return True
+
+        # Sans autre filtre que la plage (cas courant : un seul utilisateur),
+        # total et page se déduisent des positions dans la liste triée
+        filtered = (tournament_type or buy_in_min is not None or buy_in_max is not None or profit or name_key
+                    or (field != 'date' and (date_low is not None or date_high is not None))
+                    or (user_id is not None and self.user_counts.get(user_id, 0) != len(entries)))
+        if not filtered:
+            total = high - low
+            if descending:
+                end = min(high, bisect_left(keys, after)) if after is not None else high
+                start = max(low, end - limit - 1) if limit is not None else low
+                page = keys[start:end][::-1]
+            else:
+                start = max(low, bisect_right(keys, after)) if after is not None else low
+                end = min(high, start + limit + 1) if limit is not None else high
+                page = keys[start:end]
+            return self._result(page, total, limit)
+
+        total = 0
+        page: List[Tuple[Any, str]] = []
+        positions = range(high - 1, low - 1, -1) if descending else range(low, high)
+        for i in positions:
+            key = keys[i]
+            if not matches(entries[key[1]]):
+                continue
+            total += 1
+            if after is not None and (key >= after if descending else key <= after):
+                continue
+            if limit is None or len(page) <= limit:
+                page.append(key)
+        return self._result(page, total, limit)
+
+    def _result(self, page: List[Tuple[Any, str]], total: int, limit: Optional[int]) -> Dict[str, Any]:
+        next_cursor = None
+        if limit is not None and len(page) > limit:
+            page = page[:limit]
+            next_cursor = self.encode_cursor(page[-1])
+
+        return {
+            'ids': [tournament_id for _, tournament_id in page],
+            'total': total,
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
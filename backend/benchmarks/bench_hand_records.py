@@ -0,0 +1,137 @@
+# benchmarks/bench_hand_records.py
+"""
+Compare l'hydratation complète des mains (dataclass Hand + Player + datetime)
+à l'hydratation paresseuse (HandRecord) : mémoire par main et temps des
+endpoints de liste.
+
+    cd backend && python benchmarks/bench_hand_records.py --hands 50000
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import Hand, HandRecord, Player  # noqa: E402
+
+
+def eager_hand(h_data):
+    """Reconstruction complète telle que la faisait le stockage avant HandRecord"""
+    h_data['players'] = [
+        Player(
+            name=p.get('name', ''),
+            seat=p.get('seat', 0),
+            stack=p.get('stack', 0),
+            bounty=p.get('bounty', 0.0)
+        )
+        for p in h_data.get('players', []) if isinstance(p, dict)
+    ]
+    for key in ('ante_blinds_actions', 'preflop_actions', 'flop_actions',
+                'turn_actions', 'river_actions', 'showdown', 'summary'):
+        h_data.setdefault(key, [])
+    h_data.setdefault('small_blind', 0)
+    h_data.setdefault('big_blind', 0)
+    h_data['date'] = datetime.fromisoformat(h_data['date'])
+    return Hand(**h_data)
+
+
+def make_hands(source, count, tournament_id):
+    hands = []
+    for i in range(count):
+        h_data = copy.deepcopy(source[i % len(source)])
+        h_data['id'] = str(uuid.uuid4())
+        h_data['tournament_id'] = tournament_id
+        h_data['hand_number'] = i + 1
+        hands.append(h_data)
+    return hands
+
+
+def measure(label, build, hands_data):
+    # Mémoire : objets créés par la reconstruction, hors JSON déjà chargé
+    data = copy.deepcopy(hands_data)
+    tracemalloc.start()
+    records = [build(h) for h in data]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+
+    # Temps : reconstruction + première page sérialisée (endpoint de liste)
+    data = copy.deepcopy(hands_data)
+    start = time.perf_counter()
+    records = [build(h) for h in data]
+    records.sort(key=lambda x: x.hand_number)
+    page = [r.to_dict() for r in records[:20]]
+    elapsed = time.perf_counter() - start
+
+    return {
+        'label': label,
+        'hands': len(hands_data),
+        'bytes_per_hand': round(current / len(hands_data), 1),
+        'list_ms': round(elapsed * 1000, 2),
+        'page_size': len(page)
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--hands', type=int, default=20000)
+    arg_parser.add_argument('--source', default=os.path.join('data', 'hands.json'))
+    args = arg_parser.parse_args()
+    args.source = os.path.abspath(args.source)
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        source = json.load(f)
+    if not source:
+        sys.exit(f"Aucune main dans {args.source}")
+
+    tournament_id = str(uuid.uuid4())
+    hands_data = make_hands(source, args.hands, tournament_id)
+
+    results = [
+        measure('eager Hand', eager_hand, hands_data),
+        measure('lazy HandRecord', HandRecord, hands_data)
+    ]
+
+    # Endpoint réel : lecture du journal de mains + reconstruction via FileStorage.
+    # Le stockage global de l'application (app.storage) est créé dans data/ du
+    # répertoire courant à l'import : import depuis le dossier temporaire
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            from app.storage import FileStorage
+
+            storage = FileStorage(os.path.join(work_dir, 'data'))
+            tournament = storage.create_tournament(
+                user_id="bench", name="bench_hand_records", date=datetime.now(), buy_in=0.0, fee=0.0,
+                total_players=0, final_position=0, profit_loss=0.0
+            )
+            storage.create_hands(tournament.id, [
+                dict(h_data, date=datetime.fromisoformat(h_data['date'])) for h_data in hands_data
+            ])
+            start = time.perf_counter()
+            hands = storage.get_hands_by_tournament(tournament.id)
+            [hand.to_dict() for hand in hands[:20]]
+            storage_ms = (time.perf_counter() - start) * 1000
+        finally:
+            os.chdir(previous_dir)
+    if len(hands) != len(hands_data):
+        sys.exit(f"FileStorage : {len(hands)} mains lues sur {len(hands_data)}")
+
+    for r in results:
+        print(f"{r['label']:<18} {r['hands']} mains  {r['bytes_per_hand']:>9} octets/main  {r['list_ms']:>9} ms")
+    print(f"FileStorage.get_hands_by_tournament ({len(hands)} mains): {storage_ms:.2f} ms")
+    eager, lazy = results
+    print(f"Mémoire: x{eager['bytes_per_hand'] / lazy['bytes_per_hand']:.1f} moins  "
+          f"Temps: x{eager['list_ms'] / lazy['list_ms']:.1f} plus rapide")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_serialization.py
+"""
+Compare les formats de sérialisation du stockage sur les vraies mains
+(data/hands.json) : temps de sauvegarde, temps de chargement et taille sur
+disque, pour un fichier de liste (tournois, analyses, replays...) et pour le
+journal de mains (payloads encodés un par un).
+
+    cd backend && python benchmarks/bench_serialization.py --repeat 10
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.hand_log import FORMAT_MAGIC, HandLog  # noqa: E402
+from app.serialization import available_codecs, get_codec, load_file  # noqa: E402
+
+
+def best_of(func, runs):
+    """Meilleur temps (ms) sur plusieurs exécutions"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def bench_list_file(codec_name, hands, data_dir, runs):
+    codec = get_codec(codec_name)
+    path = os.path.join(data_dir, f"hands-{codec_name}{codec.extension}")
+
+    def save():
+        with open(path, 'wb') as f:
+            f.write(codec.dumps(hands))
+
+    save_ms = best_of(save, runs)
+    load_ms = best_of(lambda: load_file(path), runs)
+    assert load_file(path) == hands
+    return save_ms, load_ms, os.path.getsize(path)
+
+
+def bench_hand_log(payload_format, hands, data_dir, runs):
+    log = HandLog(os.path.join(data_dir, f"hands-{payload_format}.log"), payload_format=payload_format)
+    save_ms = best_of(lambda: log.rewrite(hands), runs)
+
+    # Chargement : réouverture (index des clés) puis lecture de toutes les mains
+    def load():
+        HandLog(log.path).all()
+
+    load_ms = best_of(load, runs)
+    assert len(log.all()) == len(hands)
+    return save_ms, load_ms, log.size_bytes()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--source', default=os.path.join('data', 'hands.json'))
+    arg_parser.add_argument('--repeat', type=int, default=1,
+                            help="Nombre de copies des mains sources (jeu de données plus gros)")
+    arg_parser.add_argument('--runs', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        source = json.load(f)
+    if not source:
+        sys.exit(f"Aucune main dans {args.source}")
+
+    hands = []
+    for _ in range(args.repeat):
+        for h_data in source:
+            h_data = copy.deepcopy(h_data)
+            h_data['id'] = str(uuid.uuid4())
+            hands.append(h_data)
+
+    print(f"{len(hands)} mains ({os.path.getsize(args.source) * args.repeat / 1024:.0f} Ko de JSON source)")
+    with tempfile.TemporaryDirectory() as data_dir:
+        print("\nFichier de liste")
+        print(f"{'format':<20} {'save ms':>10} {'load ms':>10} {'taille Ko':>12}")
+        reference = None
+        for codec_name in available_codecs():
+            save_ms, load_ms, size = bench_list_file(codec_name, hands, data_dir, args.runs)
+            reference = reference or size
+            print(f"{codec_name:<20} {save_ms:>10.1f} {load_ms:>10.1f} {size / 1024:>12.1f}  "
+                  f"({size / reference:.0%} du JSON indenté)")
+
+        print("\nJournal de mains (hands.log)")
+        print(f"{'format':<20} {'save ms':>10} {'load ms':>10} {'taille Ko':>12}")
+        reference = None
+        for payload_format in FORMAT_MAGIC:
+            if payload_format.startswith('msgpack') and 'msgpack' not in available_codecs():
+                continue
+            save_ms, load_ms, size = bench_hand_log(payload_format, hands, data_dir, args.runs)
+            reference = reference or size
+            print(f"{payload_format:<20} {save_ms:>10.1f} {load_ms:>10.1f} {size / 1024:>12.1f}  "
+                  f"({size / reference:.0%} du JSON)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_snapshot_reads.py
+"""
+Lectures concurrentes pendant des uploads : des threads lecteurs lisent la
+liste des tournois, un tournoi, une page de mains et le nombre de mains
+pendant qu'un écrivain importe des tournois. Mesure le débit et la latence
+des lectures (lues dans le snapshot, sans verrou) et vérifie qu'aucune
+lecture ne voit un tournoi à moitié importé.
+
+    cd backend && python benchmarks/bench_snapshot_reads.py --readers 1 2 4 8 --uploads 5
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import FileStorage  # noqa: E402
+
+
+def upload(storage, source, index):
+    """Import d'un tournoi tel que le fait l'endpoint d'upload (un seul bloc d'écriture)"""
+    with storage.snapshots.writing():
+        tournament = storage.create_tournament(
+            user_id="default_user", name=f"Bench {index}", date=datetime(2025, 1, 1) + timedelta(days=index),
+            buy_in=5.0, fee=0.0, total_players=3, final_position=1, profit_loss=10.0
+        )
+        for h_data in source:
+            h_data = copy.deepcopy(h_data)
+            h_data.pop('id', None)
+            h_data['date'] = datetime.fromisoformat(h_data['date'])
+            h_data['metrics'] = h_data.get('metrics') or {'precomputed': True}
+            storage.create_hand(tournament.id, h_data)
+    return tournament.id
+
+
+def reader(storage, expected_hands, stop, results):
+    reads = 0
+    latencies = []
+    partial = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        tournaments = storage.get_tournaments_by_user("default_user")
+        for tournament in tournaments[:3]:
+            count = storage.count_hands(tournament.id)
+            storage.get_hands_page(tournament.id, 0, 20)
+            if count != expected_hands:
+                partial += 1
+        latencies.append(time.perf_counter() - start)
+        reads += 1
+    results.append((reads, latencies, partial))
+
+
+def run(source, readers, uploads):
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = FileStorage(data_dir)
+        upload(storage, source, 0)
+
+        stop = threading.Event()
+        results = []
+        threads = [threading.Thread(target=reader, args=(storage, len(source), stop, results))
+                   for _ in range(readers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for i in range(1, uploads + 1):
+            upload(storage, source, i)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, lat, _ in results for latency in lat)
+    reads = sum(r for r, _, _ in results)
+    return {
+        'readers': readers,
+        'reads_per_s': round(reads / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+        'partial_reads': sum(p for _, _, p in results),
+        'upload_s': round(elapsed / uploads, 2)
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--source', default=os.path.join('data', 'hands.json'))
+    arg_parser.add_argument('--hands', type=int, default=200, help="Mains par tournoi importé")
+    arg_parser.add_argument('--readers', type=int, nargs='+', default=[1, 2, 4, 8])
+    arg_parser.add_argument('--uploads', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        source = json.load(f)[:args.hands]
+    for h_data in source:
+        h_data['id'] = str(uuid.uuid4())
+
+    print(f"{'lecteurs':>8} {'lectures/s':>11} {'p50 ms':>8} {'max ms':>8} {'partielles':>11} {'upload s':>9}")
+    for readers in args.readers:
+        r = run(source, readers, args.uploads)
+        print(f"{r['readers']:>8} {r['reads_per_s']:>11} {r['p50_ms']:>8} {r['max_ms']:>8} "
+              f"{r['partial_reads']:>11} {r['upload_s']:>9}")
+
+
+if __name__ == "__main__":
+    main()
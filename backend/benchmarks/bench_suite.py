@@ -0,0 +1,279 @@
+# benchmarks/bench_suite.py
+"""
+Suite de benchmarks de référence du parser et du stockage, sur des corpus
+synthétiques fixes (voir synthetic_winamax.py) :
+
+- WinamaxParser.extract_hands : mains/s et Mo/s
+- WinamaxParser.parse_summary_file : summaries/s
+- FileStorage à 10k, 100k (et 1M avec --scales) mains : création (mains/s),
+  ouverture, lecture d'une main, page de mains, suppression d'un tournoi
+- upload de bout en bout (POST /api/tournaments/upload)
+
+    cd backend && python benchmarks/bench_suite.py --output results.json
+    cd backend && python benchmarks/bench_suite.py --scales 10000 100000 1000000
+
+Les résultats (JSON) sont comparés à benchmarks/baseline.json : le script
+échoue (code 1) si une mesure se dégrade au-delà de --threshold (débit plus
+faible ou latence plus élevée). Les mesures absentes de la référence sont
+seulement affichées. --update-baseline réécrit la référence : à lancer sur
+la machine qui sert de référence (les valeurs dépendent du matériel). Une
+référence enregistrée sur une autre machine n'est pas comparée (code 2),
+sauf avec --any-machine.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_winamax import CorpusConfig, generate_tournament  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+USER_ID = "default_user"
+# Corpus standard : tournois de 1000 mains dont le héros ne sort pas (nombre de mains fixe)
+HANDS_PER_TOURNAMENT = 1000
+STANDARD_CORPUS = dict(hands=HANDS_PER_TOURNAMENT, hero_edge=1.0)
+
+
+def best_of(func: Callable[[], Any], runs: int) -> float:
+    """Meilleur temps (s) sur plusieurs exécutions"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def median_us(func: Callable[[Any], Any], args: List[Any]) -> float:
+    """Latence médiane (µs) d'un appel par argument"""
+    timings = []
+    for arg in args:
+        start = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def scale_label(hands: int) -> str:
+    if hands >= 1_000_000 and hands % 1_000_000 == 0:
+        return f"{hands // 1_000_000}M"
+    return f"{hands // 1000}k" if hands % 1000 == 0 else str(hands)
+
+
+class BenchSuite:
+    """Exécute les benchmarks et accumule les mesures {nom: {value, unit, higher_is_better}}"""
+
+    def __init__(self, work_dir: str, seed: int = 42, runs: int = 3):
+        self.work_dir = work_dir
+        self.seed = seed
+        self.runs = runs
+        self.rng = random.Random(seed)
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        self._pool: List[Dict[str, Any]] = []
+
+    def record(self, name: str, value: float, unit: str, higher_is_better: bool):
+        self.metrics[name] = {'value': round(value, 3), 'unit': unit, 'higher_is_better': higher_is_better}
+        print(f"  {name:<40} {value:>14.1f} {unit}")
+
+    def corpus(self, tournaments: int, first_index: int = 0):
+        config = CorpusConfig(seed=self.seed, **STANDARD_CORPUS)
+        return [generate_tournament(first_index + i, config) for i in range(tournaments)]
+
+    def bench_parser(self, tournaments: int = 10):
+        from app.services.winamax_parser import WinamaxParser
+
+        print("Parser")
+        corpus = self.corpus(tournaments)
+        histories = [history for _, history, _ in corpus]
+        summaries = [summary for _, _, summary in corpus] * 200
+        parser = WinamaxParser()
+
+        hands = sum(len(parser.extract_hands(history)) for history in histories)
+        size_mb = sum(len(history.encode('utf-8')) for history in histories) / (1024 * 1024)
+        seconds = best_of(lambda: [parser.extract_hands(history) for history in histories], self.runs)
+        self.record('extract_hands.hands_per_s', hands / seconds, 'hands/s', True)
+        self.record('extract_hands.mb_per_s', size_mb / seconds, 'MB/s', True)
+
+        seconds = best_of(lambda: [parser.parse_summary_file(summary) for summary in summaries], self.runs)
+        self.record('parse_summary_file.summaries_per_s', len(summaries) / seconds, 'summaries/s', True)
+
+    def bench_storage(self, scale: int, batch_size: int = 10, samples: int = 500):
+        """Stockage rempli jusqu'à scale mains par lots de tournois (comme un import d'archive)"""
+        from app.services.tournament_importer import TournamentImporter, parse_tournament
+        from app.storage import FileStorage
+
+        label = scale_label(scale)
+        print(f"FileStorage {label}")
+        # Tournois parsés une fois, réutilisés sous d'autres dates (pas de doublon)
+        if not self._pool:
+            self._pool = [parse_tournament(history) for _, history, _ in self.corpus(10)]
+        pool = self._pool
+        data_dir = os.path.join(self.work_dir, f"storage-{label}")
+        storage = FileStorage(data_dir)
+        importer = TournamentImporter(storage, USER_ID)
+
+        count = scale // HANDS_PER_TOURNAMENT
+        tournament_ids: List[str] = []
+        start = time.perf_counter()
+        for first in range(0, count, batch_size):
+            batch = []
+            for i in range(first, min(first + batch_size, count)):
+                parsed = pool[i % len(pool)]
+                tournament = dict(parsed['tournament'], date=datetime(2020, 1, 1) + timedelta(hours=i))
+                batch.append({'tournament': tournament, 'hands': parsed['hands'], 'summary': None})
+            tournament_ids.extend(result['tournament_id'] for result in importer.store_many(batch))
+        seconds = time.perf_counter() - start
+        self.record(f'storage.{label}.create_hands_per_s', count * HANDS_PER_TOURNAMENT / seconds, 'hands/s', True)
+
+        # Ouverture à froid (chargement des index et du snapshot)
+        del storage, importer
+        start = time.perf_counter()
+        storage = FileStorage(data_dir)
+        self.record(f'storage.{label}.open_ms', (time.perf_counter() - start) * 1000, 'ms', False)
+
+        sampled = self.rng.sample(tournament_ids, min(samples, len(tournament_ids)))
+        hand_ids = [storage.get_hands_page(tournament_id, self.rng.randrange(HANDS_PER_TOURNAMENT), 1)[0].id
+                    for tournament_id in (self.rng.choice(sampled) for _ in range(samples))]
+        self.record(f'storage.{label}.read_hand_us', median_us(storage.get_hand_by_id, hand_ids), 'us', False)
+
+        pages = [(self.rng.choice(sampled), self.rng.randrange(0, HANDS_PER_TOURNAMENT - 50)) for _ in range(samples)]
+        self.record(f'storage.{label}.page_50_us',
+                    median_us(lambda page: storage.get_hands_page(page[0], page[1], 50), pages), 'us', False)
+
+        deleted = sampled[:min(3, len(sampled))]
+        self.record(f'storage.{label}.delete_tournament_ms',
+                    median_us(storage.delete_tournament_and_hands, deleted) / 1000, 'ms', False)
+        del storage
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    def bench_upload(self):
+        """Upload HTTP complet (parsing, métriques, stockage) d'un tournoi de 1000 mains"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        print("Upload")
+        client = TestClient(app)
+        # Un tournoi différent par exécution (un tournoi déjà importé n'est pas réenregistré)
+        timings = []
+        for simulator, history, _ in self.corpus(self.runs, first_index=1000):
+            start = time.perf_counter()
+            response = client.post('/api/tournaments/upload',
+                                   files={'file': (simulator.filename(), history.encode('utf-8'), 'text/plain')})
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200 or response.json().get('status') != 'created':
+                raise RuntimeError(f"Upload en échec : {response.status_code} {response.text[:200]}")
+        self.record('upload.1k_hands_ms', min(timings) * 1000, 'ms', False)
+
+
+def compare(metrics: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[str]:
+    """Affiche l'écart à la référence ; renvoie les mesures dégradées au-delà du seuil"""
+    regressions = []
+    print(f"\n{'mesure':<40} {'référence':>12} {'actuel':>12} {'écart':>8}")
+    for name, metric in metrics.items():
+        reference = baseline.get(name)
+        if reference is None or not reference['value']:
+            print(f"{name:<40} {'-':>12} {metric['value']:>12.1f}   (absente de la référence)")
+            continue
+        change = metric['value'] / reference['value'] - 1
+        # Débit : une baisse dégrade ; latence : une hausse dégrade
+        degraded = -change if metric['higher_is_better'] else change
+        status = ''
+        if degraded > threshold:
+            status = 'RÉGRESSION'
+            regressions.append(name)
+        print(f"{name:<40} {reference['value']:>12.1f} {metric['value']:>12.1f} {change:>+8.1%} {status}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--scales', type=int, nargs='+', default=[10000, 100000],
+                            help="Tailles du stockage en mains (multiples de 1000)")
+    arg_parser.add_argument('--runs', type=int, default=3)
+    arg_parser.add_argument('--seed', type=int, default=42)
+    arg_parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Dégradation tolérée par rapport à la référence (0.25 = 25 %%)")
+    arg_parser.add_argument('--baseline', default=BASELINE_FILE)
+    arg_parser.add_argument('--output', help="Fichier JSON des résultats")
+    arg_parser.add_argument('--update-baseline', action='store_true', help="Enregistre les résultats comme référence")
+    arg_parser.add_argument('--any-machine', action='store_true',
+                            help="Compare même si la référence vient d'une autre machine")
+    arg_parser.add_argument('--skip', nargs='*', default=[], choices=('parser', 'storage', 'upload'))
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    args.baseline = os.path.abspath(args.baseline)
+    args.output = os.path.abspath(args.output) if args.output else None
+    machine = f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)"
+
+    # Référence vérifiée avant les mesures : celle d'une autre machine n'est pas comparable
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('machine') != machine:
+            print(f"Référence enregistrée sur une autre machine ({baseline.get('machine')}, ici {machine}) : "
+                  f"mesures non comparables")
+            if not args.any_machine:
+                sys.exit(2)
+    # Le stockage global de l'application (app.storage) est créé dans data/ du répertoire
+    # courant à l'import : les modules de l'application ne sont importés qu'une fois ici
+    work_dir = tempfile.mkdtemp(prefix='bench-suite-')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    suite = BenchSuite(work_dir, seed=args.seed, runs=args.runs)
+    try:
+        if 'parser' not in args.skip:
+            suite.bench_parser()
+        if 'storage' not in args.skip:
+            for scale in args.scales:
+                suite.bench_storage(scale)
+        if 'upload' not in args.skip:
+            suite.bench_upload()
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': machine,
+        'seed': args.seed,
+        'metrics': suite.metrics
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\nRéférence enregistrée dans {args.baseline}")
+        return
+    if baseline is None:
+        print(f"\nPas de référence ({args.baseline}) : --update-baseline pour l'enregistrer")
+        return
+
+    regressions = compare(suite.metrics, baseline.get('metrics', {}), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%} : {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nAucune régression au-delà de {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
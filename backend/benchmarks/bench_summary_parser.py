@@ -0,0 +1,266 @@
+# benchmarks/bench_summary_parser.py
+"""
+Compare le parser de summaries (expressions précompilées, une seule passe
+sur les lignes) à l'implémentation précédente (re.split puis recherches non
+compilées sur chaque ligne) sur un corpus synthétique de summaries : temps
+total, summaries par seconde, et égalité stricte des résultats.
+
+    cd backend && python benchmarks/bench_summary_parser.py --files 20000
+"""
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.winamax_parser import WinamaxParser  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def legacy_parse_summary_file(content: str) -> Dict[str, Any]:
+    """Implémentation précédente de WinamaxParser.parse_summary_file (référence)"""
+    try:
+        summary_info = {}
+
+        summary_sections = re.split(r'(?=Winamax Poker - Tournament summary)', content)
+        summary_sections = [section.strip() for section in summary_sections if section.strip()]
+
+        logger.debug(f"Found {len(summary_sections)} tournament entries")
+
+        if not summary_sections:
+            return summary_info
+
+        total_entries = len(summary_sections)
+        re_entries_count = max(0, total_entries - 1)
+
+        late_registration_count = 0
+        for section in summary_sections:
+            if "Late Registration" in section:
+                late_registration_count += 1
+
+        has_late_registration = late_registration_count > 0
+        last_section = summary_sections[-1]
+
+        # Identification du tournoi (association du summary à son historique)
+        header_match = re.search(r'Tournament summary : (.+)\((\d+)\)\s*$', summary_sections[0], re.MULTILINE)
+        if header_match:
+            summary_info['tournament_name'] = header_match.group(1).strip()
+            summary_info['winamax_id'] = header_match.group(2)
+
+        started_match = re.search(r'Tournament started (\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2})', summary_sections[0])
+        if started_match:
+            summary_info['started_at'] = datetime.strptime(started_match.group(1), '%Y/%m/%d %H:%M:%S')
+
+        # Extraire la position finale
+        final_position_match = re.search(r'You finished in (\d+)(?:th|st|nd|rd) place', last_section)
+        if final_position_match:
+            summary_info['final_position'] = int(final_position_match.group(1))
+
+        # Nombre de joueurs
+        players_match = re.search(r'Registered players : (\d+)', last_section)
+        if players_match:
+            summary_info['total_players'] = int(players_match.group(1))
+
+        # Buy-in
+        buyin_match = re.search(r'Buy-In : ([0-9.,]+)€ \+ ([0-9.,]+)€ \+ ([0-9.,]+)€', last_section)
+        if buyin_match:
+            base_buyin = float(buyin_match.group(1).replace(',', '.'))
+            bounty = float(buyin_match.group(2).replace(',', '.'))
+            fee = float(buyin_match.group(3).replace(',', '.'))
+
+            single_buy_in = base_buyin + bounty + fee
+            summary_info['buy_in'] = round(single_buy_in, 2)
+
+            total_cost = single_buy_in * total_entries
+            summary_info['total_cost'] = round(total_cost, 2)
+            summary_info['single_entry_cost'] = round(single_buy_in, 2)
+
+            summary_info['buy_in_details'] = {
+                'base': base_buyin,
+                'bounty': bounty,
+                'fee': fee,
+                'total_entries': total_entries,
+                're_entries': re_entries_count,
+                'cost_per_entry': single_buy_in
+            }
+
+        # Calculer les gains
+        total_winnings = 0.0
+        total_bounties = 0.0
+
+        for section in summary_sections:
+            section_lines = section.split('\n')
+
+            for line in section_lines:
+                line = line.strip()
+
+                combined_match = re.search(r'You won ([0-9.,]+)€ \+ Bounty ([0-9.,]+)€', line)
+                if combined_match:
+                    cash_win = float(combined_match.group(1).replace(',', '.'))
+                    bounty_win = float(combined_match.group(2).replace(',', '.'))
+                    total_winnings += cash_win
+                    total_bounties += bounty_win
+                    continue
+
+                bounty_only_match = re.search(r'You won Bounty ([0-9.,]+)€', line)
+                if bounty_only_match:
+                    bounty_win = float(bounty_only_match.group(1).replace(',', '.'))
+                    total_bounties += bounty_win
+                    continue
+
+                cash_only_match = re.search(r'You won ([0-9.,]+)€(?! \+ Bounty)', line)
+                if cash_only_match and 'Bounty' not in line:
+                    cash_win = float(cash_only_match.group(1).replace(',', '.'))
+                    total_winnings += cash_win
+                    continue
+
+        summary_info['total_winnings'] = round(total_winnings, 2)
+        summary_info['total_bounties'] = round(total_bounties, 2)
+        summary_info['combined_winnings'] = round(total_winnings + total_bounties, 2)
+
+        # Calculer le profit
+        if 'total_cost' in summary_info:
+            total_gains = total_winnings + total_bounties
+            profit_loss = total_gains - summary_info['total_cost']
+            summary_info['profit_loss'] = round(profit_loss, 2)
+
+            summary_info['profit_calculation'] = {
+                'total_gains': total_gains,
+                'total_cost': summary_info['total_cost'],
+                'profit_loss': profit_loss,
+                'total_entries': total_entries,
+                're_entries': re_entries_count,
+                'cost_per_entry': single_buy_in
+            }
+        else:
+            summary_info['profit_loss'] = round(total_winnings + total_bounties, 2)
+
+        summary_info['entries_count'] = total_entries
+        summary_info['re_entries_count'] = re_entries_count
+        summary_info['late_registration_count'] = late_registration_count
+        summary_info['has_late_registration'] = has_late_registration
+
+        # Temps de jeu
+        time_match = re.search(r'You played ([0-9]+)min ([0-9]+)s', last_section)
+        if time_match:
+            minutes = int(time_match.group(1))
+            seconds = int(time_match.group(2))
+            summary_info['play_time_minutes'] = minutes
+            summary_info['play_time_seconds'] = seconds
+            summary_info['total_play_time'] = f"{minutes}min {seconds}s"
+
+        logger.debug(f"Summary parsed - Position: {summary_info.get('final_position', 'N/A')}, "
+                f"Total entries: {total_entries}, Re-entries: {re_entries_count}")
+
+        return summary_info
+
+    except Exception as e:
+        logger.debug(f"Error parsing summary file: {e}")
+        return {}
+
+
+def _amount(rng: random.Random) -> str:
+    value = f"{rng.choice([0.5, 1, 2, 4.5, 9, 24, 50]) * rng.uniform(0.5, 3):.2f}"
+    # Quelques montants à virgule décimale, comme certains exports
+    return value.replace('.', ',') if rng.random() < 0.1 else value
+
+
+def synthetic_summary(rng: random.Random, index: int) -> str:
+    """Summary Winamax : 1 à 4 entrées (re-entries), gains cash et/ou bounty variés"""
+    name = rng.choice(['TRIDENT SPACE KO', 'MONSTER STACK', 'HIGHROLLER', 'SPACE KO (Turbo)', 'FREEROLL'])
+    tournament_id = 900000000 + index
+    started = datetime(2025, 1, 1) + timedelta(minutes=rng.randint(0, 300000))
+    players = rng.randint(6, 5000)
+    base, bounty, fee = _amount(rng), _amount(rng), _amount(rng)
+    sections = []
+    for entry in range(rng.choices([1, 2, 3, 4], weights=[70, 20, 7, 3])[0]):
+        lines = [
+            f"Winamax Poker - Tournament summary : {name}({tournament_id})",
+            "Player : ZERO_TALENT",
+            f"Buy-In : {base}€ + {bounty}€ + {fee}€",
+            f"Registered players : {players}",
+            "Mode : tt",
+            "Type : knockout",
+            "Speed : normal",
+            "Levels : [10-20]",
+            f"Prizepool : {players * 2}€",
+            f"Tournament started {started:%Y/%m/%d %H:%M:%S} UTC ",
+        ]
+        if rng.random() < 0.2:
+            lines.append("Late Registration : yes")
+        lines.append(f"You played {rng.randint(0, 300)}min {rng.randint(0, 59)}s ")
+        lines.append(f"You finished in {rng.randint(1, players)}{rng.choice(['th', 'st', 'nd', 'rd'])} place")
+        outcome = rng.random()
+        if outcome < 0.3:
+            lines.append(f"You won {_amount(rng)}€ + Bounty {_amount(rng)}€")
+        elif outcome < 0.5:
+            lines.append(f"You won Bounty {_amount(rng)}€")
+        elif outcome < 0.65:
+            lines.append(f"You won {_amount(rng)}€")
+        sections.append('\n'.join(lines) + '\n')
+    return '\n'.join(sections)
+
+
+def edge_cases() -> List[str]:
+    """Cas limites : vide, préambule, sans buy-in, en-tête en milieu de ligne, CRLF"""
+    rng = random.Random(0)
+    sample = synthetic_summary(rng, 0)
+    return [
+        '',
+        '   \n',
+        'not a summary',
+        'preamble\n' + sample,
+        re.sub(r'Buy-In : .*\n', '', sample),
+        sample.replace('\n', '\r\n'),
+        sample.replace('\nWinamax Poker', ' Winamax Poker'),
+        sample + 'You won 1€ You finished in 2nd place\n',
+    ]
+
+
+def best_of(func, runs: int) -> float:
+    """Meilleur temps (s) sur plusieurs exécutions"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--files', type=int, default=20000, help="Nombre de summaries synthétiques")
+    arg_parser.add_argument('--runs', type=int, default=3)
+    arg_parser.add_argument('--seed', type=int, default=42)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+    corpus = [synthetic_summary(rng, i) for i in range(args.files)] + edge_cases()
+    size = sum(len(content) for content in corpus)
+    parser = WinamaxParser()
+
+    mismatches = [i for i, content in enumerate(corpus)
+                  if parser.parse_summary_file(content) != legacy_parse_summary_file(content)]
+    if mismatches:
+        sys.exit(f"Résultats différents pour {len(mismatches)} summaries (ex. n°{mismatches[0]})")
+
+    legacy_s = best_of(lambda: [legacy_parse_summary_file(content) for content in corpus], args.runs)
+    current_s = best_of(lambda: [parser.parse_summary_file(content) for content in corpus], args.runs)
+
+    print(f"{len(corpus)} summaries ({size / (1024 * 1024):.1f} Mo), résultats identiques")
+    print(f"{'parser':<24} {'total s':>10} {'summaries/s':>14}")
+    print(f"{'précédent':<24} {legacy_s:>10.3f} {len(corpus) / legacy_s:>14.0f}")
+    print(f"{'une passe, précompilé':<24} {current_s:>10.3f} {len(corpus) / current_s:>14.0f}")
+    print(f"Gain : x{legacy_s / current_s:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,613 @@
+# benchmarks/synthetic_winamax.py
+"""
+Générateur d'historiques Winamax synthétiques (tournois + summaries) pour les
+benchmarks et les tests de charge :
+
+    cd backend && python benchmarks/synthetic_winamax.py /tmp/corpus --tournaments 200 --hands 500 --check
+
+Chaque tournoi est simulé main par main au format exact des exports Winamax
+(antes, blinds, relances, tapis avec pots parallèles, showdown, bounties,
+re-entries du héros) et écrit avec son summary sous les noms de fichiers
+Winamax (AAAAMMJJ_NOM(ID)_real_holdem_no-limit.txt / _summary.txt).
+
+Déterministe : le tournoi n°i ne dépend que de la graine et de i, la sortie
+est identique quel que soit le nombre de processus (--workers). --check
+reparse chaque fichier avec WinamaxParser et le compare à ce qui a été
+généré. --size-mb génère des tournois jusqu'à atteindre la taille voulue.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DECK = [rank + suit for rank in '23456789TJQKA' for suit in 'cdhs']
+HAND_DESCRIPTIONS = [
+    'High card : Ace', 'High card : King', 'One pair : Kings', 'One pair : 7',
+    'Two pairs : Queens and 9', 'Two pairs : Aces and 4', 'Trips of Jacks', 'Straight Ten high',
+    'Straight 7 high', 'Flush Ace high', 'Full of 8 and Kings', 'Four of a kind : 5'
+]
+TOURNAMENT_NAMES = ['TRIDENT SPACE KO', 'MONSTER STACK', 'HIGHROLLER', 'SPACE KO', 'EXPRESSO NITRO', 'SUNDAY SURPRISE']
+NAME_PARTS = ['poker', 'ace', 'river', 'shark', 'nuts', 'bluff', 'king', 'fish', 'allin', 'zen',
+              'tilt', 'gto', 'pablo', 'meta', 'max', 'luna', 'volt', 'kiwi', 'turbo', 'pik']
+# Grosses blindes successives ; ante = 15 % de la BB (comme les KO Winamax)
+BIG_BLINDS = [20, 30, 40, 50, 60, 80, 100, 120, 150, 200, 250, 300, 400, 500, 600, 800,
+              1000, 1200, 1500, 2000, 2500, 3000, 4000, 5000, 6000, 8000, 10000]
+
+
+class CorpusConfig:
+    """Paramètres de génération (valeurs par défaut proches d'un KO 3-max)"""
+
+    def __init__(self, hands: int = 300, table_size: int = 3, players: int = 300,
+                 starting_stack: int = 500, hands_per_level: Optional[int] = None,
+                 flop_rate: float = 0.45, turn_rate: float = 0.7, river_rate: float = 0.75,
+                 showdown_rate: float = 0.5, all_in_rate: float = 0.06,
+                 buy_in: float = 1.0, bounty: float = 0.8, fee: float = 0.2,
+                 re_entries: int = 1, hero_edge: float = 0.0, hero: str = 'SyntheticHero', seed: int = 42):
+        self.hands = hands
+        self.table_size = table_size
+        self.players = players
+        self.starting_stack = starting_stack
+        # Par défaut, la structure des blindes s'étale sur le nombre de mains demandé
+        self.hands_per_level = hands_per_level or max(8, hands // len(BIG_BLINDS))
+        # Probabilités : voir le flop, puis le turn sachant le flop, la river sachant le turn
+        self.flop_rate = flop_rate
+        self.turn_rate = turn_rate
+        self.river_rate = river_rate
+        # Showdown sachant la river, tapis préflop (showdown immédiat)
+        self.showdown_rate = showdown_rate
+        self.all_in_rate = all_in_rate
+        self.buy_in = buy_in
+        self.bounty = bounty
+        self.fee = fee
+        self.re_entries = re_entries
+        # Avantage du héros au showdown (1 : il gagne tous ses showdowns et ne sort jamais)
+        self.hero_edge = hero_edge
+        self.hero = hero
+        self.seed = seed
+
+
+def _money(value: float) -> str:
+    """Montant des lignes de siège : 1€ bounty, 0.5€ bounty"""
+    return f"{value:.2f}".rstrip('0').rstrip('.')
+
+
+class _Seat:
+    __slots__ = ('seat', 'name', 'stack', 'committed', 'street', 'folded', 'cards')
+
+    def __init__(self, seat: int, name: str, stack: int):
+        self.seat = seat
+        self.name = name
+        self.stack = stack
+
+
+class TournamentSimulator:
+    """Simule la table du héros pendant un tournoi et produit l'historique et le summary"""
+
+    def __init__(self, index: int, config: CorpusConfig):
+        self.config = config
+        self.rng = random.Random(f"{config.seed}-{index}")
+        rng = self.rng
+        self.index = index
+        self.name = rng.choice(TOURNAMENT_NAMES)
+        self.winamax_id = 900000000 + index
+        self.started_at = datetime(2025, 1, 1, 18) + timedelta(days=index % 365, minutes=rng.randrange(0, 240, 5))
+        self.clock = self.started_at + timedelta(seconds=rng.randint(0, 600))
+        self.table_number = rng.randint(1, 400)
+        self.table_key = rng.randint(10 ** 18, 10 ** 19 - 1)
+        self.table_hand = 0
+        self.knockouts = 0
+        self.entries = 1
+        self.busted_entries: List[int] = []
+        self.expected: List[Dict[str, Any]] = []
+        self._names = 0
+        self.seats: List[Optional[_Seat]] = [None] * config.table_size
+        self.button = 0
+        self._seat_players(hero_stack=config.starting_stack)
+
+    # ----- joueurs -----
+    def _new_name(self) -> str:
+        self._names += 1
+        rng = self.rng
+        return f"{rng.choice(NAME_PARTS)}{rng.choice(NAME_PARTS).capitalize()}{rng.randint(1, 999)}"
+
+    def _seat_players(self, hero_stack: int):
+        """Nouvelle table (début de tournoi ou re-entry) : le héros et des adversaires"""
+        config = self.config
+        self.seats = [None] * config.table_size
+        hero_seat = self.rng.randrange(config.table_size)
+        self.seats[hero_seat] = _Seat(hero_seat + 1, config.hero, hero_stack)
+        self._fill_seats()
+        self.button = self.rng.randrange(config.table_size)
+        self.table_number = self.rng.randint(1, 400)
+        self.table_key = self.rng.randint(10 ** 18, 10 ** 19 - 1)
+        self.table_hand = 0
+
+    def _fill_seats(self):
+        """Sièges libres occupés par de nouveaux joueurs (équilibrage des tables)"""
+        average = max(self.config.starting_stack, self._big_blind() * 25)
+        for i, seat in enumerate(self.seats):
+            if seat is None:
+                stack = int(average * self.rng.uniform(0.3, 2.0))
+                self.seats[i] = _Seat(i + 1, self._new_name(), stack)
+
+    def _level(self) -> int:
+        return min(len(BIG_BLINDS), 1 + len(self.expected) // self.config.hands_per_level)
+
+    def _big_blind(self) -> int:
+        return BIG_BLINDS[self._level() - 1]
+
+    # ----- une main -----
+    def play_hand(self) -> str:
+        config = self.config
+        rng = self.rng
+        level = self._level()
+        bb = BIG_BLINDS[level - 1]
+        sb = bb // 2
+        ante = max(1, round(bb * 0.15))
+
+        occupied = [seat for seat in self.seats if seat is not None]
+        size = len(self.seats)
+        self.button = next(i % size for i in range(self.button + 1, self.button + 1 + size)
+                           if self.seats[i % size] is not None)
+        button = self.seats[self.button]
+        # Ordre de jeu à partir du siège suivant le bouton
+        start = occupied.index(button) + 1
+        order = occupied[start:] + occupied[:start]
+        heads_up = len(order) == 2
+        small, big = (button, order[0]) if heads_up else (order[0], order[1])
+
+        # Seules les cartes utilisables sont tirées (plus rapide que de mélanger le paquet)
+        deck = rng.sample(DECK, 2 * len(order) + 5)
+        for seat in order:
+            seat.committed = 0
+            seat.street = 0
+            seat.folded = False
+            seat.cards = f"{deck.pop()} {deck.pop()}"
+        hero = next(seat for seat in order if seat.name == config.hero)
+
+        self.table_hand += 1
+        self.clock += timedelta(seconds=rng.randint(15, 90))
+        timestamp = int(self.clock.timestamp())
+        hand_id = f"{self.table_key}-{self.table_hand}-{timestamp}"
+        bounty = f", {_money(config.bounty)}€ bounty" if config.bounty else ''
+        lines = [
+            f'Winamax Poker - Tournament "{self.name}" buyIn: {config.buy_in + config.bounty:.2f}€ + '
+            f'{config.fee:.2f}€ level: {level} - HandId: #{hand_id} - Holdem no limit ({ante}/{sb}/{bb}) - '
+            f'{self.clock:%Y/%m/%d %H:%M:%S} UTC',
+            f"Table: '{self.name}({self.winamax_id})#{self.table_number:04d}' {size}-max (real money) "
+            f"Seat #{button.seat} is the button"
+        ]
+        lines.extend(f"Seat {seat.seat}: {seat.name} ({seat.stack}{bounty})" for seat in occupied)
+
+        lines.append('*** ANTE/BLINDS ***')
+        blind_order = order if not heads_up else [small, big]
+        for seat in blind_order:
+            lines.append(f"{seat.name} posts ante {self._commit(seat, ante)}")
+        lines.append(f"{small.name} posts small blind {self._commit(small, sb, street=True)}")
+        lines.append(f"{big.name} posts big blind {self._commit(big, bb, street=True)}")
+        lines.append(f"Dealt to {hero.name} [{hero.cards}]")
+
+        # Scénario de la main : dernière street atteinte et showdown
+        if rng.random() < config.all_in_rate:
+            target, showdown = 3, True
+            all_in = True
+        else:
+            all_in = False
+            target = 0
+            for rate in (config.flop_rate, config.turn_rate, config.river_rate):
+                if rng.random() >= rate:
+                    break
+                target += 1
+            showdown = target == 3 and rng.random() < config.showdown_rate
+
+        preflop_order = [small, big] if heads_up else order[2:] + order[:2]
+        lines.append('*** PRE-FLOP *** ')
+        self._preflop(lines, preflop_order, bb, target, all_in)
+        live = [seat for seat in order if not seat.folded]
+        if len(live) > 1 and sum(1 for seat in live if seat.stack > 0) < 2:
+            # Tapis payé : le board est distribué jusqu'à la river
+            target, showdown = 3, True
+
+        board: List[str] = []
+        for street, name in enumerate(('FLOP', 'TURN', 'RIVER'), 1):
+            if len(live) < 2 or street > target:
+                break
+            for seat in order:
+                seat.street = 0
+            if street == 1:
+                board = [deck.pop(), deck.pop(), deck.pop()]
+                lines.append(f"*** FLOP *** [{' '.join(board)}]")
+            else:
+                previous = ' '.join(board)
+                board.append(deck.pop())
+                lines.append(f"*** {name} *** [{previous}][{board[-1]}]")
+            last = street == target and not showdown
+            self._postflop(lines, [seat for seat in order if not seat.folded], bb, last)
+            live = [seat for seat in order if not seat.folded]
+
+        pot = sum(seat.committed for seat in order)
+        positions = {button.seat: '(button)', small.seat: '(small blind)', big.seat: '(big blind)'}
+        if heads_up:
+            positions[button.seat] = '(small blind) (button)'
+        summary = [f"Total pot {pot} | No rake"]
+        if board:
+            summary.append(f"Board: [{' '.join(board)}]")
+
+        if len(live) == 1:
+            winner = live[0]
+            winner.stack += pot
+            lines.append(f"{winner.name} collected {pot} from pot")
+            summary.append(f"Seat {winner.seat}: {winner.name} {positions.get(winner.seat, '')} won {pot}"
+                           .replace('  ', ' '))
+            main_winner = winner
+        else:
+            main_winner = self._showdown(lines, summary, order, live, positions)
+
+        lines.append('*** SUMMARY ***')
+        lines.extend(summary)
+        self.expected.append({
+            'hand_id': hand_id, 'hole_cards': hero.cards, 'pot_size': pot, 'players': len(occupied),
+            'flop': ' '.join(board[:3]) if board else None,
+            'turn': board[3] if len(board) > 3 else None,
+            'river': board[4] if len(board) > 4 else None
+        })
+        self._after_hand(main_winner)
+        return '\n'.join(lines) + '\n\n\n'
+
+    def _commit(self, seat: _Seat, amount: int, street: bool = False) -> int:
+        amount = min(amount, seat.stack)
+        seat.stack -= amount
+        seat.committed += amount
+        if street:
+            seat.street += amount
+        return amount
+
+    @staticmethod
+    def _all_in(seat: _Seat) -> str:
+        return ' and is all-in' if seat.stack == 0 else ''
+
+    def _cap(self, seat: _Seat, others: List[_Seat]) -> int:
+        """Mise totale maximale sur la street : pas plus que ce qu'un adversaire peut suivre"""
+        reachable = max((other.street + other.stack for other in others if other is not seat), default=0)
+        return min(seat.street + seat.stack, reachable)
+
+    def _call(self, lines: List[str], seat: _Seat, to: int):
+        amount = self._commit(seat, to - seat.street, street=True)
+        lines.append(f"{seat.name} calls {amount}{self._all_in(seat)}")
+
+    def _raise(self, lines: List[str], seat: _Seat, to: int, current: int):
+        self._commit(seat, to - seat.street, street=True)
+        lines.append(f"{seat.name} raises {to - current} to {to}{self._all_in(seat)}")
+
+    def _preflop(self, lines: List[str], order: List[_Seat], bb: int, target: int, all_in: bool):
+        rng = self.rng
+        able = [seat for seat in order if seat.stack > 0]
+        # Ouvreur et suiveurs désignés, les autres se couchent
+        opener = rng.choice(able) if able else order[0]
+        callers = set()
+        if target > 0 or all_in:
+            after = order[order.index(opener) + 1:]
+            candidates = [seat for seat in after if seat.stack > 0] or [seat for seat in order if seat is not opener]
+            callers.add(rng.choice(candidates))
+            for seat in candidates:
+                if rng.random() < 0.15:
+                    callers.add(seat)
+
+        current = bb
+        acted_opener = False
+        for seat in order:
+            if seat is opener:
+                acted_opener = True
+                if seat.stack == 0:
+                    continue
+                if all_in:
+                    to = self._cap(seat, order)
+                else:
+                    to = min(self._cap(seat, order), int(bb * rng.choice((2, 2, 2.5, 3))))
+                if to > current:
+                    self._raise(lines, seat, to, current)
+                    current = to
+                elif seat.street < current:
+                    self._call(lines, seat, current)
+                else:
+                    lines.append(f"{seat.name} checks")
+            elif not acted_opener or seat not in callers:
+                if seat.street >= current:
+                    lines.append(f"{seat.name} checks")
+                elif seat.stack == 0:
+                    continue
+                else:
+                    lines.append(f"{seat.name} folds")
+                    seat.folded = True
+            elif seat.stack > 0:
+                if seat.street < current:
+                    self._call(lines, seat, current)
+                else:
+                    lines.append(f"{seat.name} checks")
+
+    def _postflop(self, lines: List[str], live: List[_Seat], bb: int, last: bool):
+        rng = self.rng
+        able = [seat for seat in live if seat.stack > 0]
+        if len(able) < 2:
+            # Tapis : le board est distribué sans action
+            return
+        if not last and rng.random() < 0.5:
+            for seat in able:
+                lines.append(f"{seat.name} checks")
+            return
+
+        bettor = able[0] if not last else rng.choice(able)
+        before = able[:able.index(bettor)]
+        for seat in before:
+            lines.append(f"{seat.name} checks")
+        pot = sum(seat.committed for seat in live)
+        to = min(self._cap(bettor, able), max(bb, int(pot * rng.choice((0.33, 0.5, 0.75, 1.0)))))
+        self._commit(bettor, to, street=True)
+        lines.append(f"{bettor.name} bets {to}{self._all_in(bettor)}")
+        for seat in able[able.index(bettor) + 1:] + before:
+            if last:
+                lines.append(f"{seat.name} folds")
+                seat.folded = True
+            else:
+                self._call(lines, seat, to)
+
+    def _showdown(self, lines: List[str], summary: List[str], order: List[_Seat], live: List[_Seat],
+                  positions: Dict[int, str]) -> _Seat:
+        """Pots (principal et parallèles) attribués au meilleur joueur éligible (force tirée au hasard)"""
+        lines.append('*** SHOW DOWN ***')
+        strength = {seat.seat: self.rng.random() + (self.config.hero_edge if seat.name == self.config.hero else 0)
+                    for seat in live}
+        descriptions = {seat.seat: self.rng.choice(HAND_DESCRIPTIONS) for seat in live}
+        for seat in live:
+            lines.append(f"{seat.name} shows [{seat.cards}] ({descriptions[seat.seat]})")
+
+        levels = sorted({seat.committed for seat in live})
+        pots: List[Tuple[int, _Seat]] = []
+        previous = 0
+        for level in levels:
+            amount = sum(min(seat.committed, level) - min(seat.committed, previous) for seat in order)
+            eligible = [seat for seat in live if seat.committed >= level]
+            pots.append((amount, max(eligible, key=lambda seat: strength[seat.seat])))
+            previous = level
+
+        won: Dict[int, int] = {}
+        for i, (amount, winner) in reversed(list(enumerate(pots))):
+            label = 'pot' if len(pots) == 1 else ('main pot' if i == 0 else f"side pot {i}")
+            winner.stack += amount
+            won[winner.seat] = won.get(winner.seat, 0) + amount
+            lines.append(f"{winner.name} collected {amount} from {label}")
+
+        for seat in sorted(live, key=lambda seat: seat.seat):
+            position = f" {positions[seat.seat]}" if seat.seat in positions else ''
+            result = (f"won {won[seat.seat]} with" if seat.seat in won else "lost with")
+            summary.append(f"Seat {seat.seat}: {seat.name}{position} showed [{seat.cards}] and {result} "
+                           f"{descriptions[seat.seat]}")
+        return pots[0][1]
+
+    def _after_hand(self, main_winner: _Seat):
+        """Éliminations (bounty au gagnant du pot principal), re-entry du héros, remplacements"""
+        config = self.config
+        hero_out = False
+        for i, seat in enumerate(self.seats):
+            if seat is not None and seat.stack == 0:
+                if seat.name == config.hero:
+                    hero_out = True
+                else:
+                    if main_winner.name == config.hero:
+                        self.knockouts += 1
+                    self.seats[i] = None
+        if hero_out:
+            self.busted_entries.append(len(self.expected))
+            if self.entries <= config.re_entries:
+                self.entries += 1
+                self._seat_players(hero_stack=config.starting_stack)
+            else:
+                self.seats = []
+            return
+        self._fill_seats()
+
+    @property
+    def finished(self) -> bool:
+        return not self.seats
+
+    # ----- fichiers -----
+    def history(self) -> str:
+        parts = []
+        while len(self.expected) < self.config.hands and not self.finished:
+            parts.append(self.play_hand())
+        return ''.join(parts)
+
+    def summary(self) -> str:
+        config = self.config
+        rng = self.rng
+        players = max(config.players, config.table_size)
+        paid = max(1, players // 6)
+        if self.finished:
+            position = rng.randint(paid + 1, players) if rng.random() < 0.8 else rng.randint(1, paid)
+        else:
+            position = rng.randint(1, paid)
+        cash = round(config.buy_in * players * 0.3 / position, 2) if position <= paid else 0.0
+        bounties = round(self.knockouts * config.bounty, 2)
+
+        sections = []
+        for entry in range(self.entries):
+            last = entry == self.entries - 1
+            entry_position = position if last else rng.randint(paid + 1, players)
+            lines = [
+                f"Winamax Poker - Tournament summary : {self.name}({self.winamax_id})",
+                f"Player : {config.hero}",
+                f"Buy-In : {config.buy_in:.2f}€ + {config.bounty:.2f}€ + {config.fee:.2f}€",
+                f"Registered players : {players}",
+                "Mode : tt",
+                "Type : knockout" if config.bounty else "Type : normal",
+                "Speed : normal",
+                "Levels : [10-20]",
+                f"Prizepool : {round(players * config.buy_in, 2)}€",
+                f"Tournament started {self.started_at:%Y/%m/%d %H:%M:%S} UTC ",
+            ]
+            if entry > 0:
+                lines.append("Late Registration : yes")
+            played = int((self.clock - self.started_at).total_seconds())
+            lines.append(f"You played {played // 60}min {played % 60}s ")
+            lines.append(f"You finished in {entry_position}{self._ordinal(entry_position)} place")
+            if last and cash and bounties:
+                lines.append(f"You won {cash:.2f}€ + Bounty {bounties:.2f}€")
+            elif last and bounties:
+                lines.append(f"You won Bounty {bounties:.2f}€")
+            elif last and cash:
+                lines.append(f"You won {cash:.2f}€")
+            sections.append('\n'.join(lines) + '\n')
+        self.expected_summary = {
+            'entries_count': self.entries, 'final_position': position,
+            'combined_winnings': round(cash + bounties, 2)
+        }
+        return '\n'.join(sections)
+
+    @staticmethod
+    def _ordinal(n: int) -> str:
+        if 10 <= n % 100 <= 20:
+            return 'th'
+        return {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+
+    def filename(self, summary: bool = False) -> str:
+        stem = f"{self.started_at:%Y%m%d}_{self.name}({self.winamax_id})"
+        return f"{stem}_summary.txt" if summary else f"{stem}_real_holdem_no-limit.txt"
+
+
+def generate_tournament(index: int, config: CorpusConfig) -> Tuple[TournamentSimulator, str, str]:
+    """(simulateur, historique, summary) du tournoi n°index"""
+    simulator = TournamentSimulator(index, config)
+    history = simulator.history()
+    return simulator, history, simulator.summary()
+
+
+def check_tournament(simulator: TournamentSimulator, history: str, summary: str) -> List[str]:
+    """Écarts entre ce qui a été généré et ce que WinamaxParser relit"""
+    from app.services.winamax_parser import WinamaxParser
+
+    parser = WinamaxParser()
+    errors = []
+    tournament = parser.parse_tournament_file(history)
+    if tournament['name'] != simulator.name:
+        errors.append(f"nom {tournament['name']!r}")
+    hands = parser.extract_hands(history)
+    if len(hands) != len(simulator.expected):
+        errors.append(f"{len(hands)} mains relues sur {len(simulator.expected)}")
+    for hand, expected in zip(hands, simulator.expected):
+        for key, value in expected.items():
+            actual = len(hand['players']) if key == 'players' else hand.get(key)
+            if actual != value:
+                errors.append(f"main {expected['hand_id']} : {key} {actual!r} au lieu de {value!r}")
+        if hand['hero_name'] != simulator.config.hero:
+            errors.append(f"main {expected['hand_id']} : héros {hand['hero_name']!r}")
+    parsed_summary = parser.parse_summary_file(summary)
+    for key, value in simulator.expected_summary.items():
+        if parsed_summary.get(key) != value:
+            errors.append(f"summary : {key} {parsed_summary.get(key)!r} au lieu de {value!r}")
+    return errors
+
+
+def _write_tournament(job: Tuple[int, CorpusConfig, str, bool]) -> Dict[str, Any]:
+    index, config, out_dir, check = job
+    simulator, history, summary = generate_tournament(index, config)
+    for content, summary_file in ((history, False), (summary, True)):
+        with open(os.path.join(out_dir, simulator.filename(summary_file)), 'w', encoding='utf-8') as f:
+            f.write(content)
+    return {
+        'hands': len(simulator.expected), 'entries': simulator.entries,
+        'bytes': len(history.encode('utf-8')) + len(summary.encode('utf-8')),
+        'errors': check_tournament(simulator, history, summary) if check else []
+    }
+
+
+def write_corpus(out_dir: str, config: CorpusConfig, tournaments: Optional[int] = None,
+                 size_mb: Optional[float] = None, workers: int = 1, check: bool = False) -> Dict[str, Any]:
+    """Écrit un corpus (nombre de tournois ou taille cible) ; renvoie des statistiques"""
+    os.makedirs(out_dir, exist_ok=True)
+    stats = {'tournaments': 0, 'hands': 0, 'entries': 0, 'bytes': 0, 'errors': []}
+    target_bytes = size_mb * 1024 * 1024 if size_mb else None
+    started = time.perf_counter()
+
+    def jobs():
+        index = 0
+        while (tournaments is None or index < tournaments) and \
+                (target_bytes is None or stats['bytes'] < target_bytes):
+            yield index, config, out_dir, check
+            index += 1
+
+    def consume(results):
+        for result in results:
+            stats['tournaments'] += 1
+            stats['hands'] += result['hands']
+            stats['entries'] += result['entries']
+            stats['bytes'] += result['bytes']
+            stats['errors'].extend(result['errors'])
+
+    if workers <= 1:
+        consume(map(_write_tournament, jobs()))
+    else:
+        # Par vagues : la taille cible est vérifiée entre deux vagues
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = jobs()
+            while True:
+                wave = [job for _, job in zip(range(workers * 8), pending)]
+                if not wave:
+                    break
+                consume(executor.map(_write_tournament, wave))
+
+    stats['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('out_dir')
+    arg_parser.add_argument('--tournaments', type=int, default=None)
+    arg_parser.add_argument('--size-mb', type=float, default=None, help="Taille cible du corpus (Mo)")
+    arg_parser.add_argument('--hands', type=int, default=300, help="Mains par tournoi (au plus : le héros peut sortir)")
+    arg_parser.add_argument('--table-size', type=int, default=3, choices=(2, 3, 5, 6, 8, 9))
+    arg_parser.add_argument('--players', type=int, default=300, help="Inscrits")
+    arg_parser.add_argument('--flop-rate', type=float, default=0.45)
+    arg_parser.add_argument('--turn-rate', type=float, default=0.7)
+    arg_parser.add_argument('--river-rate', type=float, default=0.75)
+    arg_parser.add_argument('--showdown-rate', type=float, default=0.5)
+    arg_parser.add_argument('--all-in-rate', type=float, default=0.06)
+    arg_parser.add_argument('--bounty', type=float, default=0.8, help="Bounty par joueur (0 : pas de KO)")
+    arg_parser.add_argument('--re-entries', type=int, default=1)
+    arg_parser.add_argument('--hero-edge', type=float, default=0.0,
+                            help="Avantage du héros au showdown (1 : --hands mains exactement)")
+    arg_parser.add_argument('--seed', type=int, default=42)
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--check', action='store_true', help="Reparse et compare chaque fichier généré")
+    args = arg_parser.parse_args()
+    if args.tournaments is None and args.size_mb is None:
+        args.tournaments = 10
+
+    config = CorpusConfig(hands=args.hands, table_size=args.table_size, players=args.players,
+                          flop_rate=args.flop_rate, turn_rate=args.turn_rate, river_rate=args.river_rate,
+                          showdown_rate=args.showdown_rate, all_in_rate=args.all_in_rate,
+                          bounty=args.bounty, re_entries=args.re_entries, hero_edge=args.hero_edge, seed=args.seed)
+    stats = write_corpus(args.out_dir, config, tournaments=args.tournaments, size_mb=args.size_mb,
+                         workers=args.workers, check=args.check)
+
+    elapsed = stats['elapsed_seconds'] or 1e-9
+    print(f"Tournois  : {stats['tournaments']} ({stats['entries']} entrées du héros)")
+    print(f"Mains     : {stats['hands']}")
+    print(f"Taille    : {stats['bytes'] / (1024 * 1024):.1f} Mo en {stats['elapsed_seconds']} s "
+          f"({stats['bytes'] / (1024 * 1024) / elapsed:.1f} Mo/s, {stats['hands'] / elapsed:.0f} mains/s)")
+    if args.check:
+        print(f"Vérification : {len(stats['errors'])} écart(s)")
+        for error in stats['errors'][:20]:
+            print(f"  {error}")
+        if stats['errors']:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,8 +31,9 @@ const TournamentList: React.FC<TournamentListProps> = ({
   });
 
   // API calls
-  const getTournaments = async (): Promise<Tournament[]> => {
-    const response = await fetch('http://localhost:8000/api/tournaments');
+  // Tri effectué côté serveur (index des tournois)
+  const getTournaments = async (sortOption: SortOption): Promise<Tournament[]> => {
+    const response = await fetch(`http://localhost:8000/api/tournaments?sort=${sortOption}`);
     
     if (!response.ok) {
       throw new Error(`Erreur ${response.status}: ${response.statusText}`);
@@ -41,7 +42,7 @@ const TournamentList: React.FC<TournamentListProps> = ({
     const data = await response.json();
     
     // Assurer que tous les champs requis sont présents
-    return data.map((tournament: any) => ({
+    return data.tournaments.map((tournament: any) => ({
       ...tournament,
       fee: tournament.fee ?? 0,
       tournament_type: tournament.tournament_type || 'Unknown',
@@ -65,11 +66,12 @@ const TournamentList: React.FC<TournamentListProps> = ({
 
   useEffect(() => {
     loadTournaments();
-  }, []);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [sortBy]);
 
   const loadTournaments = async () => {
     try {
-      const data = await getTournaments();
+      const data = await getTournaments(sortBy);
       setTournaments(data);
       
       const totalHands = data.reduce((sum, t) => sum + t.total_hands, 0);
@@ -96,34 +98,6 @@ const TournamentList: React.FC<TournamentListProps> = ({
     }
   };
 
-  const sortTournaments = (tournaments: Tournament[], sortOption: SortOption): Tournament[] => {
-    const sorted = [...tournaments].sort((a, b) => {
-      switch (sortOption) {
-        case 'date_desc':
-          return new Date(b.date).getTime() - new Date(a.date).getTime();
-        case 'date_asc':
-          return new Date(a.date).getTime() - new Date(b.date).getTime();
-        case 'profit_desc':
-          return b.profit_loss - a.profit_loss;
-        case 'profit_asc':
-          return a.profit_loss - b.profit_loss;
-        case 'position_asc':
-          return a.final_position - b.final_position;
-        case 'position_desc':
-          return b.final_position - a.final_position;
-        case 'hands_desc':
-          return b.total_hands - a.total_hands;
-        case 'hands_asc':
-          return a.total_hands - b.total_hands;
-        default:
-          return 0;
-      }
-    });
-    return sorted;
-  };
-
-  const sortedTournaments = sortTournaments(tournaments, sortBy);
-
   const sortOptions: { value: SortOption; label: string; icon: string }[] = [
     { value: 'date_desc', label: 'Plus récent d\'abord', icon: '📅↓' },
     { value: 'date_asc', label: 'Plus ancien d\'abord', icon: '📅↑' },
@@ -222,7 +196,7 @@ const TournamentList: React.FC<TournamentListProps> = ({
       </div>
 
       {/* Lignes du tableau */}
-      {sortedTournaments.map((tournament, index) => (
+      {tournaments.map((tournament, index) => (
         <div
           key={tournament.id}
           style={{
@@ -230,7 +204,7 @@ const TournamentList: React.FC<TournamentListProps> = ({
             gridTemplateColumns: '2fr 1fr 1fr 1fr 1fr 1fr 1fr 1fr 120px',
             gap: '15px',
             padding: '15px 20px',
-            borderBottom: index < sortedTournaments.length - 1 ? '1px solid #2d3748' : 'none',
+            borderBottom: index < tournaments.length - 1 ? '1px solid #2d3748' : 'none',
             backgroundColor: 'transparent',
             transition: 'background-color 0.2s ease',
             cursor: 'pointer',
@@ -425,7 +399,7 @@ const TournamentList: React.FC<TournamentListProps> = ({
       gridTemplateColumns: 'repeat(auto-fill, minmax(400px, 1fr))',
       gap: '20px'
     }}>
-      {sortedTournaments.map((tournament) => (
+      {tournaments.map((tournament) => (
         <div
           key={tournament.id}
           style={{
@@ -26,6 +26,43 @@ interface HandsResponse {
   total_pages: number;
 }
 
+interface TournamentListResponse {
+  tournaments: any[];
+  total: number;
+  limit: number | null;
+  next_cursor: string | null;
+}
+
+// Filtres, tri et pagination de la liste des tournois (côté serveur)
+export interface TournamentQuery {
+  date_from?: string;
+  date_to?: string;
+  tournament_type?: string;
+  buy_in_min?: number;
+  buy_in_max?: number;
+  profit?: 'positive' | 'negative' | 'zero';
+  q?: string;
+  sort?: string;
+  cursor?: string;
+  limit?: number;
+}
+
+interface StackTimelineResponse {
+  hand_numbers: number[];
+  stacks: number[];
+  big_blinds: number[];
+  m_ratios: number[];
+  levels: number[];
+}
+
+interface ReplaysResponse {
+  replays: any[];
+  total: number;
+  page: number;
+  limit: number;
+  total_pages: number;
+}
+
 interface DeleteResponse {
   message: string;
   success: boolean;
@@ -116,11 +153,19 @@ class ApiService {
   }
 
   async getAll(): Promise<any[]> {
-    return this.request<any[]>('/api/tournaments');
+    const result = await this.request<TournamentListResponse>('/api/tournaments');
+    return result.tournaments;
   }
 
-  async getTournaments(): Promise<any[]> {
-    const result = await this.request<any[]>('/api/tournaments');
+  async getTournaments(query: TournamentQuery = {}): Promise<TournamentListResponse> {
+    const params = new URLSearchParams();
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        params.append(key, String(value));
+      }
+    });
+    const suffix = params.toString() ? `?${params.toString()}` : '';
+    const result = await this.request<TournamentListResponse>(`/api/tournaments${suffix}`);
     console.log('Get tournaments response:', result); // ✅ Debug log
     return result;
   }
@@ -137,6 +182,18 @@ class ApiService {
     return this.request<HandsResponse>(`/api/tournaments/${tournamentId}/hands?page=${page}&limit=${limit}`);
   }
 
+  async getStackTimeline(tournamentId: string): Promise<StackTimelineResponse> {
+    return this.request<StackTimelineResponse>(`/api/tournaments/${tournamentId}/stack-timeline`);
+  }
+
+  async getReplays(tournamentId: string, page: number = 1, limit: number = 20): Promise<ReplaysResponse> {
+    return this.request<ReplaysResponse>(`/api/tournaments/${tournamentId}/replays?page=${page}&limit=${limit}`);
+  }
+
+  async getHandReplay(handId: string): Promise<any> {
+    return this.request<any>(`/api/hands/${handId}/replay`);
+  }
+
   async deleteTournament(id: string): Promise<DeleteResponse> {
     return this.request<DeleteResponse>(`/api/tournaments/${id}`, {
       method: 'DELETE',
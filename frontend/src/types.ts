@@ -37,6 +37,19 @@ export interface Hand {
   pot_size: number;
   rake: number;
   raw_text: string;
+  metrics?: HandMetrics;
+}
+
+export interface HandMetrics {
+  hero_net_chips: number;
+  effective_stack_bb: number;
+  vpip: boolean;
+  pfr: boolean;
+  three_bet: boolean;
+  last_street: 'preflop' | 'flop' | 'turn' | 'river';
+  showdown: boolean;
+  all_in: boolean;
+  players_remaining: number;
 }
 
 export interface Tournament {